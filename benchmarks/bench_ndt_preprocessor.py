@@ -0,0 +1,196 @@
+"""
+Benchmark of NDTDataPrepocessor on synthetic ndt rows
+
+usage: python -m benchmarks.bench_ndt_preprocessor [--rows N] [--welders N] [--limit N]
+Rows (default 1 000 000) are ordered like NDTRepository returns them: latest welding date first.
+Legacy preprocessing (DataRow per row and per step, list comprehension per summed field) is kept here for comparison.
+"""
+
+from datetime import date, timedelta
+from itertools import chain
+from math import isclose
+from time import perf_counter
+import argparse
+import random
+
+from src.report_commands.ndt_report_services import NDTDataPrepocessor, DataRow, MainPageData, SortedRows, NUMERIC_FIELDS
+from src.services.utils import reverse_dict, limit_dict_pair, limit_dict_values
+from src.domain import WelderNDTModel
+
+
+class LegacyNDTDataPrepocessor:
+
+    def preprocess(self, ndts: list[WelderNDTModel], limit: int | None) -> tuple[MainPageData, SortedRows]:
+        rows = [self._remove_none_values(DataRow(**ndt.__dict__)) for ndt in ndts]
+
+        limit = limit if limit != None else 10
+
+        sorted_rows_by_kleymo = self._sort_by_kleymo(rows)
+        sorted_rows_by_date = limit_dict_pair(self._sort_by_date(sorted_rows_by_kleymo), limit)
+
+        main_page_data = MainPageData(
+            summarized_welder_ndts = [self._get_cumulated_row(row_list) for row_list in limit_dict_values(sorted_rows_by_kleymo, limit).values()],
+            summarized_welder_group_ndts = self._summarize_group(reverse_dict(sorted_rows_by_date))
+        )
+
+        return (main_page_data, limit_dict_values(sorted_rows_by_kleymo, limit))
+
+
+    def _remove_none_values(self, row: DataRow) -> DataRow:
+        row = list(row.__dict__.items())
+
+        return DataRow(**dict(row[:10] + [(key, 0 if value == None else value) for key, value in row[10:-1]]))
+
+
+    def _summarize_group(self, rows_dict: SortedRows) -> dict[date, DataRow]:
+        return {
+            key: self._compute_repair_statuses(self._sum_rows(value)) for key, value in rows_dict.items()
+        }
+
+
+    def _sum_rows(self, rows: list[DataRow]) -> DataRow:
+        return DataRow(**{
+            name: sum([getattr(row, name) for row in rows]) for name in NUMERIC_FIELDS if name.startswith("total")
+        })
+
+
+    def _sort_by_kleymo(self, rows: list[DataRow]) -> SortedRows:
+        sorted_rows: SortedRows = {}
+
+        for ndt in rows:
+            sorted_rows.setdefault(ndt.kleymo, []).append(DataRow(**self._compute_repair_statuses(ndt).__dict__))
+
+        return sorted_rows
+
+
+    def _sort_by_date(self, rows: SortedRows) -> dict[date, list[DataRow]]:
+        sorted_rows: dict[date, list[DataRow]] = {}
+
+        for row in chain.from_iterable(rows.values()):
+            sorted_rows.setdefault(row.latest_welding_date, []).append(row)
+
+        return sorted_rows
+
+
+    def _get_cumulated_row(self, rows: list[DataRow]) -> DataRow:
+        rows = list(reversed(rows))
+
+        cumulated_row = rows[0]
+
+        for row in rows[1:]:
+            cumulated_row = self._compute_ndt_by_previous(row, cumulated_row)
+
+        return cumulated_row
+
+
+    def _compute_ndt_by_previous(self, target_ndt: DataRow, previous_ndt: DataRow) -> DataRow:
+        target_ndt = list(target_ndt.__dict__.items())
+        previous_ndt = list(previous_ndt.__dict__.items())
+
+        result = [
+            (target_el[0], target_el[1] + previous_el[1]) if target_el[1] < previous_el[1] else target_el
+            for target_el, previous_el in zip(target_ndt[10:-1], previous_ndt[10:-1])
+        ]
+
+        return DataRow(**dict(target_ndt[:10] + result))
+
+
+    def _compute_repair_statuses(self, row: DataRow) -> DataRow:
+        row.repair_status_1 = self._compute_repair_status(row.total_accepted_1, row.total_ndt_1)
+        row.repair_status_2 = self._compute_repair_status(row.total_accepted_2, row.total_ndt_2)
+        row.repair_status_3 = self._compute_repair_status(row.total_accepted_3, row.total_ndt_3)
+
+        return row
+
+
+    def _compute_repair_status(self, total_accepted: float, total_ndt: float):
+        try:
+            return 100 - (total_accepted / total_ndt) * 100
+        except:
+            return 0.0
+
+
+def synthetic_ndts(rows: int, welders: int) -> list[WelderNDTModel]:
+    rnd = random.Random(0)
+    ndts = []
+
+    for i in range(rows):
+        values = {}
+
+        for group in range(1, 4):
+            total_ndt = rnd.choice([None, 0, rnd.randint(1, 40) * (1 if group == 1 else 12.5)])
+            total_accepted = None if total_ndt == None else rnd.uniform(0, total_ndt)
+
+            values |= {
+                f"total_weld_{group}": rnd.choice([None, rnd.randint(0, 60) * (1 if group == 1 else 0.1)]),
+                f"total_ndt_{group}": total_ndt,
+                f"total_accepted_{group}": total_accepted,
+                f"total_repair_{group}": None if total_ndt == None else total_ndt - total_accepted,
+                f"repair_status_{group}": None,
+            }
+
+        kleymo = f"{i % welders:04X}"[-4:]
+
+        ndts.append(
+            WelderNDTModel.model_construct(
+                full_name = f"Welder {kleymo}",
+                kleymo = kleymo,
+                comp = "COMP",
+                subcon = "SUBCON",
+                project = f"PROJECT {i % 3}",
+                latest_welding_date = date(2024, 1, 1) + timedelta(days=i % 500),
+                ndt_id = f"ndt{i}",
+                **values
+            )
+        )
+
+    return sorted(ndts, key=lambda ndt: (ndt.latest_welding_date, ndt.ndt_id), reverse=True)
+
+
+def assert_same_rows(rows: list[DataRow], legacy_rows: list[DataRow]) -> None:
+    assert len(rows) == len(legacy_rows), "row counts differ"
+
+    for row, legacy_row in zip(rows, legacy_rows):
+        for name, value in row.__dict__.items():
+            legacy_value = getattr(legacy_row, name)
+
+            if name in NUMERIC_FIELDS:
+                # python 3.12 sum() compensates rounding errors, numpy accumulates plainly
+                assert isclose(value, legacy_value, rel_tol=1e-12, abs_tol=1e-9), f"{name}: {value} != {legacy_value}"
+            else:
+                assert value == legacy_value, f"{name}: {value} != {legacy_value}"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--welders", type=int, default=5000)
+    arg_parser.add_argument("--limit", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    ndts = synthetic_ndts(args.rows, args.welders)
+
+    start = perf_counter()
+    main_page, sorted_rows = NDTDataPrepocessor().preprocess(ndts, args.limit)
+    current = perf_counter() - start
+
+    start = perf_counter()
+    legacy_main_page, legacy_sorted_rows = LegacyNDTDataPrepocessor().preprocess(ndts, args.limit)
+    legacy = perf_counter() - start
+
+    assert list(sorted_rows) == list(legacy_sorted_rows), "kleymo groups differ"
+    assert list(main_page.summarized_welder_group_ndts) == list(legacy_main_page.summarized_welder_group_ndts), "welding dates differ"
+
+    for kleymo, rows in sorted_rows.items():
+        assert_same_rows(rows, legacy_sorted_rows[kleymo])
+
+    assert_same_rows(main_page.summarized_welder_ndts, legacy_main_page.summarized_welder_ndts)
+    assert_same_rows(list(main_page.summarized_welder_group_ndts.values()), list(legacy_main_page.summarized_welder_group_ndts.values()))
+
+    print(f"rows: {len(ndts)}, welders: {len(sorted_rows)}, limit: {args.limit}")
+    print(f"legacy:  {legacy:.3f} s")
+    print(f"current: {current:.3f} s ({legacy / current:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of ndt report excel and pdf savers on synthetic report data
+
+usage: python -m benchmarks.bench_ndt_report_excel [--welders N] [--limit N] [--saver NAME ...]
+Every saver runs in its own process (peak memory is per process, the largest pool worker is shown
+separately for excel-parallel), report is written to a temporary folder.
+The template based saver gets a generated template with a header-only Main sheet,
+the pdf saver uses PDF_FONT_PATH font (Helvetica when the file doesn't exist).
+Peak memory is printed as n/a where the resource module is missing (Windows).
+"""
+
+from pathlib import Path
+from time import perf_counter
+import subprocess
+import tempfile
+import argparse
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from openpyxl import Workbook
+
+from benchmarks.bench_ndt_preprocessor import synthetic_ndts
+from src.report_commands import ndt_report_services
+from src.report_commands.ndt_report_services import NDTDataPrepocessor, NDTReportExcelSaveService, NDTReportExcelStreamSaveService, \
+    NDTReportExcelParallelSaveService, NDTReportPDFSaveService
+
+
+SAVERS = {
+    "excel": NDTReportExcelSaveService,
+    "excel-stream": NDTReportExcelStreamSaveService,
+    "excel-parallel": NDTReportExcelParallelSaveService,
+    "pdf": NDTReportPDFSaveService,
+}
+
+
+def make_template(path: Path) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Main"
+    ws.append(["header"])
+    ws.append(["kleymo"])
+    wb.save(path)
+
+
+def peak_rss(children: bool = False) -> str:
+    if resource == None:
+        return "n/a"
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+    return f"{resource.getrusage(who).ru_maxrss / scale:.0f} MB"
+
+
+def run(saver_name: str, welders: int, limit: int) -> None:
+    folder = Path(tempfile.mkdtemp())
+
+    ndt_report_services.STATIC_DIR = folder
+    ndt_report_services.NDT_REPORT_PATH = folder / "report.xlsx"
+    make_template(folder / "report.xlsx")
+
+    main_page, sorted_rows = NDTDataPrepocessor().preprocess(synthetic_ndts(welders * limit, welders), limit)
+
+    start = perf_counter()
+    SAVERS[saver_name]().dump_report(main_page, sorted_rows)
+    elapsed = perf_counter() - start
+
+    peak = peak_rss()
+    worker_peak = peak_rss(children=True)
+    size = (folder / ("report.pdf" if saver_name == "pdf" else "report.xlsx")).stat().st_size / 1024 / 1024
+
+    print(f"{saver_name:<14} {elapsed:8.2f} s  peak rss {peak:>7}  worker {worker_peak:>7}  file {size:5.1f} MB")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--welders", type=int, default=2000)
+    arg_parser.add_argument("--limit", type=int, default=10)
+    arg_parser.add_argument("--saver", nargs="*", default=list(SAVERS), choices=list(SAVERS))
+    arg_parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.run:
+        run(args.run, args.welders, args.limit)
+        return
+
+    print(f"welders: {args.welders}, rows per welder: {args.limit}")
+
+    for saver_name in args.saver:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ndt_report_excel", "--run", saver_name, "--welders", str(args.welders), "--limit", str(args.limit)],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
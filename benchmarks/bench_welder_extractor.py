@@ -0,0 +1,115 @@
+"""
+Benchmark of WelderDataExtractor search page extraction
+
+usage: python -m benchmarks.bench_welder_extractor [folder with saved search pages] [--rows N]
+Without a folder a synthetic search page with N rows (default 500) is used.
+Legacy extraction (per row re-parsing and absolute xpath queries) is kept here for comparison.
+"""
+
+from datetime import date
+from pathlib import Path
+from re import search
+from timeit import timeit
+import argparse
+
+from lxml import html
+
+from src.parse_naks.extractors import WelderDataExtractor
+from src.services.utils import str_to_date
+
+
+def legacy_get_value(tree: html.HtmlElement, xpath: str, is_date: bool = False) -> str | date | None:
+    try:
+        if is_date:
+            return str_to_date(tree.xpath(xpath)[0])
+
+        return tree.xpath(xpath)[0].strip()
+    except:
+        return None
+
+
+def legacy_extract(page: str) -> tuple[list[dict], list[str]]:
+    result = []
+    tree = html.fromstring(page)
+
+    for tr in tree.xpath("//tr[@bgcolor]"):
+        row_tree = html.fromstring(html.tostring(tr))
+        kleymo = legacy_get_value(row_tree, "//tr[@bgcolor]/td[2]/span/text()")
+        certification_number = legacy_get_value(row_tree, "//tr[@bgcolor]/td[5]/text()")
+        insert = legacy_get_value(row_tree, "//tr[@bgcolor]/td[6]/text()")
+        certification_date = legacy_get_value(row_tree, "//tr[@bgcolor]/td[9]/text()", True)
+
+        result.append({
+            "full_name": legacy_get_value(row_tree, "//tr[@bgcolor]/td[1]/text()"),
+            "kleymo": kleymo,
+            "company": legacy_get_value(row_tree, "//tr[@bgcolor]/td[3]/text()"),
+            "job_title": legacy_get_value(row_tree, "//tr[@bgcolor]/td[4]/text()"),
+            "certification_number": certification_number,
+            "insert": insert,
+            "certification_date": certification_date,
+            "expiration_date": legacy_get_value(row_tree, "//tr[@bgcolor]/td[10]/text()", True),
+            "renewal_date": legacy_get_value(row_tree, "//tr[@bgcolor]/td[11]/text()", True),
+            "certification_id": WelderDataExtractor._get_certification_id(kleymo, certification_number, certification_date, insert)
+        })
+
+    links = html.fromstring(page).xpath("//tr[@bgcolor]/td[13]/a/@onclick")
+    links = [search(r"/[\w]+/[\w]+/detail.php\?ID=[\w\W]+", link)[0].replace('"', '').split(",")[0] for link in links]
+    links = [f"https://naks.ru{link}" for link in links]
+
+    return (result, links)
+
+
+def synthetic_page(rows: int) -> str:
+    trs = []
+
+    for i in range(rows):
+        trs.append(
+            f"""<tr bgcolor="{'#F5F5F5' if i % 2 else '#FFFFFF'}">
+                <td>Иванов Иван Иванович</td><td><span>{i % 10}A{i % 7}B</span></td><td>ООО "Компания {i}"</td>
+                <td>Сварщик</td><td>АЦСТ-{i}-00{i % 9}</td><td>{'I' * (i % 3)}</td><td>I</td><td>РД</td>
+                <td>{(i * 7) % 28 + 1:02}.{(i * 5) % 12 + 1:02}.{2015 + i % 10}</td><td>{(i * 3) % 28 + 1:02}.{(i * 11) % 12 + 1:02}.{2020 + i % 10}</td>
+                <td>{'' if i % 4 else '01.06.2024'}</td><td>НГДО</td>
+                <td><a href="#" onclick='window.open("/registry/personal/detail.php?ID={100000 + i}", "", "width=800")'>Подробнее</a></td>
+            </tr>"""
+        )
+
+    return "<html><body><table><tr><th>ФИО</th></tr>" + "".join(trs) + "</table></body></html>"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("folder", nargs="?")
+    arg_parser.add_argument("--rows", type=int, default=500)
+    arg_parser.add_argument("--number", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.folder:
+        pages = [path.read_text(encoding="utf-8") for path in Path(args.folder).glob("*.html")]
+    else:
+        pages = [synthetic_page(args.rows)]
+
+    extractor = WelderDataExtractor()
+
+    for page in pages:
+        rows, links = extractor.extract_rows(page), [link for link in extractor.extract_links(page) if link]
+        assert (rows, links) == legacy_extract(page), "extraction results differ"
+
+    def new() -> None:
+        WelderDataExtractor.extract_page.cache_clear()
+        WelderDataExtractor._str_to_date.cache_clear()
+
+        for page in pages:
+            extractor.extract_rows(page)
+            extractor.extract_links(page)
+
+    legacy = timeit(lambda: [legacy_extract(page) for page in pages], number=args.number)
+    current = timeit(new, number=args.number)
+    rows_count = sum(len(extractor.extract_rows(page)) for page in pages)
+
+    print(f"pages: {len(pages)}, rows: {rows_count}, runs: {args.number}")
+    print(f"legacy:  {legacy:.3f} s")
+    print(f"current: {current:.3f} s ({legacy / current:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,71 @@
+from importlib import import_module
+
 import click
 
-from src.manage_db.commands import ManageWelderDataCommand
-from src.report_commands.commands import NDTReportCommand
-from src.parse_naks import ParsePersonalCommand
-from src.manage_registry import ParseNDTReport, ManageWelderRegistryCommand
-from src.notification_module import WelderNotificationCommand
-from src.another_commands import RenameFolderCommand
 
+class LazyGroup(click.Group):
+    """
+    Subcommands are given as "module:Class" paths and imported only when invoked,
+    so a command never pays for the dependencies of the others
+    """
+
+    def __init__(self, *args, lazy_commands: dict[str, str] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted([*super().list_commands(ctx), *self.lazy_commands])
+
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, class_name = self.lazy_commands[cmd_name].split(":")
+            self.add_command(getattr(import_module(module_name), class_name)(), cmd_name)
+
+        return super().get_command(ctx, cmd_name)
+
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """
+        Group help lists command names without importing them
+        """
+        with formatter.section("Commands"):
+            formatter.write_dl([(name, "") for name in self.list_commands(ctx)])
+
+
+class RenconGroup(LazyGroup):
+    """
+    Every command runs in one db scope: a single session, closed when the command ends
+    """
+
+    def invoke(self, ctx: click.Context):
+        from src.db.unit_of_work import CommandScope
 
-@click.group()
-def cli(): ...
+        with CommandScope() as scope:
+            try:
+                return super().invoke(ctx)
+            finally:
+                if ctx.params.get("stats"):
+                    click.echo(f"db {scope.metrics}", err=True)
 
 
-cli.add_command(ManageWelderDataCommand())
-cli.add_command(NDTReportCommand())
-cli.add_command(ParsePersonalCommand())
-cli.add_command(ParseNDTReport())
-cli.add_command(ManageWelderRegistryCommand())
-cli.add_command(WelderNotificationCommand())
-cli.add_command(RenameFolderCommand())
+@click.group(
+    cls=RenconGroup,
+    lazy_commands={
+        "manage-welder-data": "src.manage_db.commands:ManageWelderDataCommand",
+        "migrate-db": "src.manage_db.commands:MigrateDBCommand",
+        "init-db": "src.manage_db.commands:MigrateDBCommand",
+        "ndt-report": "src.report_commands.commands:NDTReportCommand",
+        "parse-personal": "src.parse_naks.commands:ParsePersonalCommand",
+        "parse-ndt-report": "src.manage_registry.commands:ParseNDTReport",
+        "manage-welder-registry": "src.manage_registry.commands:ManageWelderRegistryCommand",
+        "welder-notifications": "src.notification_module.commands:WelderNotificationCommand",
+        "rename-folders": "src.another_commands.commands:RenameFolderCommand",
+    }
+)
+@click.option("--stats", is_flag=True, help="print statements count and sql time of the command")
+def cli(stats: bool): ...
 
 
 if __name__ == "__main__":
@@ -15,17 +15,23 @@ USER = os.getenv("USER")
 PORT = os.getenv("PORT")
 MODE = os.getenv("MODE")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ["1", "true", "yes"]
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", 0))
+
 BASE_DIR = Path.cwd()
 STATIC_DIR = Path(f"{BASE_DIR}/static")
 
 GROUPS_FOLDER = pathlib.Path(f"{STATIC_DIR}/groups")
 
-WELDERS_DATA_JSON_PATH = pathlib.Path(f"{STATIC_DIR}/welders_certifications.json")
+WELDERS_DATA_JSONL_PATH = pathlib.Path(f"{STATIC_DIR}/welders_certifications.jsonl")
 WELDER_REGISTRY_PATH = pathlib.Path(f"{STATIC_DIR}/welder_registry.xlsx")
 
 NDT_REGISTRY_PATH = pathlib.Path(f"{STATIC_DIR}/ndt_registry.xlsx")
 NDT_TABLES_FOLDER_PATH = pathlib.Path(f"{STATIC_DIR}/ndt_tables")
 NDT_REPORT_PATH = pathlib.Path(f"{STATIC_DIR}/report.xlsx")
+PDF_FONT_PATH = pathlib.Path(os.getenv("PDF_FONT_PATH", f"{STATIC_DIR}/fonts/DejaVuSans.ttf"))
 
 ENGINEERS_DATA_JSON_PATH = pathlib.Path(f"{STATIC_DIR}/engineers_certifications.json")
 ENGINEER_REGISTRY_PATH = pathlib.Path(f"{STATIC_DIR}/engineer_registry.xlsx")
@@ -48,6 +54,12 @@ PATH_TO_PDF_PARSER_SETTINGS = pathlib.Path(f"{STATIC_DIR}/settings.json")
 SEARCH_VALUES_FILE = pathlib.Path(f"{STATIC_DIR}/search_settings.json")
 SKIPED_VALUES_FILE = pathlib.Path(f"{STATIC_DIR}/skiped_values.txt")
 
+NAKS_CACHE_DIR = pathlib.Path(f"{STATIC_DIR}/naks_cache")
+NAKS_CACHE_TTLS = {"search": 24 * 60 * 60, "detail": 30 * 24 * 60 * 60}
+NAKS_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+PARSE_PERSONAL_CHECKPOINT_PATH = pathlib.Path(f"{STATIC_DIR}/parse_personal_checkpoint.jsonl")
+
 ACST_DATA_JSON_PATH = pathlib.Path(f"{STATIC_DIR}/acsts.json")
 ACST_REGISTRY_PATH = pathlib.Path(f"{STATIC_DIR}/acst_registry.xlsx")
 
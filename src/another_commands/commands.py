@@ -42,7 +42,7 @@ class RenameFolderCommand(Command):
             WelderRequest(
                 names=welder_folders
             )
-        )
+        ).result
 
         welder_dict: dict[str, list[str]] = {}
 
@@ -0,0 +1,71 @@
+from typing import Any, Iterable, Iterator
+from io import StringIO
+import csv
+
+from sqlalchemy import Connection, Table
+
+
+"""
+=======================================================================================================
+COPY stream
+=======================================================================================================
+"""
+
+
+class CSVRowStream:
+    """
+    File-like object for psycopg2 `copy_expert`, renders rows to csv only when COPY reads the next block,
+    so rows are never held in memory all at once. None is written as \\N (COPY's NULL marker)
+    """
+
+    null = "\\N"
+
+    def __init__(self, rows: Iterable[dict[str, Any]], columns: list[str]) -> None:
+        self.rows: Iterator[dict[str, Any]] = iter(rows)
+        self.columns = columns
+        self.count = 0
+
+        self._buffer = StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self.rows, None)
+
+            if row == None:
+                break
+
+            self._writer.writerow([self.null if row[column] == None else row[column] for column in self.columns])
+            self.count += 1
+
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        if size < 0:
+            size = len(self._pending)
+
+        block, self._pending = self._pending[:size], self._pending[size:]
+
+        return block
+
+
+def copy_rows(connection: Connection, table: Table, columns: list[str], rows: Iterable[dict[str, Any]]) -> int:
+    """
+    Streams rows into table columns through COPY FROM STDIN, returns amount of copied rows
+    """
+    stream = CSVRowStream(rows, columns)
+
+    cursor = connection.connection.cursor()
+
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{CSVRowStream.null}')",
+            stream
+        )
+    finally:
+        cursor.close()
+
+    return stream.count
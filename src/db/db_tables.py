@@ -1,4 +1,4 @@
-from sqlalchemy import  String, Column, Date, ForeignKey
+from sqlalchemy import  String, Column, Date, ForeignKey, Index
 
 from sqlalchemy.orm import relationship
 
@@ -14,6 +14,9 @@ Tables
 
 class WelderTable(Base):
     __tablename__ = "welder_table"
+    __table_args__ = (
+        Index("welder_table_full_name", "full_name"),
+    )
 
     kleymo = Column(String(4), primary_key=True)
     full_name = Column(String(), nullable=True)
@@ -25,6 +28,10 @@ class WelderTable(Base):
 
 class WelderCertificationTable(Base):
     __tablename__ = "welder_certification_table"
+    __table_args__ = (
+        Index("welder_certification_table_kleymo", "kleymo"),
+        Index("welder_certification_table_expiration_date", "expiration_date"),
+    )
 
     kleymo = Column(String(4), ForeignKey("welder_table.kleymo"))
     certification_id = Column(String(), nullable=False, primary_key=True)
@@ -58,6 +65,10 @@ class WelderCertificationTable(Base):
 
 class NDTTable(Base):
     __tablename__ = "ndt_table"
+    __table_args__ = (
+        Index("ndt_table_kleymo", "kleymo"),
+        Index("ndt_table_comp_subcon_project_latest_welding_date", "comp", "subcon", "project", "latest_welding_date"),
+    )
     
     sicil_number = Column(String(), nullable=True)
     kleymo = Column(String(4), ForeignKey("welder_table.kleymo"))
@@ -84,3 +95,7 @@ class NDTTable(Base):
     total_repair_3 = Column(String(), nullable=True)
     repair_status_3 = Column(String(), nullable=True)
     ndt_id = Column(String(), primary_key=True)
+
+
+# order of keyset pages: the newest first, rows without welding date last
+Index("ndt_table_latest_welding_date_ndt_id", NDTTable.latest_welding_date.desc().nulls_last(), NDTTable.ndt_id.desc())
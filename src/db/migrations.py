@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Connection, Engine, MetaData, Table, Column, Index, String, Date, DateTime, ForeignKey, select, insert, text
+
+
+"""
+=======================================================================================================
+Types
+=======================================================================================================
+"""
+
+
+@dataclass
+class Migration:
+    version: str
+    description: str
+    apply: Callable[[Connection], None]
+
+
+"""
+=======================================================================================================
+Migrations
+=======================================================================================================
+"""
+
+
+# migrations don't use src/db/db_tables.py: every one keeps the schema of its revision
+def _baseline_metadata() -> MetaData:
+    """
+    Tables as they were before migrations, without indexes
+    """
+    metadata = MetaData()
+
+    Table(
+        "welder_table",
+        metadata,
+        Column("kleymo", String(4), primary_key=True),
+        Column("full_name", String(), nullable=True),
+        Column("birthday", Date(), nullable=True),
+        Column("passport_id", String(), nullable=True)
+    )
+
+    Table(
+        "welder_certification_table",
+        metadata,
+        Column("kleymo", String(4), ForeignKey("welder_table.kleymo")),
+        Column("certification_id", String(), nullable=False, primary_key=True),
+        Column("job_title", String(), nullable=True),
+        Column("certification_number", String(), nullable=True),
+        Column("certification_date", Date(), nullable=True),
+        Column("expiration_date", Date(), nullable=True),
+        Column("renewal_date", Date(), nullable=True),
+        *[
+            Column(name, String(), nullable=True) for name in [
+                "insert", "certification_type", "company", "gtd", "method", "details_type", "joint_type",
+                "groups_materials_for_welding", "welding_materials", "details_thikness", "outer_diameter", "welding_position",
+                "connection_type", "rod_diameter", "rod_axis_position", "weld_type", "joint_layer", "sdr", "automation_level",
+                "details_diameter", "welding_equipment"
+            ]
+        ]
+    )
+
+    Table(
+        "ndt_table",
+        metadata,
+        Column("sicil_number", String(), nullable=True),
+        Column("kleymo", String(4), ForeignKey("welder_table.kleymo")),
+        Column("birthday", Date(), nullable=True),
+        *[Column(name, String(), nullable=True) for name in ["passport_number", "nation", "comp", "subcon", "project"]],
+        Column("latest_welding_date", Date(), nullable=True),
+        *[
+            Column(f"{name}_{group}", String(), nullable=True)
+            for group in (1, 2, 3) for name in ["total_weld", "total_ndt", "total_accepted", "total_repair", "repair_status"]
+        ],
+        Column("ndt_id", String(), primary_key=True)
+    )
+
+    return metadata
+
+
+def _initial_schema(connection: Connection) -> None:
+    """
+    Databases created before migrations already have these tables
+    """
+    _baseline_metadata().create_all(connection, checkfirst=True)
+
+
+def _hot_query_indexes(connection: Connection) -> None:
+    """
+    Date ranges and kleymo/company lookups of ndt report, expiration date range and welder names of notification
+    """
+    tables = _baseline_metadata().tables
+    welder, certification, ndt = tables["welder_table"], tables["welder_certification_table"], tables["ndt_table"]
+
+    indexes = [
+        Index("welder_table_full_name", welder.c.full_name),
+        Index("welder_certification_table_kleymo", certification.c.kleymo),
+        Index("welder_certification_table_expiration_date", certification.c.expiration_date),
+        Index("ndt_table_kleymo", ndt.c.kleymo),
+        Index("ndt_table_latest_welding_date_ndt_id", ndt.c.latest_welding_date, ndt.c.ndt_id),
+        Index("ndt_table_comp_subcon_project_latest_welding_date", ndt.c.comp, ndt.c.subcon, ndt.c.project, ndt.c.latest_welding_date),
+    ]
+
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _ndt_keyset_index(connection: Connection) -> None:
+    """
+    Keyset pages of ndts are ordered by latest_welding_date desc nulls last, ascending index can't serve it
+    """
+    ndt = _baseline_metadata().tables["ndt_table"]
+    index = Index("ndt_table_latest_welding_date_ndt_id", ndt.c.latest_welding_date.desc().nulls_last(), ndt.c.ndt_id.desc())
+
+    index.drop(connection, checkfirst=True)
+    index.create(connection)
+
+
+MIGRATIONS = [
+    Migration("0001", "initial schema", _initial_schema),
+    Migration("0002", "hot query indexes", _hot_query_indexes),
+    Migration("0003", "ndt keyset index with nulls last", _ndt_keyset_index),
+]
+
+
+"""
+=======================================================================================================
+Migrator
+=======================================================================================================
+"""
+
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(), primary_key=True),
+    Column("description", String(), nullable=False),
+    Column("applied_at", DateTime(), nullable=False)
+)
+
+
+class Migrator:
+    """
+    Applies pending migrations in version order, every migration in its own transaction
+    together with its schema_migrations record. Concurrent runs are serialized by advisory lock
+    """
+
+    lock_id = 2024_0316
+
+    def __init__(self, engine: Engine, migrations: list[Migration] = MIGRATIONS) -> None:
+        self.engine = engine
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+
+
+    def applied(self) -> set[str]:
+        with self.engine.begin() as connection:
+            # concurrent runs would both try to create schema_migrations
+            self._lock(connection)
+            schema_migrations.create(connection, checkfirst=True)
+
+            return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied()
+
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+
+    def migrate(self) -> list[Migration]:
+        done = []
+
+        for migration in self.pending():
+            with self.engine.begin() as connection:
+                self._lock(connection)
+
+                if connection.scalar(select(schema_migrations.c.version).where(schema_migrations.c.version == migration.version)):
+                    continue
+
+                migration.apply(connection)
+                connection.execute(
+                    insert(schema_migrations).values(version=migration.version, description=migration.description, applied_at=datetime.now())
+                )
+
+            done.append(migration)
+
+        return done
+
+
+    def _lock(self, connection: Connection) -> None:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": self.lock_id})
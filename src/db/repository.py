@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar, Union, TypeAlias
+from datetime import date
+from itertools import batched
+from typing import Any, Iterable, Iterator, Sequence, TypeVar, Union, TypeAlias
 
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import Select, event, update, insert, delete, inspect, select, desc
-from sqlalchemy.orm import subqueryload
+from sqlalchemy import BigInteger, Column as TableColumn, Connection, Double, Identity, MetaData, Row, Select, Subquery, Table, update, insert, delete, inspect, select, desc, exists, func, and_, or_, false, tuple_, case, cast, literal_column
+from sqlalchemy.dialects.postgresql import Insert as PGInsert, insert as pg_insert
+from sqlalchemy.orm import subqueryload, selectinload
 from sqlalchemy.sql.schema import Column
+from sqlalchemy.sql.elements import ColumnElement
 
 from src.db.db_tables import NDTTable, WelderCertificationTable, WelderTable
-from src.db.session import Base, get_session
+from src.db.bulk import copy_rows
+from src.db.session import Base
+from src.db.unit_of_work import SQLalchemyUnitOfWork, use_session
 from src.domain import (
     WelderModel,
     WelderNDTModel,
@@ -16,6 +22,7 @@ from src.domain import (
     BaseDomainModel,
     DBRequest,
     DBResponse,
+    UpsertResult,
     WelderRequest,
     NDTRequest
 )
@@ -35,69 +42,108 @@ Id: TypeAlias = Union[str, float, int]
 
 """
 =======================================================================================================
-Unit of Work
+Abstract Repository
 =======================================================================================================
 """
 
 
-class SQLalchemyUnitOfWork:
-    def __enter__(self):
-        self.session = get_session()
-        self.connection = self.session.connection()
-        self.engine = self.connection.engine
-        self.count = 0
+class BaseRepository[Model: BaseDomainModel, Table: Base](ABC):
+    """
+    :__keyset__ - unique ordering of get_many pages, keyset cursors hold values of these columns
+    """
+    __tablemodel__: Table
+    __domain_model__: Model
+    __keyset__: tuple[str, ...]
+    __keyset_descending__: bool = False
 
-        event.listen(self.engine, "before_cursor_execute", self.callback)
 
-        return self
+    def get(self, id: Id) -> Model | None:
+        stmt = select(self.__tablemodel__).where(
+            self.pk == id
+        )
 
+        with use_session() as session:
+            result = session.execute(stmt).fetchone()
 
-    def __exit__(self, *args, **kwargs):
-        event.remove(self.engine, "before_cursor_execute", self.callback)
+            if result == None:
+                return None
 
-    
-    def commit(self) -> None:
-        self.session.commit()
+            return self.__domain_model__.model_validate(result[0], from_attributes=True)
 
 
-    def rollback(self) -> None:
-        self.session.rollback()
+    def get_many(self, request: Request) -> DBResponse[Model]:
+        """
+        One page of filtered rows: `offset`/`limit` or keyset `after` cursor,
+        count is the exact amount of rows matching the filters
+        """
+        stmt = self._select_many(request)
 
+        with use_session() as session:
+            count = session.scalar(self._count_statement(stmt))
+            result = [self._row_to_model(row) for row in session.execute(self._paginate(stmt, request))]
 
-    def callback(self, *args, **kwargs) -> None:
-        self.count += 1
+        return DBResponse(
+            result=result,
+            count=count,
+            cursor=self._cursor(result[-1]) if request.limit and len(result) == request.limit else None
+        )
 
 
-"""
-=======================================================================================================
-Abstract Repository
-=======================================================================================================
-"""
+    @abstractmethod
+    def _select_many(self, request: Request) -> Select: ...
 
 
-class BaseRepository[Model: BaseDomainModel, Table: Base](ABC):
-    __tablemodel__: Table
-    __domain_model__: Model
+    def _row_to_model(self, row: Row) -> Model:
+        return self.__domain_model__.model_validate(row[0], from_attributes=True)
 
 
-    def get(self, id: Id) -> Model | None:
-        session = get_session()
-        stmt = select(self.__tablemodel__).where(
-            self.pk == id
-        )
+    def _paginate(self, stmt: Select, request: Request) -> Select:
+        """
+        Nulls go last in both directions. Row comparison of a null column is null, so rows after
+        the cursor are spelled out column by column: equal leading columns and the next value of the following one
+        """
+        columns = [getattr(self.__tablemodel__, name) for name in self.__keyset__]
 
-        result = session.execute(stmt).fetchone()
-        if result == None:
-            session.close()
-            return None
-        
-        session.close()
+        if request.after:
+            stmt = stmt.where(self._after(columns, request.after))
 
-        return self.__domain_model__.model_validate(result[0], from_attributes=True)
+        stmt = stmt.order_by(*[(column.desc() if self.__keyset_descending__ else column.asc()).nulls_last() for column in columns])
 
+        if request.offset:
+            stmt = stmt.offset(request.offset)
+
+        if request.limit != None:
+            stmt = stmt.limit(request.limit)
+
+        return stmt
+
+
+    def _after(self, columns: list[Column], cursor: Sequence[Any]) -> ColumnElement[bool]:
+        conditions = []
+
+        for e, (column, value) in enumerate(zip(columns, cursor)):
+            equal = [previous.is_(None) if previous_value == None else previous == previous_value for previous, previous_value in zip(columns[:e], cursor[:e])]
+
+            # nothing goes after null
+            if value == None:
+                continue
+
+            following = column < value if self.__keyset_descending__ else column > value
+
+            if column.nullable:
+                following = or_(following, column.is_(None))
+
+            conditions.append(and_(*equal, following))
+
+        return or_(false(), *conditions)
 
-    @abstractmethod
-    def get_many(self, request: Request) -> DBResponse: ...
+
+    def _count_statement(self, stmt: Select) -> Select:
+        return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+    def _cursor(self, model: Model) -> list:
+        return [getattr(model, name) for name in self.__keyset__]
 
 
     def add(self, data: list[Model]) -> None:
@@ -118,6 +164,70 @@ class BaseRepository[Model: BaseDomainModel, Table: Base](ABC):
             self._delete(model)
 
 
+    def upsert_many(self, data: Iterable[Model], chunk_size: int = 1000, commit_chunks: bool = False) -> dict[str, UpsertResult]:
+        """
+        Inserts new rows and updates changed ones in chunks of multi-row INSERT ... ON CONFLICT DO UPDATE,
+        all chunks are written in one transaction, or every chunk is committed on its own with `commit_chunks`
+        """
+        result = UpsertResult()
+
+        for unit_chunks in self._units(data, chunk_size, commit_chunks):
+            with SQLalchemyUnitOfWork() as transaction:
+                try:
+                    for chunk in unit_chunks:
+                        self._upsert_chunk(transaction.connection, [model.orm_data for model in chunk], result)
+
+                    transaction.commit()
+
+                except:
+                    transaction.rollback()
+                    raise
+
+        return {self.__tablemodel__.__tablename__: result}
+
+
+    def _units(self, data: Iterable[Model], chunk_size: int, commit_chunks: bool) -> Iterator[Iterable[tuple[Model, ...]]]:
+        """
+        Chunks of data grouped by unit of work: one unit for all chunks or a unit per chunk
+        """
+        chunks = batched(data, chunk_size)
+
+        if not commit_chunks:
+            yield chunks
+            return
+
+        for chunk in chunks:
+            yield [chunk]
+
+
+    def _upsert_chunk(self, connection: Connection, rows: list[dict], result: UpsertResult) -> None:
+        """
+        Rows are updated only when some non null column is distinct from the stored value,
+        nulls of incoming rows keep stored values (scraped welders have no birthday for example).
+        `xmax = 0` is true only for rows inserted by the statement
+        """
+        rows = list({row[self.pk.name]: row for row in rows}.values())
+
+        if rows == []:
+            return
+
+        inserted = [row[0] for row in connection.execute(self._on_conflict_update(pg_insert(self.__tablemodel__).values(rows)))]
+
+        result.inserted += sum(inserted)
+        result.updated += len(inserted) - sum(inserted)
+        result.unchanged += len(rows) - len(inserted)
+
+
+    def _on_conflict_update(self, stmt: PGInsert) -> PGInsert:
+        columns = [column for column in self.__tablemodel__.__table__.c if column.name != self.pk.name]
+
+        return stmt.on_conflict_do_update(
+            index_elements=[self.pk],
+            set_={column.name: func.coalesce(stmt.excluded[column.name], column) for column in columns},
+            where=or_(*[and_(stmt.excluded[column.name] != None, column.is_distinct_from(stmt.excluded[column.name])) for column in columns])
+        ).returning(literal_column("xmax = 0"))
+
+
     def _add(self, model: Model) -> None:
         with SQLalchemyUnitOfWork() as transaction:
             try:
@@ -168,11 +278,8 @@ class BaseRepository[Model: BaseDomainModel, Table: Base](ABC):
 
     @property
     def count(self) -> int:
-        session = get_session()
-        result = session.query(self.__tablemodel__).count()
-        session.close()
-
-        return result
+        with use_session() as session:
+            return session.scalar(select(func.count()).select_from(self.__tablemodel__))
 
 
     @property
@@ -190,18 +297,45 @@ Welder's Certification Repository
 class WelderCertificationRepository(BaseRepository[WelderCertificationModel, WelderCertificationTable]):
     __tablemodel__ = WelderCertificationTable
     __domain_model__ = WelderCertificationModel
+    __keyset__ = ("certification_id",)
 
-    def get_many(self, request: WelderCertificationRequest) -> DBResponse[WelderCertificationModel]:
+    def _select_many(self, request: WelderCertificationRequest) -> Select:
+        return self._filtrate_statement(select(self.__tablemodel__), request)
+
+
+    def get_many_with_full_names(self, request: WelderCertificationRequest) -> list[tuple[str | None, WelderCertificationModel]]:
+        """
+        Certifications with full names of their welders, one joined query
+        """
         with SQLalchemyUnitOfWork() as transaction:
-            stmt = self._filtrate_statement(select(self.__tablemodel__), request)
+            res = transaction.connection.execute(self._select_with_full_names(request)).mappings().all()
 
-            res = transaction.connection.execute(stmt).mappings().all()
+        return [(row["full_name"], WelderCertificationModel.model_validate(row)) for row in res]
 
-        return DBResponse(
-            result=[WelderCertificationModel.model_validate(certification) for certification in res],
-            count=5
+
+    def _select_with_full_names(self, request: WelderCertificationRequest) -> Select:
+        stmt = select(self.__tablemodel__, WelderTable.full_name)\
+            .join(WelderTable, self.__tablemodel__.kleymo == WelderTable.kleymo)\
+            .order_by(self.__tablemodel__.expiration_date, self.__tablemodel__.kleymo)
+
+        return self._filtrate_statement(stmt, request)
+
+
+    def get_certification_dates(self) -> dict[str, tuple[date | None, date | None]]:
+        """
+        Returns expiration and renewal dates of all stored certifications by certification_id
+        """
+        stmt = select(
+            self.__tablemodel__.certification_id,
+            self.__tablemodel__.expiration_date,
+            self.__tablemodel__.renewal_date
         )
 
+        with use_session() as session:
+            return {
+                certification_id: (expiration_date, renewal_date) for certification_id, expiration_date, renewal_date in session.execute(stmt)
+            }
+
     
     def _filtrate_statement(self, stmt: Select, request: WelderCertificationRequest) -> Select:
         if request.expiration_date_before:
@@ -210,6 +344,12 @@ class WelderCertificationRepository(BaseRepository[WelderCertificationModel, Wel
         if request.expiration_date_from:
             stmt = stmt.filter(self.__tablemodel__.expiration_date > request.expiration_date_from)
 
+        # empty whitelist selects nothing
+        if request.names != None:
+            stmt = stmt.filter(
+                self.__tablemodel__.kleymo.in_(select(WelderTable.kleymo).where(WelderTable.full_name.in_(request.names)))
+            )
+
         return stmt
 
 
@@ -223,42 +363,47 @@ Welder Repository
 class WelderRepository(BaseRepository[WelderModel, WelderTable]):
     __tablemodel__ = WelderTable
     __domain_model__ = WelderModel
+    __keyset__ = ("kleymo",)
     certification_repository = WelderCertificationRepository()
 
 
     def get(self, id: Id) -> WelderModel | None:
-        session = get_session()
         stmt = select(self.__tablemodel__).where(
             self.pk == id
         ).options(
             subqueryload(self.__tablemodel__.certifications)
         )
 
-        result = session.execute(stmt).fetchone()
-        if result == None:
-            session.close()
-            return None
-        
-        session.close()
+        with use_session() as session:
+            result = session.execute(stmt).fetchone()
 
-        welder = self.__domain_model__.model_validate(result[0], from_attributes=True)
+            if result == None:
+                return None
 
-        return welder
+            return self.__domain_model__.model_validate(result[0], from_attributes=True)
 
 
-    def get_many(self, request: WelderRequest) -> list[WelderModel]:
-            
-        with SQLalchemyUnitOfWork() as transaction:
+    def _select_many(self, request: WelderRequest) -> Select:
+        stmt = select(self.__tablemodel__).options(
+            selectinload(self.__tablemodel__.certifications)
+        )
 
-            stmt = select(self.__tablemodel__).options(
-                subqueryload(self.__tablemodel__.certifications)
-            )
+        return self._get_many_filtrating(stmt, request)
 
-            stmt = self._get_many_filtrating(stmt, request)
 
-            res = transaction.connection.execute(stmt)
+    def existing_kleymos(self, kleymos: Iterable[str]) -> set[str]:
+        """
+        Returns the part of given kleymos stored in db, one query for the whole set
+        """
+        kleymos = set(kleymos)
 
-        return [WelderModel.model_validate(welder, from_attributes=True) for welder in res.mappings().all()]
+        if kleymos == set():
+            return set()
+
+        stmt = select(self.__tablemodel__.kleymo).where(self.__tablemodel__.kleymo.in_(kleymos))
+
+        with use_session() as session:
+            return set(session.execute(stmt).scalars())
 
 
     def add(self, data: list[WelderModel]) -> None:
@@ -278,6 +423,39 @@ class WelderRepository(BaseRepository[WelderModel, WelderTable]):
             self.certification_repository.delete(welder.certifications)
             self._delete(welder)
 
+
+    def upsert_many(self, data: Iterable[WelderModel], chunk_size: int = 1000, commit_chunks: bool = False) -> dict[str, UpsertResult]:
+        """
+        Welders of a chunk are upserted before their certifications, everything in one transaction
+        or every chunk committed on its own with `commit_chunks`
+        """
+        welders = UpsertResult()
+        certifications = UpsertResult()
+
+        for unit_chunks in self._units(data, chunk_size, commit_chunks):
+            with SQLalchemyUnitOfWork() as transaction:
+                try:
+                    for chunk in unit_chunks:
+                        self._upsert_chunk(transaction.connection, [welder.orm_data for welder in chunk], welders)
+
+                        for certification_chunk in batched([certification for welder in chunk for certification in welder.certifications or []], chunk_size):
+                            self.certification_repository._upsert_chunk(
+                                transaction.connection,
+                                [certification.orm_data for certification in certification_chunk],
+                                certifications
+                            )
+
+                    transaction.commit()
+
+                except:
+                    transaction.rollback()
+                    raise
+
+        return {
+            self.__tablemodel__.__tablename__: welders,
+            self.certification_repository.__tablemodel__.__tablename__: certifications
+        }
+
     
     def _get_many_filtrating(self, select: Select, request: WelderRequest) -> Select:
         if request.names:
@@ -300,32 +478,157 @@ NDT Repository
 class NDTRepository(BaseRepository[WelderNDTModel, NDTTable]):
     __tablemodel__ = NDTTable
     __domain_model__ = WelderNDTModel
+    __keyset__ = ("latest_welding_date", "ndt_id")
+    __keyset_descending__ = True
+    __total_fields__ = [f"{name}_{group}" for group in (1, 2, 3) for name in ("total_weld", "total_ndt", "total_accepted", "total_repair")]
+    __numeric_fields__ = __total_fields__ + ["repair_status_1", "repair_status_2", "repair_status_3"]
+
+    def _select_many(self, request: NDTRequest) -> Select:
+        """
+        Welder is joined only for its name (one row per ndt), certifications are filtered by EXISTS
+        so a welder's certifications never multiply his ndt rows. Ndts of kleymos missing in welder_table are left out
+        """
+        stmt = select(self.__tablemodel__, WelderTable.full_name)\
+            .join(WelderTable, self.__tablemodel__.kleymo == WelderTable.kleymo)
+
+        return self._set_filters(stmt, request)
+
+
+    def _row_to_model(self, row: Row) -> WelderNDTModel:
+        ndt = WelderNDTModel.model_validate(row[0], from_attributes=True)
+        ndt.full_name = row.full_name
+
+        return ndt
+
+
+    def get_latest_per_welder(self, request: NDTRequest, limit: int) -> DBResponse[WelderNDTModel]:
+        """
+        `limit` latest ndts of every welder with repair statuses, welders go in order of their latest ndt.
+        Numbers are returned as floats, missing ones as 0
+        """
+        ranked = self._ranked_ndts(request)
+
+        stmt = select(
+            *[column for column in ranked.c if column.name not in ("rank", "welder_date", "welder_ndt_id")],
+            *self._repair_statuses(ranked)
+        )\
+            .where(ranked.c.rank <= limit)\
+            .order_by(desc(ranked.c.welder_date).nulls_last(), desc(ranked.c.welder_ndt_id).nulls_last(), ranked.c.rank)
+
+        with use_session() as session:
+            result = [WelderNDTModel.model_validate(row) for row in session.execute(stmt).mappings()]
+
+        return DBResponse(count=len(result), result=result)
+
+
+    def get_date_totals(self, request: NDTRequest, limit: int) -> DBResponse[WelderNDTModel]:
+        """
+        Sums of ndt numbers and repair statuses per welding date, computed by db over all filtered ndts.
+        Dates are taken as they first appear in welders order of `get_latest_per_welder`, first `limit` of them, the oldest goes first
+        """
+        ranked = self._ranked_ndts(request)
+        line = func.row_number().over(order_by=(desc(ranked.c.welder_date).nulls_last(), desc(ranked.c.welder_ndt_id).nulls_last(), ranked.c.rank))
+
+        # window functions can't be nested into aggregates, lines are numbered in a subquery first
+        lines = select(ranked.c.latest_welding_date, *[ranked.c[name] for name in self.__total_fields__], line.label("line")).subquery()
+
+        totals = select(
+            lines.c.latest_welding_date,
+            *[func.sum(lines.c[name]).label(name) for name in self.__total_fields__],
+            func.min(lines.c.line).label("first_line")
+        )\
+            .group_by(lines.c.latest_welding_date)\
+            .order_by("first_line")\
+            .limit(limit)\
+            .subquery()
+
+        stmt = select(
+            totals.c.latest_welding_date,
+            *[totals.c[name] for name in self.__total_fields__],
+            *self._repair_statuses(totals)
+        ).order_by(desc(totals.c.first_line))
+
+        with use_session() as session:
+            result = [WelderNDTModel.model_validate(row) for row in session.execute(stmt).mappings()]
+
+        return DBResponse(count=len(result), result=result)
+
+
+    def _ranked_ndts(self, request: NDTRequest) -> Subquery:
+        """
+        Filtered ndts with numbers cast to double precision, rank of ndt among welder's ndts (latest first, undated last)
+        and date and id of welder's latest ndt
+        """
+        ndt = self.__tablemodel__
+        order_by = (desc(ndt.latest_welding_date).nulls_last(), desc(ndt.ndt_id).nulls_last())
+        welder_window = {"partition_by": ndt.kleymo, "order_by": order_by}
+
+        stmt = select(
+            *[column for column in ndt.__table__.c if column.name not in self.__numeric_fields__],
+            WelderTable.full_name,
+            *[func.coalesce(cast(func.nullif(ndt.__table__.c[name], ""), Double), 0.).label(name) for name in self.__total_fields__],
+            func.row_number().over(**welder_window).label("rank"),
+            func.first_value(ndt.latest_welding_date).over(**welder_window).label("welder_date"),
+            func.first_value(ndt.ndt_id).over(**welder_window).label("welder_ndt_id")
+        ).join(WelderTable, ndt.kleymo == WelderTable.kleymo)
+
+        return self._set_filters(stmt, request).subquery()
+
+
+    def _repair_statuses(self, source: Subquery) -> list[ColumnElement[float]]:
+        """
+        Percent of not accepted ndt, 0 when there was no ndt
+        """
+        return [
+            case(
+                (source.c[f"total_ndt_{group}"] == 0, 0.),
+                else_=100 - (source.c[f"total_accepted_{group}"] / source.c[f"total_ndt_{group}"]) * 100
+            ).label(f"repair_status_{group}") for group in (1, 2, 3)
+        ]
+
+
+    def copy_many(self, data: Iterable[WelderNDTModel]) -> dict[str, UpsertResult]:
+        """
+        Bulk load: rows are streamed with COPY into temporary staging table and merged into ndt_table
+        by one INSERT ... SELECT ... ON CONFLICT (ndt_id) statement. The last copied row of a duplicated ndt_id wins
+        """
+        columns = list(self.__tablemodel__.__table__.c.keys())
+        staging = Table(
+            "ndt_staging",
+            MetaData(),
+            *[TableColumn(column.name, column.type) for column in self.__tablemodel__.__table__.c],
+            TableColumn("line", BigInteger, Identity()),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP"
+        )
+        result = UpsertResult()
+
+        with SQLalchemyUnitOfWork() as transaction:
+            try:
+                staging.create(transaction.connection)
+                copy_rows(transaction.connection, staging, columns, (model.orm_data for model in data))
 
-    def get_many(self, request: NDTRequest) -> DBResponse[WelderNDTModel]:
-        session = get_session()
+                source = select(*[staging.c[column] for column in columns])\
+                    .distinct(staging.c.ndt_id)\
+                    .order_by(staging.c.ndt_id, desc(staging.c.line))
 
-        stmt = select(self.__tablemodel__, WelderTable.full_name, WelderCertificationTable.certification_number)\
-            .join(WelderTable, self.__tablemodel__.kleymo == WelderTable.kleymo)\
-            .join(WelderCertificationTable, self.__tablemodel__.kleymo == WelderCertificationTable.kleymo)\
-            .order_by(desc(self.__tablemodel__.latest_welding_date))
-        
+                staged = transaction.connection.scalar(select(func.count(staging.c.ndt_id.distinct())))
 
-        filtrated_stmt = self._set_filters(stmt, request)
-        res = []
+                stmt = self._on_conflict_update(pg_insert(self.__tablemodel__).from_select(columns, source))
+                inserted = [row[0] for row in transaction.connection.execute(stmt)]
 
-        for el in session.execute(filtrated_stmt).mappings().all():
-            ndt_table_dict = el["NDTTable"].__dict__
-            ndt_table_dict["full_name"] = el["full_name"]
+                staging.drop(transaction.connection)
+                transaction.commit()
 
-            res.append(
-                WelderNDTModel.model_validate(ndt_table_dict)
-            )
+            except:
+                transaction.rollback()
+                raise
 
-        
-        return DBResponse(
-            result=res,
-            count=len(list(session.execute(stmt)))
-        )
+        result.inserted = sum(inserted)
+        result.updated = len(inserted) - result.inserted
+        result.unchanged = staged - len(inserted)
+
+        return {self.__tablemodel__.__tablename__: result}
 
 
     def _set_filters(self, stmt: Select, request: NDTRequest) -> Select:
@@ -348,9 +651,14 @@ class NDTRepository(BaseRepository[WelderNDTModel, NDTTable]):
             stmt = stmt.filter(self.__tablemodel__.latest_welding_date >= request.date_from)
 
         if request.names:
-            stmt = stmt.filter(self.__tablemodel__.full_name.in_(request.names))
+            stmt = stmt.filter(WelderTable.full_name.in_(request.names))
 
         if request.certification_numbers:
-            stmt = stmt.filter(self.__tablemodel__.certification_number.in_(request.certification_numbers))
+            stmt = stmt.filter(
+                exists().where(
+                    WelderCertificationTable.kleymo == self.__tablemodel__.kleymo,
+                    WelderCertificationTable.certification_number.in_(request.certification_numbers)
+                )
+            )
 
         return stmt
@@ -1,7 +1,19 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, DeclarativeBase
+from functools import cache
 
-from settings import USER, DATABASE_PASSWORD, PORT, HOST, DATABASE_NAME
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, DeclarativeBase, sessionmaker
+
+from settings import (
+    USER,
+    DATABASE_PASSWORD,
+    PORT,
+    HOST,
+    DATABASE_NAME,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT
+)
 
 
 DB_URL = "postgresql+psycopg2://{0}:{1}@{2}:{3}/{4}".format(USER, DATABASE_PASSWORD, HOST, PORT, DATABASE_NAME)
@@ -11,9 +23,27 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(DB_URL)
+@cache
+def get_engine() -> Engine:
+    """
+    Engine is created on first use, importing db modules never connects to the database.
+    Schema is created and migrated explicitly by init-db / migrate-db commands
+    """
+    connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"} if DB_STATEMENT_TIMEOUT else {}
+
+    return create_engine(
+        DB_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+
+@cache
+def _get_session_factory() -> sessionmaker[Session]:
+    return sessionmaker(get_engine())
 
-Base.metadata.create_all(engine)
 
 def get_session() -> Session:
-    return Session(engine)
+    return _get_session_factory()()
@@ -0,0 +1,220 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import get_ident
+from time import perf_counter
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from src.db.session import get_engine, get_session
+
+
+"""
+=======================================================================================================
+Metrics
+=======================================================================================================
+"""
+
+
+@dataclass
+class DBMetrics:
+    statements: int = 0
+    sql_time: float = 0.
+
+
+    def __str__(self) -> str:
+        return f"statements: {self.statements}, sql time: {self.sql_time:.3f}s"
+
+
+"""
+=======================================================================================================
+Command scope
+=======================================================================================================
+"""
+
+
+class CommandScope:
+    """
+    One session for the whole command run, closed on exit. The session doesn't hold a transaction between units:
+    the outermost unit of work is a transaction of its own and units opened inside it are its savepoints,
+    reads outside of units end their transaction as soon as they are done, so a long command never keeps
+    its connection idle in transaction. Statements and sql time are counted while the scope is open.
+
+    The scope belongs to the thread that opened it: a session can't be shared between threads, so worker threads
+    (threading.Thread, ThreadPoolExecutor, asyncio.to_thread even though it copies the context) are outside of it,
+    their units open own sessions and commit on their own, and their statements aren't counted in metrics
+    """
+
+    def __init__(self) -> None:
+        self.metrics = DBMetrics()
+        self.thread_id = get_ident()
+        self.units = 0
+        self._session: Session | None = None
+
+
+    @property
+    def session(self) -> Session:
+        """
+        Opened on first use: commands that don't touch db (and --help) never create the engine
+        """
+        if self._session == None:
+            event.listen(get_engine(), "before_cursor_execute", self._before_execute)
+            event.listen(get_engine(), "after_cursor_execute", self._after_execute)
+
+            self._session = get_session()
+
+        return self._session
+
+
+    def __enter__(self) -> "CommandScope":
+        self.thread_id = get_ident()
+        self._token = _current_scope.set(self)
+
+        return self
+
+
+    def __exit__(self, exc_type, *args) -> None:
+        try:
+            if self._session != None:
+                if exc_type == None:
+                    self._session.commit()
+                else:
+                    self._session.rollback()
+        finally:
+            if self._session != None:
+                self._session.close()
+
+                event.remove(get_engine(), "before_cursor_execute", self._before_execute)
+                event.remove(get_engine(), "after_cursor_execute", self._after_execute)
+
+            _current_scope.reset(self._token)
+
+
+    def begin(self) -> SessionTransaction:
+        """
+        Transaction of the outermost unit, savepoint of a nested one
+        """
+        if self.units == 0:
+            self.release()
+            transaction = self.session.begin()
+        else:
+            transaction = self.session.begin_nested()
+
+        self.units += 1
+
+        return transaction
+
+
+    def end(self) -> None:
+        self.units -= 1
+
+
+    def release(self) -> None:
+        """
+        Ends the transaction begun by reads outside of units, the connection goes back to the pool
+        """
+        if self.units == 0 and self._session != None and self._session.in_transaction():
+            self._session.commit()
+
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if get_ident() != self.thread_id:
+            return
+
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if get_ident() != self.thread_id:
+            return
+
+        self.metrics.statements += 1
+        self.metrics.sql_time += perf_counter() - conn.info["query_started"].pop()
+
+
+_current_scope: ContextVar[CommandScope | None] = ContextVar("command_scope", default=None)
+
+
+def current_scope() -> CommandScope | None:
+    """
+    Scope of the command in the thread that opened it, None in other threads
+    """
+    scope = _current_scope.get()
+
+    return scope if scope != None and scope.thread_id == get_ident() else None
+
+
+@contextmanager
+def use_session() -> Iterator[Session]:
+    """
+    Session of the current command scope, or a fresh session closed on exit outside of a scope
+    """
+    scope = current_scope()
+
+    if scope != None:
+        try:
+            yield scope.session
+        finally:
+            scope.release()
+
+        return
+
+    session = get_session()
+
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+"""
+=======================================================================================================
+Unit of Work
+=======================================================================================================
+"""
+
+
+class SQLalchemyUnitOfWork:
+    """
+    Inside a command scope the unit uses the command's session: the outermost unit is a transaction,
+    a unit opened inside another one is a savepoint (begin_nested), so its rollback discards only its own rows.
+    Outside of a scope the unit owns a session and closes it on exit. A unit left without commit or rollback is committed, or rolled back on error.
+    Rows written with core statements aren't seen by loaded orm objects, so the shared session is expired after a unit
+    """
+
+    def __enter__(self):
+        scope = current_scope()
+
+        self._owner = scope == None
+        self._scope = scope
+        self.session = get_session() if self._owner else scope.session
+        self.transaction: SessionTransaction = self.session.begin() if self._owner else scope.begin()
+        self.connection = self.session.connection()
+        self.engine = self.connection.engine
+
+        return self
+
+
+    def __exit__(self, exc_type, *args, **kwargs):
+        try:
+            if self.transaction.is_active:
+                if exc_type == None:
+                    self.transaction.commit()
+                else:
+                    self.transaction.rollback()
+        finally:
+            if self._owner:
+                self.session.close()
+            else:
+                self._scope.end()
+                self.session.expire_all()
+
+
+    def commit(self) -> None:
+        self.transaction.commit()
+
+
+    def rollback(self) -> None:
+        self.transaction.rollback()
@@ -1,4 +1,4 @@
-from .db_objects import WelderCertificationRequest, WelderRequest, NDTRequest, DBRequest, DBResponse
+from .db_objects import WelderCertificationRequest, WelderRequest, NDTRequest, DBRequest, DBResponse, UpsertResult
 from .welder_certification_model import WelderCertificationModel
 from .base_domain_model import BaseDomainModel
 from .welder_model import WelderModel
@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Any, Sequence
 from datetime import date
 
 from pydantic import BaseModel
@@ -9,8 +9,13 @@ from src.domain.base_domain_model import BaseDomainModel
 
 
 class DBRequest(BaseModel):
-    limit: int = 100
+    """
+    :limit - page size, all rows when None
+    :after - keyset cursor, `DBResponse.cursor` of the previous page
+    """
+    limit: int | None = None
     offset: int = 0
+    after: Sequence[Any] | None = None
 
 
 class WelderRequest(DBRequest):
@@ -22,6 +27,7 @@ class WelderRequest(DBRequest):
 class WelderCertificationRequest(DBRequest):
     expiration_date_from: date | str | None = None
     expiration_date_before: date | str | None = None
+    names: Sequence[str] | None = None
 
 
 class NDTRequest(DBRequest):
@@ -38,3 +44,14 @@ class NDTRequest(DBRequest):
 class DBResponse[Model:BaseDomainModel](BaseModel):
     count: int
     result: Sequence[Model]
+    cursor: Sequence[Any] | None = None
+
+
+class UpsertResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+    def __str__(self) -> str:
+        return f"inserted: {self.inserted}, updated: {self.updated}, unchanged: {self.unchanged}"
@@ -18,7 +18,7 @@ class WelderNDTModel(BaseDomainModel):
     comp: str | None = Field(default=None)
     subcon: str | None = Field(default=None)
     project: str | None = Field(default=None)
-    latest_welding_date: date = Field(default=None)
+    latest_welding_date: date | None = Field(default=None)
     total_weld_1: float | None = Field(default=None)
     total_ndt_1: float | None = Field(default=None)
     total_accepted_1: float | None = Field(default=None)
@@ -38,16 +38,19 @@ class WelderNDTModel(BaseDomainModel):
 
 
     def set_id(self) -> None:
+        welding_date = self.latest_welding_date.strftime("%Y-%m-%d") if self.latest_welding_date != None else ""
+
         self.ndt_id = sub(
             r"\W",
             "",
-            string=f"{self.kleymo}{self.comp}{self.subcon}{self.project}{self.latest_welding_date.strftime("%Y-%m-%d")}".lower()
+            string=f"{self.kleymo}{self.comp}{self.subcon}{self.project}{welding_date}".lower()
         )
 
 
     @field_validator("latest_welding_date")
     def validate_latest_welding_date(cls, v):
-        if type(v) != date or v == None:
+        # ndt rows without welding date are stored with null date
+        if v != None and type(v) != date:
             raise ValueError("latest_welding_date must be date type")
         
         return v
@@ -1,40 +1,83 @@
-from typing import Literal
-from json import load
+from typing import Literal, Iterator
 
 from click import Command, Option, echo
 
 from src.db.repository import WelderRepository
+from src.db.migrations import Migrator
+from src.db.session import get_engine
+from src.services.utils import iter_jsonl_models
 from src.domain import WelderModel
-from settings import WELDERS_DATA_JSON_PATH
+from settings import WELDERS_DATA_JSONL_PATH
 
 
 class ManageWelderDataCommand(Command):
+    """
+    With --follow welders are loaded while parse-personal is still writing them: add/update/delete commit
+    every welder on its own, upsert commits every chunk of `follow_batch_size` welders
+    """
+
+    follow_batch_size = 1000
+
     def __init__(self) -> None:
         name = "manage-welder-data"
         self.repo = WelderRepository()
 
-        mode_option = Option(["--mode", "-m"], type=str, help="a-add\n\nu-update\n\nd-delete")
+        mode_option = Option(["--mode", "-m"], type=str, help="a-add\n\nu-update\n\nd-delete\n\ns-upsert (insert new, update changed)")
+        follow_option = Option(["--follow"], is_flag=True, help="keep reading welders while parse-personal is still writing them")
 
-        super().__init__(name=name, params=[mode_option], callback=self.execute)
+        super().__init__(name=name, params=[mode_option, follow_option], callback=self.execute)
 
 
-    @property
-    def _welders(self) -> list[WelderModel]:
-        return [WelderModel.model_validate(welder_dict) for welder_dict in load(open(WELDERS_DATA_JSON_PATH, "r", encoding="utf-8"))]
+    def _welders(self, follow: bool = False) -> Iterator[WelderModel]:
+        return iter_jsonl_models(WELDERS_DATA_JSONL_PATH, WelderModel, follow)
 
 
-    def execute(self, mode: Literal["a", "u", "d"]) -> None:
+    def execute(self, mode: Literal["a", "u", "d", "s"], follow: bool = False) -> None:
         mode = mode.lower()
 
         match mode:
             case "a":
-                self.repo.add(self._welders)
+                self.repo.add(self._welders(follow))
 
             case "u":
-                self.repo.update(self._welders)
+                self.repo.update(self._welders(follow))
 
             case "d":
-                self.repo.delete(self._welders)
+                self.repo.delete(self._welders(follow))
+
+            case "s":
+                for table, result in self.repo.upsert_many(self._welders(follow), chunk_size=self.follow_batch_size, commit_chunks=follow).items():
+                    echo(f"{table}: {result}")
             
             case _:
                 echo("Invalid mode")
+
+
+class MigrateDBCommand(Command):
+    """
+    Also registered as init-db: migrations create the schema of an empty database
+    """
+
+    def __init__(self) -> None:
+        name = "migrate-db"
+
+        pending_option = Option(["--pending"], is_flag=True, help="show pending migrations without applying them")
+
+        super().__init__(name=name, params=[pending_option], callback=self.execute)
+
+
+    def execute(self, pending: bool = False) -> None:
+        migrator = Migrator(get_engine())
+
+        if pending:
+            for migration in migrator.pending():
+                echo(f"{migration.version} {migration.description}")
+            return
+
+        applied = migrator.migrate()
+
+        for migration in applied:
+            echo(f"applied {migration.version} {migration.description}")
+
+        if applied == []:
+            echo("Database is up to date")
@@ -3,7 +3,7 @@ from typing import Union
 
 from src.db.repository import WelderCertificationRepository, WelderRepository
 from src.domain import WelderCertificationModel, WelderModel
-from settings import WELDERS_DATA_JSON_PATH
+from settings import WELDERS_DATA_JSONL_PATH
 
 
 class WelderDBService:
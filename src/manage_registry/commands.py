@@ -1,14 +1,16 @@
 from pathlib import Path
+from time import perf_counter
 import json
 import os
 import typing as t
 
 from click import Command, Option
 
-from settings import NDT_TABLES_FOLDER_PATH, SEARCH_VALUES_FILE, WELDERS_DATA_JSON_PATH
+from settings import NDT_TABLES_FOLDER_PATH, SEARCH_VALUES_FILE, WELDERS_DATA_JSONL_PATH
 from .parse_ndt_report_service import NDTReportParser
 from .manage_welder_registry_service import WelderRegistryManager
 from src.db.repository import NDTRepository, WelderRepository
+from src.services.utils import iter_jsonl_models
 from src.domain import WelderNDTModel, WelderModel
 
 
@@ -50,13 +52,20 @@ class ManageWelderRegistryCommand(Command):
 
 
     def _read_welder_json_file(self) -> list[WelderModel]:
-        with open(WELDERS_DATA_JSON_PATH, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            file.close()
+        """
+        One welder may occupy several lines of the file (one per search value), they are merged by kleymo
+        """
+        welders: dict[str, WelderModel] = {}
+
+        for welder in iter_jsonl_models(WELDERS_DATA_JSONL_PATH, WelderModel):
+            if welder.kleymo in welders:
+                merged = welders[welder.kleymo]
+                merged.certifications = (merged.certifications or []) + (welder.certifications or [])
+                continue
+
+            welders[welder.kleymo] = welder
 
-        return [
-            WelderModel.model_validate(el) for el in data
-        ]
+        return list(welders.values())
 
 
 class ParseNDTReport(Command):
@@ -64,11 +73,12 @@ class ParseNDTReport(Command):
         name = "parse-ndt-report"
 
         folder_option = Option(["--folder"], type=str)
+        bulk_option = Option(["--bulk"], is_flag=True, help="load rows with COPY through staging table")
 
-        super().__init__(name=name, params=[folder_option], callback=self.execute)
+        super().__init__(name=name, params=[folder_option, bulk_option], callback=self.execute)
 
 
-    def execute(self, folder: str) -> None:
+    def execute(self, folder: str, bulk: bool = False) -> None:
         path = f"{NDT_TABLES_FOLDER_PATH}/{folder}"
         if not os.path.exists(path):
             raise FileNotFoundError(f"folder {folder} doesn't exists")
@@ -78,32 +88,41 @@ class ParseNDTReport(Command):
 
         files = [file for file in os.listdir(path) if file.endswith(".xlsx")]
         ndts = []
+        started = perf_counter()
 
         for file in files:
             ndts += parser.parse(f"{path}/{file}")
 
-        if not self._check_welders_in_db(ndts):
-            print("Not all welders in db")
-            self._add_kleymo_to_search_settings(ndts)
+        parsed = perf_counter()
+        print(f"Parsed {len(ndts)} rows from {len(files)} files in {parsed - started:.2f}s")
+
+        missing_kleymos = self._get_missing_kleymos(ndts)
+
+        if missing_kleymos:
+            print(f"Not all welders in db, missing: {len(missing_kleymos)}")
+            self._add_kleymo_to_search_settings(missing_kleymos)
             return 
-        
-        repo.add(ndts)
+
+        checked = perf_counter()
+        print(f"Welders checked in {checked - parsed:.2f}s")
+
+        results = repo.copy_many(ndts) if bulk else repo.upsert_many(ndts)
+
+        for table, result in results.items():
+            print(f"{table}: {result}")
+
+        print(f"Loaded in {perf_counter() - checked:.2f}s")
 
         
-    def _check_welders_in_db(self, ndts: list[WelderNDTModel]) -> bool:
-        repo = WelderRepository()
-        for el in ndts:
-            if not repo.get(el.kleymo):
-                return False
+    def _get_missing_kleymos(self, ndts: list[WelderNDTModel]) -> list[str]:
+        kleymos = {ndt.kleymo for ndt in ndts}
 
-        return True
+        return sorted(kleymos - WelderRepository().existing_kleymos(kleymos))
     
 
-    def _add_kleymo_to_search_settings(self, ndts: list[WelderNDTModel]) -> None:
+    def _add_kleymo_to_search_settings(self, kleymos: list[str]) -> None:
         search_settings = json.load(open(SEARCH_VALUES_FILE, "r", encoding="utf-8"))
 
-        kleymos = [ndt.kleymo for ndt in ndts]
-
         search_settings["personal_naks_parsing"]["search_values"] = kleymos
 
         with open(SEARCH_VALUES_FILE, "w", encoding="utf-8") as file:
@@ -17,7 +17,7 @@ from email.mime.text import MIMEText
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
-from src.db.repository import WelderCertificationRepository, WelderRepository
+from src.db.repository import WelderCertificationRepository
 from src.domain import WelderCertificationRequest, WelderCertificationModel
 from src.services.excel_service import ExcelService
 from settings import SCOPES, STATIC_DIR
@@ -25,7 +25,6 @@ from settings import SCOPES, STATIC_DIR
 
 class WelderCertificationExpirationNotificationService:
     certification_repo = WelderCertificationRepository()
-    welder_repo = WelderRepository()
 
     def _create_notification_attachment(self) -> None:
         wb = Workbook()
@@ -49,19 +48,12 @@ class WelderCertificationExpirationNotificationService:
 
         body_rows = []
 
-        names = self._load_names()
-
-        for e, certification in enumerate(self._get_certifications(), start=1):
-            welder = self.welder_repo.get(certification.kleymo)
-
-            if welder.full_name not in names:
-                continue
-
+        for e, (full_name, certification) in enumerate(self._get_certifications(), start=1):
             body_rows.append(
                     ExcelService.data_to_cells(
                     (
                         e,
-                        welder.full_name,
+                        full_name,
                         certification.kleymo,
                         certification.certification_number,
                         certification.company,
@@ -83,16 +75,15 @@ class WelderCertificationExpirationNotificationService:
         wb.save(f"{STATIC_DIR}/notification_attachment.xlsx")
 
 
-    def _get_certifications(self) -> list[WelderCertificationModel]:
-        res = self.certification_repo.get_many(
+    def _get_certifications(self) -> list[tuple[str | None, WelderCertificationModel]]:
+        return self.certification_repo.get_many_with_full_names(
             WelderCertificationRequest(
                 expiration_date_from=datetime.now().date(),
-                expiration_date_before=datetime.now().date() + timedelta(days=60)
+                expiration_date_before=datetime.now().date() + timedelta(days=60),
+                names=self._load_names()
             )
         )
 
-        return res.result
-
 
     def _load_names(self) -> list[str]:
         return json.load(
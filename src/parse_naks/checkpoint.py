@@ -0,0 +1,78 @@
+from threading import Lock
+from pathlib import Path
+import json
+import os
+
+from pydantic import BaseModel
+
+from src.parse_naks.types import Model
+
+
+class RunCheckpoint:
+    """
+    Append-only journal of parse-personal run (JSONL)
+
+    Every completed search value is written as one line {"value": ..., "data": [...]} and synced to disk,
+    so a crashed run can be resumed: completed values are skipped and their stored results are merged.
+    A line cut by a crash is ignored on load
+    """
+
+    def __init__(self, path: str | Path, model: type[BaseModel]) -> None:
+        self.path = Path(path)
+        self.model = model
+        self._lock = Lock()
+        self._file = None
+
+
+    def load(self) -> tuple[set[str], list[Model]]:
+        values: set[str] = set()
+        results: list[Model] = []
+
+        if not self.path.exists():
+            return (values, results)
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                values.add(record["value"])
+                results += [self.model.model_validate(data) for data in record["data"]]
+
+        return (values, results)
+
+
+    def open(self, resume: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+        if resume and self._file.tell() > 0 and not self._ends_with_newline():
+            self._file.write("\n")
+
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+
+            return file.read(1) == b"\n"
+
+
+    def record(self, value: str, models: list[Model]) -> None:
+        line = json.dumps(
+            {"value": value, "data": [model.model_dump(mode="json") for model in models]},
+            ensure_ascii=False
+        )
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
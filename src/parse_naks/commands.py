@@ -1,20 +1,34 @@
-from os import listdir
-from time import sleep
+from os import listdir, cpu_count
 from typing import (
     Sequence,
     TypeAlias
 )
-import json
 
-from click import Command, Option
+from click import Command, Option, Choice
 
 from src.parse_naks.extractors import IExtractor, WelderDataExtractor, EngineerDataExtractor
-from settings import SEARCH_VALUES_FILE, GROUPS_FOLDER, WELDERS_DATA_JSON_PATH
-from src.services.utils import ThreadProgressBarQueue
-from src.parse_naks.workers import PersonalNaksWorker
+from settings import (
+    SEARCH_VALUES_FILE,
+    SKIPED_VALUES_FILE,
+    GROUPS_FOLDER,
+    WELDERS_DATA_JSONL_PATH,
+    NAKS_CACHE_DIR,
+    NAKS_CACHE_TTLS,
+    NAKS_CACHE_MAX_SIZE,
+    PARSE_PERSONAL_CHECKPOINT_PATH
+)
+from src.parse_naks.runtime import SearchValuesQueue, QueueStatsColumn
+from src.parse_naks.checkpoint import RunCheckpoint
+from src.parse_naks.output import WelderDataStream
+from src.parse_naks.workers import PersonalNaksWorker, AsyncPersonalNaksWorker
+from src.parse_naks.pipeline import ExtractionPipeline
+from src.parse_naks.rate_limiter import AdaptiveRateLimiter, RateColumn
+from src.parse_naks.page_cache import PageCache
+from src.parse_naks.incremental import KnownCertificationsFilter, IncrementalWelderSaver
+from src.db.repository import WelderCertificationRepository
 from src.services.utils import load_json
 from src.parse_naks.sorter import Sorter
-from src.parse_naks.types import Model
+from src.parse_naks.types import Model, PageFilter, WelderData
 
 
 Name: TypeAlias = str
@@ -28,9 +42,16 @@ class ParsePersonalCommand(Command):
         mode_option = Option(["--mode", "-m"], type=str, default="-", help="modes: w - welder, e - engineer")
         file_option = Option(["--file"], type=bool, help="get search values from search_settings.json file")
         folder_option = Option(["--folder"], type=str, help="get folder's names in folder as search_values")
-        threads_option = Option(["--threads", "-t"], type=int, default=1, help="amount threads")
-
-        super().__init__(name=name, params=[mode_option, file_option, folder_option, threads_option], callback=self.execute)
+        threads_option = Option(["--threads", "-t"], type=int, default=1, help="amount threads (concurrent searches for async engine)")
+        engine_option = Option(["--engine"], type=Choice(["thread", "async", "pipeline"]), default="thread", help="thread - worker threads, async - asyncio with shared connection pool, pipeline - fetcher threads with process pool extraction")
+        processes_option = Option(["--processes", "-p"], type=int, default=None, help="amount extraction processes for pipeline engine (cpu count by default)")
+        rps_option = Option(["--rps"], type=float, default=2., help="requests per second budget to naks.ru shared by all workers")
+        cache_option = Option(["--cache"], is_flag=True, help="read and store pages in page cache, cached pages are used without requests until their ttl (24h search, 30 days detail) ends")
+        cache_only_option = Option(["--cache-only"], is_flag=True, help="replay pages from page cache without network requests")
+        incremental_option = Option(["--incremental"], is_flag=True, help="fetch only new or changed certifications and upsert them into db (welder mode)")
+        resume_option = Option(["--resume"], is_flag=True, help="skip search values completed by previous run and merge its results")
+
+        super().__init__(name=name, params=[mode_option, file_option, folder_option, threads_option, engine_option, processes_option, rps_option, cache_option, cache_only_option, incremental_option, resume_option], callback=self.execute)
     
     
     def _read_search_values_file(self) -> Sequence[Name | Kleymo]:
@@ -48,51 +69,118 @@ class ParsePersonalCommand(Command):
                 return EngineerDataExtractor()
             
 
-    def _fill_queue(self, queue: ThreadProgressBarQueue, file: str | None, folder: str | None) -> None:
+    def _fill_queue(self, queue: SearchValuesQueue, file: str | None, folder: str | None, completed: set[str]) -> None:
 
         if file:
             for value in self._read_search_values_file():
-                queue.put(value)
+                if value not in completed:
+                    queue.put_value(value)
 
         if folder:
             for value in [value for value in listdir(f"{GROUPS_FOLDER}/{folder}")]:
-                queue.put(value)
+                if value not in completed:
+                    queue.put_value(value)
 
         
-    def _init_threads(self, threads: int, queue: ThreadProgressBarQueue, stack: list[Model], extractor: IExtractor) -> None:
+    def _set_cache(self, cache: bool, cache_only: bool) -> PageCache | None:
+        if not cache and not cache_only:
+            return None
+
+        return PageCache(NAKS_CACHE_DIR, NAKS_CACHE_TTLS, NAKS_CACHE_MAX_SIZE, offline=cache_only)
+
+
+    def _init_threads(self, threads: int, queue: SearchValuesQueue, stack: list[Model], extractor: IExtractor, limiter: AdaptiveRateLimiter, cache: PageCache | None, page_filter: PageFilter | None) -> None:
         ths: list[PersonalNaksWorker] = []
 
         for _ in range(threads):
-            thread = PersonalNaksWorker(queue, stack, extractor)
+            thread = PersonalNaksWorker(queue, extractor, limiter, cache, page_filter)
 
             thread.start()
             ths.append(thread)
 
         for th in ths:
             th.join()
-        sleep(.1)
+            stack += th.results
+
 
+    def _run_async(self, threads: int, queue: SearchValuesQueue, stack: list[Model], extractor: IExtractor, limiter: AdaptiveRateLimiter, cache: PageCache | None, page_filter: PageFilter | None) -> None:
+        stack += AsyncPersonalNaksWorker(queue, extractor, limiter, concurrency=threads, cache=cache, page_filter=page_filter).run()
 
-    def execute(self, mode: str, threads: int, file: str | None = None, folder: str | None = None) -> None:
-        queue = ThreadProgressBarQueue()
-        self._fill_queue(queue, file, folder)
 
-        stack: list[Model] = []
+    def _run_pipeline(self, threads: int, processes: int | None, queue: SearchValuesQueue, stack: list[Model], extractor: IExtractor, limiter: AdaptiveRateLimiter, cache: PageCache | None, page_filter: PageFilter | None) -> None:
+        pipeline = ExtractionPipeline(queue, extractor, limiter, fetchers=threads, processes=processes or cpu_count(), cache=cache, page_filter=page_filter)
+
+        stack += pipeline.run()
+
+
+    def _save_failed_values(self, queue: SearchValuesQueue) -> None:
+        if queue.failed == []:
+            return
+
+        with open(SKIPED_VALUES_FILE, "w", encoding="utf-8") as file:
+            file.write("\n".join(queue.failed))
 
+        print(f"Failed values ({len(queue.failed)}) saved to {SKIPED_VALUES_FILE}")
+
+
+    def execute(self, mode: str, threads: int, engine: str = "thread", processes: int | None = None, rps: float = 2., cache: bool = False, cache_only: bool = False, incremental: bool = False, resume: bool = False, file: str | None = None, folder: str | None = None) -> None:
         mode = mode.lower()
 
         if mode not in ["w", "e"]:
             print("Invalid mode")
             return
 
-        extractor = self._set_extractor(mode)
-        queue.init_progress_bar()
-        self._init_threads(threads, queue, stack, extractor)
+        if incremental and mode != "w":
+            print("Incremental mode supports only welders")
+            return
+
+        checkpoint = RunCheckpoint(PARSE_PERSONAL_CHECKPOINT_PATH, WelderData)
+        completed, stack = checkpoint.load() if resume else (set(), [])
+        checkpoint.open(resume)
 
-        sorter = Sorter()
+        output = None if incremental else WelderDataStream(WELDERS_DATA_JSONL_PATH)
 
-        stack = [el.model_dump(mode="json") for el in sorter.sort_welder_data(stack)]
+        if output:
+            output.open()
+            output.write(stack)
+            stack = []
+
+        queue = SearchValuesQueue(sinks=[sink for sink in [checkpoint, output] if sink], keep_results=incremental)
+        self._fill_queue(queue, file, folder, completed)
+
+        known = WelderCertificationRepository().get_certification_dates() if incremental else None
+        page_filter = KnownCertificationsFilter(known) if incremental else None
+
+        extractor = self._set_extractor(mode)
+        limiter = AdaptiveRateLimiter(rps)
+        cache = self._set_cache(cache, cache_only)
+        queue.init_progress_bar("[blue]rate: ", RateColumn(limiter), QueueStatsColumn(queue))
+        queue.open(threads)
+
+        try:
+            match engine:
+                case "async":
+                    self._run_async(threads, queue, stack, extractor, limiter, cache, page_filter)
+                case "pipeline":
+                    self._run_pipeline(threads, processes, queue, stack, extractor, limiter, cache, page_filter)
+                case _:
+                    self._init_threads(threads, queue, stack, extractor, limiter, cache, page_filter)
+        finally:
+            queue.stop_progress_bar()
+            checkpoint.close()
+
+            if cache:
+                cache.close()
+
+            if output:
+                output.close()
+
+        # a worker error stops the run, checkpoint keeps values completed before it for --resume
+        queue.raise_error()
+        self._save_failed_values(queue)
+
+        if output:
+            return
 
-        with open(WELDERS_DATA_JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump(stack, file, indent=4, ensure_ascii=False)
-            file.close()
+        IncrementalWelderSaver().save(Sorter().sort_welder_data(stack))
+        print(f"New or changed certifications: {len(stack)}")
@@ -1,12 +1,13 @@
 from abc import ABC, abstractmethod
 from re import search, findall
+from functools import lru_cache
 from datetime import date
 from typing import Generic
 
 from lxml import html
 
 from src.services.utils import str_to_date
-from src.parse_naks.types import WelderData, Model, Link
+from src.parse_naks.types import WelderData, Model, Link, Row
 
 
 """
@@ -19,28 +20,31 @@ Extractors
 class IExtractor(ABC, Generic[Model]):
 
     @abstractmethod
-    def extract(self, main_page: str, additional_pages: list[str]) -> list[Model]: ...
+    def extract(self, main_page: str, additional_pages: list[str | None]) -> list[Model]: ...
 
 
     @staticmethod
-    def extract_links(welder_page: str) -> list[Link]:
-        tree = html.fromstring(welder_page)
-        links = tree.xpath("//tr[@bgcolor]/td[13]/a/@onclick")
-        links = [search(r"/[\w]+/[\w]+/detail.php\?ID=[\w\W]+", link)[0].replace('"', '').split(",")[0] for link in links]
-
-        links = [f"https://naks.ru{link}" for link in links]
-
-        return links
+    def extract_links(welder_page: str) -> list[Link | None]:
+        return list(WelderDataExtractor.extract_page(welder_page)[1])
 
 
 class WelderDataExtractor(IExtractor):
-    
-    def extract(self, main_page: str, additional_pages: list[str]) -> list[WelderData]:
+    text_cells = (("full_name", 0), ("kleymo", 1), ("company", 2), ("job_title", 3), ("certification_number", 4), ("insert", 5))
+    date_cells = (("certification_date", 8), ("expiration_date", 9), ("renewal_date", 10))
+    link_cell = 12
+
+    def extract(self, main_page: str, additional_pages: list[str | None]) -> list[WelderData]:
+        """
+        additional pages that weren't fetched (None) are skipped with their rows
+        """
         result = []
 
         main_page_data = self._extract_data_from_welder_page(main_page)
 
         for page_index in range(len(additional_pages)):
+            if additional_pages[page_index] == None:
+                continue
+
             additional_page_data = self._extract_data_from_welder_certification_page(
                 additional_pages[page_index]
             )
@@ -54,49 +58,112 @@ class WelderDataExtractor(IExtractor):
         return result
 
 
-    def _extract_data_from_welder_page(self, welder_page: str) -> list[dict[str, str | date | None]]:
-        result = []
+    def extract_rows(self, main_page: str) -> list[Row]:
+        return self._extract_data_from_welder_page(main_page)
+
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def extract_page(welder_page: str) -> tuple[tuple[Row, ...], tuple[Link | None, ...]]:
+        """
+        Parses search result page once and reads cells of every row by position.
+        Returns rows and detail page links (None for a row without link) in the same order.
+        Last pages are cached, parser, page filter and extractor read the same page one after another
+        """
         tree = html.fromstring(welder_page)
+        rows = []
+        links = []
 
-        trs = tree.xpath("//tr[@bgcolor]")
-
-        for tr in trs:
-            row_tree = html.fromstring(html.tostring(tr))
-            name = self._get_value(row_tree, "//tr[@bgcolor]/td[1]/text()")
-            kleymo = self._get_value(row_tree, "//tr[@bgcolor]/td[2]/span/text()")
-            company = self._get_value(row_tree, "//tr[@bgcolor]/td[3]/text()")
-            job_title = self._get_value(row_tree, "//tr[@bgcolor]/td[4]/text()")
-            certification_number = self._get_value(row_tree, "//tr[@bgcolor]/td[5]/text()")
-            insert = self._get_value(row_tree, "//tr[@bgcolor]/td[6]/text()")
-            certification_date = self._get_value(row_tree, "//tr[@bgcolor]/td[9]/text()", True)
-            expiration_date = self._get_value(row_tree, "//tr[@bgcolor]/td[10]/text()", True)
-            renewal_date = self._get_value(row_tree, "//tr[@bgcolor]/td[11]/text()", True)
-
-            result.append({
-                "full_name": name,
-                "kleymo": kleymo,
-                "company": company,
-                "job_title": job_title,
-                "certification_number": certification_number,
-                "insert": insert,
-                "certification_date": certification_date,
-                "expiration_date": expiration_date,
-                "renewal_date": renewal_date,
-                "certification_id": self._get_certification_id(kleymo, certification_number, certification_date, insert)
-                }
-            )
+        for tr in tree.xpath("//tr[@bgcolor]"):
+            tds: list[html.HtmlElement] = tr.findall("td")
+
+            rows.append(WelderDataExtractor._get_row_data(tds))
+            links.append(WelderDataExtractor._get_row_link(tds))
+
+        return (tuple(rows), tuple(links))
+
+
+    def _extract_data_from_welder_page(self, welder_page: str) -> list[Row]:
+        return [dict(row) for row in self.extract_page(welder_page)[0]]
+
+
+    @staticmethod
+    def _get_row_data(tds: list[html.HtmlElement]) -> Row:
+        row: Row = {}
+
+        for key, index in WelderDataExtractor.text_cells:
+            row[key] = WelderDataExtractor._get_cell_text(tds, index, "span" if key == "kleymo" else None)
+
+        for key, index in WelderDataExtractor.date_cells:
+            row[key] = WelderDataExtractor._get_cell_date(tds, index)
+
+        row["certification_id"] = WelderDataExtractor._get_certification_id(
+            row["kleymo"], row["certification_number"], row["certification_date"], row["insert"]
+        )
+
+        return row
+
+
+    @staticmethod
+    def _get_row_link(tds: list[html.HtmlElement]) -> Link | None:
+        if len(tds) <= WelderDataExtractor.link_cell:
+            return None
+
+        a = tds[WelderDataExtractor.link_cell].find("a")
+        onclick = a.get("onclick") if a != None else None
+        link = search(r"/[\w]+/[\w]+/detail.php\?ID=[\w\W]+", onclick) if onclick else None
+
+        if link == None:
+            return None
+
+        link = link[0].replace('"', '').split(",")[0]
+
+        return f"https://naks.ru{link}"
+
+
+    @staticmethod
+    def _get_cell_text(tds: list[html.HtmlElement], index: int, child: str | None = None) -> str | None:
+        if len(tds) <= index:
+            return None
+
+        element = tds[index] if child == None else tds[index].find(child)
+
+        if element == None:
+            return None
+
+        text = element.text
+
+        if text == None:
+            text = next((el.tail for el in element if el.tail != None), None)
+
+        return text.strip() if text != None else None
+
+
+    @staticmethod
+    def _get_cell_date(tds: list[html.HtmlElement], index: int) -> date | None:
+        text = WelderDataExtractor._get_cell_text(tds, index)
+
+        try:
+            return WelderDataExtractor._str_to_date(text) if text else None
+        except ValueError:
+            return None
+
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _str_to_date(text: str) -> date:
+        """
+        dateutil parsing dominates row extraction, the same dates repeat a lot across rows and pages
+        """
+        return str_to_date(text)
 
-        return result
-    
 
     def _extract_data_from_welder_certification_page(self, welder_certification_page: str) -> dict[str, str]:
         result = {}
         tree = html.fromstring(welder_certification_page)
 
-        trs: list[html.HtmlElement] = tree.xpath("//tr")
-
-        for tr in trs:
-            tds: list[html.HtmlElement] = tr.getchildren()
+        for tr in tree.iter("tr"):
+            tds: list[html.HtmlElement] = list(tr)
 
             if len(tds) < 2:
                 continue
@@ -113,23 +180,14 @@ class WelderDataExtractor(IExtractor):
         return result
 
 
-    def _get_certification_id(self, kleymo: str, certification_number: str, certification_date: date, insert: str | None) -> str:
+    @staticmethod
+    def _get_certification_id(kleymo: str, certification_number: str, certification_date: date, insert: str | None) -> str:
         if insert == None:
             insert = ""
         
         chars = findall(r"[\w]", str(kleymo) + str(certification_number) + str(certification_date) + str(insert))
         
         return "".join(chars).lower()
-    
-
-    def _get_value(self, tree: html.HtmlElement, xpath: str, is_date: bool = False) -> str | date | None:
-        try:
-            if is_date:
-                return str_to_date(tree.xpath(xpath)[0])
-            
-            return tree.xpath(xpath)[0].strip()
-        except:
-            return None
 
 
 
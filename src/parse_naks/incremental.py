@@ -0,0 +1,60 @@
+from datetime import date
+from typing import TypeAlias
+
+from src.parse_naks.extractors import WelderDataExtractor
+from src.db.repository import WelderRepository
+from src.domain import WelderModel
+
+
+"""
+=======================================================================================================
+Types
+=======================================================================================================
+"""
+
+
+CertificationId: TypeAlias = str
+CertificationDates: TypeAlias = tuple[date | None, date | None]
+
+
+"""
+=======================================================================================================
+Incremental refresh
+=======================================================================================================
+"""
+
+
+class KnownCertificationsFilter:
+    """
+    Decides which certification detail pages of a search result have to be fetched.
+    Detail page is fetched only for certifications missing in db or whose expiration or renewal date changed
+    """
+
+    def __init__(self, known: dict[CertificationId, CertificationDates]) -> None:
+        self.known = known
+        self.extractor = WelderDataExtractor()
+
+
+    def __call__(self, main_page: str) -> list[bool]:
+        return [self._is_changed(row) for row in self.extractor.extract_rows(main_page)]
+
+
+    def _is_changed(self, row: dict[str, str | date | None]) -> bool:
+        dates = self.known.get(row["certification_id"])
+
+        if dates == None:
+            return True
+
+        return dates != (row["expiration_date"], row["renewal_date"])
+
+
+class IncrementalWelderSaver:
+    """
+    Upserts result of incremental refresh straight into db:
+    new welders and certifications are inserted, changed ones are updated
+    """
+    repo = WelderRepository()
+
+    def save(self, welders: list[WelderModel]) -> None:
+        for table, result in self.repo.upsert_many(welders).items():
+            print(f"{table}: {result}")
@@ -0,0 +1,59 @@
+from pathlib import Path
+from threading import Lock
+
+from src.services.utils import JSONLWriter
+from src.parse_naks.sorter import Sorter
+from src.parse_naks.types import Model
+from src.domain import WelderModel
+
+
+class WelderDataStream:
+    """
+    Writes parse-personal results to welders data file (JSONL) as soon as search values are completed.
+    Every line is one welder with certifications found by one search value, so the same welder
+    may occupy several lines, readers merge them by kleymo.
+    A certification is written once per kleymo: results of retried or overlapping pages don't duplicate lines
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.writer = JSONLWriter(path)
+        self.sorter = Sorter()
+        self.written: dict[str, set[str]] = {}
+        self._lock = Lock()
+
+
+    def open(self) -> None:
+        self.writer.open()
+
+
+    def write(self, models: list[Model]) -> None:
+        with self._lock:
+            welders = [welder for welder in self.sorter.sort_welder_data(models) if self._keep_unwritten(welder)]
+
+            self.writer.write([welder.model_dump(mode="json") for welder in welders])
+
+
+    def _keep_unwritten(self, welder: WelderModel) -> bool:
+        """
+        Drops certifications written before, a welder written before is skipped when nothing is left
+        """
+        known = welder.kleymo in self.written
+        written = self.written.setdefault(welder.kleymo, set())
+        certifications = []
+
+        for certification in welder.certifications or []:
+            if certification.certification_id not in written:
+                written.add(certification.certification_id)
+                certifications.append(certification)
+
+        welder.certifications = certifications
+
+        return not known or certifications != []
+
+
+    def record(self, value: str, models: list[Model]) -> None:
+        self.write(models)
+
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+from hashlib import sha256
+from threading import Lock
+from pathlib import Path
+from time import time
+import sqlite3
+import zlib
+
+
+"""
+=======================================================================================================
+Types
+=======================================================================================================
+"""
+
+
+class CacheMissError(KeyError):
+    """
+    Raised in offline (cache only) mode when a requested page was never stored
+    """
+
+
+@dataclass
+class CachedPage:
+    text: str
+    fresh: bool
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+"""
+=======================================================================================================
+Page cache
+=======================================================================================================
+"""
+
+
+class PageCache:
+    """
+    On-disk cache of naks.ru pages
+
+    Index (sqlite) maps a request key (sha256 of method, url and POST body) to the sha256 of the page content,
+    page bodies are stored once per content digest as zlib compressed files.
+    Entries older than their kind's ttl are stale and are revalidated with If-None-Match / If-Modified-Since
+    when the server gave validators. When the blobs exceed `max_size` bytes the least recently used entries are evicted.
+
+    :offline - replay mode, stale pages are served as is and missing pages raise CacheMissError
+    """
+
+    evict_batch = 100
+
+    def __init__(self, folder: str | Path, ttls: dict[str, float], max_size: int, offline: bool = False) -> None:
+        self.folder = Path(folder)
+        self.blobs_folder = self.folder / "blobs"
+        self.ttls = ttls
+        self.max_size = max_size
+        self.offline = offline
+
+        self.blobs_folder.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(self.folder / "index.sqlite", check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+            """
+        )
+
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+    @staticmethod
+    def key(method: str, url: str, body: str | bytes | None = None) -> str:
+        if isinstance(body, str):
+            body = body.encode()
+
+        return sha256(b"\n".join([method.upper().encode(), url.encode(), body or b""])).hexdigest()
+
+
+    def get(self, key: str) -> CachedPage | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT kind, digest, stored_at, etag, last_modified FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row == None:
+                return None
+
+            kind, digest, stored_at, etag, last_modified = row
+
+            # read under the lock: eviction of another thread can't remove the blob in between
+            try:
+                compressed = self._blob_path(digest).read_bytes()
+            except FileNotFoundError:
+                self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time(), key))
+            self._db.commit()
+
+        return CachedPage(
+            text=zlib.decompress(compressed).decode("utf-8"),
+            fresh=time() - stored_at < self.ttls.get(kind, 0),
+            etag=etag,
+            last_modified=last_modified
+        )
+
+
+    def put(self, key: str, kind: str, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        content = text.encode("utf-8")
+        digest = sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        now = time()
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                compressed = zlib.compress(content)
+                path.write_bytes(compressed)
+
+                self._db.execute("INSERT OR REPLACE INTO blobs (digest, size) VALUES (?, ?)", (digest, len(compressed)))
+                self._size += len(compressed)
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (key, kind, digest, stored_at, accessed_at, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, digest, now, now, etag, last_modified)
+            )
+
+            if self._size > self.max_size:
+                self._evict()
+
+            self._db.commit()
+
+
+    def revalidated(self, key: str) -> None:
+        """
+        Marks entry as fresh again after 304 Not Modified response
+        """
+        now = time()
+
+        with self._lock:
+            self._db.execute("UPDATE pages SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+    def _evict(self) -> None:
+        while self._size > self.max_size:
+            keys = self._db.execute(
+                "SELECT key FROM pages ORDER BY accessed_at LIMIT ?", (self.evict_batch,)
+            ).fetchall()
+
+            if keys == []:
+                break
+
+            self._db.executemany("DELETE FROM pages WHERE key = ?", keys)
+
+            orphans = self._db.execute(
+                "SELECT digest, size FROM blobs WHERE digest NOT IN (SELECT digest FROM pages)"
+            ).fetchall()
+
+            for digest, size in orphans:
+                self._blob_path(digest).unlink(missing_ok=True)
+                self._size -= size
+
+            self._db.executemany("DELETE FROM blobs WHERE digest = ?", [(digest,) for digest, _ in orphans])
+
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_folder / digest[:2] / digest
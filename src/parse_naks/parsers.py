@@ -1,12 +1,18 @@
-from time import sleep
+from time import monotonic
 from typing import (
-    TypeAlias
+    TypeAlias,
+    Mapping
 )
+import asyncio
 
 from re import fullmatch
-from requests import Session
+from requests import Session, Response
+from aiohttp import ClientSession
 
+from src.parse_naks.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from src.parse_naks.page_cache import PageCache, CachedPage, CacheMissError
 from src.parse_naks.extractors import WelderDataExtractor
+from src.parse_naks.types import PageFilter
 
 
 """
@@ -29,24 +35,23 @@ Parser
 """
 
 
-class PersonalParser:
+class BasePersonalParser:
+    cache: PageCache | None = None
+    retries = 3
+    url = 'https://naks.ru/registry/personal/'
 
-    def __init__(self) -> None:
-        self.session = Session()
-        self.session.headers = {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Cache-Control': 'max-age=0',
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Origin': 'https://naks.ru',
-            'Referer': 'https://naks.ru/registry/personal/',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36'
-        }
+    headers = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'Cache-Control': 'max-age=0',
+        'Connection': 'keep-alive',
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Origin': 'https://naks.ru',
+        'Referer': 'https://naks.ru/registry/personal/',
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36'
+    }
 
-        self.url = 'https://naks.ru/registry/personal/'
+    data = 'arrFilter_pf%5Bap%5D=&arrFilter_ff%5BNAME%5D={name}&arrFilter_pf%5Bshifr_ac%5D=&arrFilter_pf%5Buroven_ac%5D=&arrFilter_pf%5Bnum_ac%5D=&arrFilter_ff%5BCODE%5D={kleymo}&arrFilter_DATE_CREATE_1=&arrFilter_DATE_CREATE_2=&arrFilter_DATE_ACTIVE_TO_1=&arrFilter_DATE_ACTIVE_TO_2=&arrFilter_DATE_ACTIVE_FROM_1=&arrFilter_DATE_ACTIVE_FROM_2=&g-recaptcha-response=&set_filter=%D4%E8%EB%FC%F2%F0&set_filter=Y'
 
-        self.data = 'arrFilter_pf%5Bap%5D=&arrFilter_ff%5BNAME%5D={name}&arrFilter_pf%5Bshifr_ac%5D=&arrFilter_pf%5Buroven_ac%5D=&arrFilter_pf%5Bnum_ac%5D=&arrFilter_ff%5BCODE%5D={kleymo}&arrFilter_DATE_CREATE_1=&arrFilter_DATE_CREATE_2=&arrFilter_DATE_ACTIVE_TO_1=&arrFilter_DATE_ACTIVE_TO_2=&arrFilter_DATE_ACTIVE_FROM_1=&arrFilter_DATE_ACTIVE_FROM_2=&g-recaptcha-response=&set_filter=%D4%E8%EB%FC%F2%F0&set_filter=Y'
-    
 
     def _set_request_data(self, search_value: str) -> Kleymo | Name:
         data = self.data
@@ -54,24 +59,168 @@ class PersonalParser:
         if fullmatch(r"[A-Z0-9]{4}", search_value.strip()):
             data = data.format(kleymo=search_value.strip(), name="")
             return data
-        
+
         name = repr(search_value.encode("windows-1251"))[2:-1].replace("\\x", "%").upper().replace(" ", "+")
         data = data.format(name=name, kleymo="")
         return data
 
 
-    def parse(self, value: str) -> tuple[MainPage, list[AdditionalPage]]:
+    def _select_links(self, main_page: MainPage, page_filter: PageFilter | None) -> list[str | None]:
+        """
+        Links of detail pages to fetch, rows rejected by page filter get None
+        """
+        links = WelderDataExtractor.extract_links(main_page)
+
+        if page_filter == None:
+            return links
+
+        return [link if selected else None for link, selected in zip(links, page_filter(main_page))]
+
+
+    def _lookup(self, method: str, url: str, data: str | bytes | None) -> tuple[str, CachedPage | None]:
+        """
+        Returns request key and cached page. Raises CacheMissError when the page can't be fetched in offline mode
+        """
+        key = PageCache.key(method, url, data)
+
+        if self.cache == None:
+            return (key, None)
+
+        cached = self.cache.get(key)
+
+        if cached == None and self.cache.offline:
+            raise CacheMissError(url)
+
+        return (key, cached)
+
+
+    def _store(self, key: str, method: str, status: int, text: str, headers: Mapping[str, str]) -> None:
+        if self.cache == None or status != 200:
+            return
+
+        self.cache.put(
+            key,
+            "search" if method == "POST" else "detail",
+            text,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified")
+        )
+
+
+class PersonalParser(BasePersonalParser):
+
+    def __init__(self, limiter: AdaptiveRateLimiter, cache: PageCache | None = None) -> None:
+        self.session = Session()
+        self.session.headers = dict(self.headers)
+        self.limiter = limiter
+        self.cache = cache
+
+
+    def parse(self, value: str, page_filter: PageFilter | None = None) -> tuple[MainPage, list[AdditionalPage | None]]:
 
         data = self._set_request_data(value)
-        res = self.session.post(self.url, data)
-        sleep(1)
-        main_page = res.text
+        main_page = self._fetch("POST", self.url, data)
         additional_pages = []
 
-        links = WelderDataExtractor.extract_links(res.text)
+        links = self._select_links(main_page, page_filter)
 
         for link in links:
-            additional_pages.append(self.session.get(link).text)
-            sleep(.5)
-        
+            additional_pages.append(self._fetch("GET", link) if link else None)
+
         return (main_page, additional_pages)
+
+
+    def _fetch(self, method: str, url: str, data: str | None = None) -> str:
+        key, cached = self._lookup(method, url, data)
+
+        if cached and (cached.fresh or self.cache.offline):
+            return cached.text
+
+        res = self._request(method, url, data, cached.conditional_headers if cached else {})
+
+        if cached and res.status_code == 304:
+            self.cache.revalidated(key)
+            return cached.text
+
+        self._store(key, method, res.status_code, res.text, res.headers)
+
+        return res.text
+
+
+    def _request(self, method: str, url: str, data: str | None = None, headers: dict[str, str] | None = None) -> Response:
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+
+            start = monotonic()
+            res = self.session.request(method, url, data=data, headers=headers)
+
+            self.limiter.feedback(res.status_code, monotonic() - start, parse_retry_after(res.headers.get("Retry-After")))
+
+            if not self.limiter.is_retryable(res.status_code) or attempt == self.retries:
+                return res
+
+
+class AsyncPersonalParser(BasePersonalParser):
+    """
+    Parser for the async engine. The client session (and its connection pool) is owned by the caller
+    and shared by every parser, detail pages of one search result are fetched concurrently
+    """
+
+    def __init__(self, session: ClientSession, limiter: AdaptiveRateLimiter, cache: PageCache | None = None) -> None:
+        self.session = session
+        self.limiter = limiter
+        self.cache = cache
+
+
+    async def parse(self, value: str, page_filter: PageFilter | None = None) -> tuple[MainPage, list[AdditionalPage | None]]:
+
+        data = self._set_request_data(value)
+
+        main_page = await self._fetch("POST", self.url, data.encode())
+
+        links = self._select_links(main_page, page_filter)
+
+        additional_pages = await asyncio.gather(
+            *[self._get(link) for link in links]
+        )
+
+        return (main_page, list(additional_pages))
+
+
+    async def _get(self, link: str | None) -> AdditionalPage | None:
+        if link == None:
+            return None
+
+        return await self._fetch("GET", link)
+
+
+    async def _fetch(self, method: str, url: str, data: bytes | None = None) -> str:
+        key, cached = self._lookup(method, url, data)
+
+        if cached and (cached.fresh or self.cache.offline):
+            return cached.text
+
+        status, headers, text = await self._request(method, url, data, cached.conditional_headers if cached else {})
+
+        if cached and status == 304:
+            self.cache.revalidated(key)
+            return cached.text
+
+        self._store(key, method, status, text, headers)
+
+        return text
+
+
+    async def _request(self, method: str, url: str, data: bytes | None = None, headers: dict[str, str] | None = None) -> tuple[int, Mapping[str, str], str]:
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire_async()
+
+            start = monotonic()
+
+            async with self.session.request(method, url, data=data, headers=headers) as res:
+                text = await res.text()
+
+            self.limiter.feedback(res.status, monotonic() - start, parse_retry_after(res.headers.get("Retry-After")))
+
+            if not self.limiter.is_retryable(res.status) or attempt == self.retries:
+                return (res.status, res.headers, text)
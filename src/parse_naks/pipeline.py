@@ -0,0 +1,193 @@
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from queue import Queue, Empty
+from threading import Thread
+
+from src.parse_naks.runtime import SearchValuesQueue, SearchTask
+from src.parse_naks.parsers import PersonalParser, MainPage, AdditionalPage
+from src.parse_naks.rate_limiter import AdaptiveRateLimiter
+from src.parse_naks.page_cache import PageCache, CacheMissError
+from src.parse_naks.extractors import IExtractor
+from src.parse_naks.types import Model, PageFilter
+
+
+"""
+=======================================================================================================
+Pipeline stages
+=======================================================================================================
+"""
+
+
+def extract_pages(extractor: IExtractor, main_page: MainPage, additional_pages: list[AdditionalPage | None]) -> list[Model]:
+    """
+    Runs in extraction process: lxml parsing and pydantic validation
+    """
+    return extractor.extract(main_page, additional_pages)
+
+
+class PageFetcher(Thread):
+    """
+    Network stage: downloads pages of search values and pushes them onto bounded page queue,
+    blocks when extraction stage falls behind. Puts None when the work is over
+    """
+
+    def __init__(self, queue: SearchValuesQueue, pages: Queue, limiter: AdaptiveRateLimiter, cache: PageCache | None = None, page_filter: PageFilter | None = None) -> None:
+        Thread.__init__(self)
+
+        self.parser = PersonalParser(limiter, cache)
+        self.page_filter = page_filter
+        self.queue = queue
+        self.pages = pages
+
+
+    def run(self) -> None:
+        try:
+            while (task := self.queue.next()) != None:
+                try:
+                    self._fetch(task)
+                except BaseException as e:
+                    self.queue.abort(e, task)
+        finally:
+            self.pages.put(None)
+
+
+    def _fetch(self, task: SearchTask) -> None:
+        try:
+            main_page, additional_pages = self.parser.parse(task.value, self.page_filter)
+
+        except CacheMissError as e:
+            self.queue.fail(task, e, retry=False)
+            return
+
+        except Exception as e:
+            self.queue.fail(task, e)
+            return
+
+        self.pages.put((task, main_page, additional_pages))
+
+
+class ResultCollector:
+    """
+    Single consumer of extraction results, drops certifications met twice
+    (the same certification is found by kleymo and by name search for example)
+    """
+
+    def __init__(self) -> None:
+        self.results: dict[str, Model] = {}
+
+
+    def collect(self, models: list[Model]) -> None:
+        for model in models:
+            key = getattr(model, "certification_id", None) or model.model_dump_json()
+
+            self.results[key] = model
+
+
+    @property
+    def stack(self) -> list[Model]:
+        return list(self.results.values())
+
+
+"""
+=======================================================================================================
+Pipeline
+=======================================================================================================
+"""
+
+
+class ExtractionPipeline:
+    """
+    fetcher threads -> bounded page queue -> process pool (extract + validate) -> collector
+
+    :fetchers - amount of network threads
+    :processes - amount of extraction processes
+    :queue_size - pages waiting for extraction, fetchers block when it's full
+    """
+
+    def __init__(self, queue: SearchValuesQueue, extractor: IExtractor, limiter: AdaptiveRateLimiter, fetchers: int, processes: int, cache: PageCache | None = None, page_filter: PageFilter | None = None, queue_size: int | None = None) -> None:
+        self.queue = queue
+        self.extractor = extractor
+        self.limiter = limiter
+        self.fetchers = fetchers
+        self.processes = processes
+        self.cache = cache
+        self.page_filter = page_filter
+        self.pages: Queue = Queue(maxsize=queue_size or processes * 2)
+        self.collector = ResultCollector()
+
+
+    def run(self) -> list[Model]:
+        threads = [
+            PageFetcher(self.queue, self.pages, self.limiter, self.cache, self.page_filter) for _ in range(self.fetchers)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        with ProcessPoolExecutor(self.processes) as pool:
+            try:
+                self._dispatch(pool)
+            except BaseException as e:
+                self.queue.abort(e)
+                self._drain(threads)
+
+        for thread in threads:
+            thread.join()
+
+        return self.collector.stack
+
+
+    def _drain(self, threads: list[PageFetcher]) -> None:
+        """
+        Fetchers of an aborted run may be blocked on the full page queue, pages are dropped until they exit
+        """
+        while any(thread.is_alive() for thread in threads):
+            try:
+                self.pages.get(timeout=.1)
+            except Empty:
+                continue
+
+
+    def _dispatch(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Values are completed only after extraction, so collecting finished jobs must not wait
+        for the page queue: fetchers keep running until the last value is completed
+        """
+        in_flight: dict[Future, SearchTask] = {}
+        finished_fetchers = 0
+
+        while finished_fetchers < self.fetchers:
+            try:
+                pages = self.pages.get(timeout=.1)
+            except Empty:
+                self._collect(in_flight, timeout=0)
+                continue
+
+            if pages == None:
+                finished_fetchers += 1
+                continue
+
+            if len(in_flight) >= self.processes * 2:
+                self._collect(in_flight, return_when=FIRST_COMPLETED)
+
+            task, main_page, additional_pages = pages
+            in_flight[pool.submit(extract_pages, self.extractor, main_page, additional_pages)] = task
+
+        self._collect(in_flight)
+
+
+    def _collect(self, in_flight: dict[Future, SearchTask], **wait_options) -> None:
+        done, _ = wait(in_flight, **wait_options)
+
+        for future in done:
+            task = in_flight.pop(future)
+
+            try:
+                results = future.result()
+            except Exception as e:
+                self.queue.fail(task, e, retry=False)
+                continue
+
+            if self.queue.keep_results:
+                self.collector.collect(results)
+
+            self.queue.complete(task, results)
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+import asyncio
+
+from rich.progress import ProgressColumn, Task
+from rich.text import Text
+
+
+"""
+=======================================================================================================
+Rate limiter
+=======================================================================================================
+"""
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every worker (threads and coroutines) hitting naks.ru
+
+    :rate is the requests-per-second budget, the limiter never goes above it
+    :min_rate is the floor the limiter backs off to
+    :slow_response is the response time (seconds) treated as a sign of an overloaded site
+
+    429 and 5xx responses halve the rate and pause the bucket (for Retry-After seconds when the server sends it),
+    slow responses reduce the rate, every fast successful response adds `increase` rps back.
+    The token schedule of a paused bucket starts at the end of the pause, so workers waiting it out
+    are released one by one at the current rate rather than all at once
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(self, rate: float, min_rate: float = .2, burst: int = 1, slow_response: float = 5., increase: float = .05, backoff: float = .5) -> None:
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.slow_response = slow_response
+        self.increase = increase
+        self.backoff = backoff
+
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+
+        if delay > 0:
+            sleep(delay)
+
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+    def feedback(self, status: int, elapsed: float, retry_after: float | None = None) -> None:
+        with self._lock:
+            if status in self.retry_statuses:
+                self.rate = max(self.min_rate, self.rate * self.backoff)
+                pause = retry_after if retry_after != None else 1 / self.rate
+                self._updated = max(self._updated, monotonic() + pause)
+                self._tokens = min(self._tokens, 0.)
+                return
+
+            if elapsed > self.slow_response:
+                self.rate = max(self.min_rate, self.rate * .8)
+                return
+
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+    def is_retryable(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = monotonic()
+
+            # during a pause `_updated` is its end: no tokens are added and the debt is counted from there
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+            self._tokens -= 1
+
+            debt = 0. if self._tokens >= 0 else -self._tokens / self.rate
+
+            return self._updated - now + debt
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Retry-After is either delay seconds or HTTP-date
+    """
+    if value == None:
+        return None
+
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo == None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0., (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+"""
+=======================================================================================================
+Progress bar column
+=======================================================================================================
+"""
+
+
+class RateColumn(ProgressColumn):
+
+    def __init__(self, limiter: AdaptiveRateLimiter) -> None:
+        super().__init__()
+        self.limiter = limiter
+
+
+    def render(self, task: Task) -> Text:
+        return Text(f"{self.limiter.rate:.2f} req/s", style="blue")
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from typing import Protocol
+from threading import Lock
+from time import monotonic
+from queue import Empty
+
+from rich.progress import ProgressColumn, Task
+from rich.text import Text
+
+from src.services.utils import ThreadProgressBarQueue
+from src.parse_naks.types import Model
+
+
+"""
+=======================================================================================================
+Types
+=======================================================================================================
+"""
+
+
+@dataclass
+class SearchTask:
+    value: str
+    attempt: int = 0
+
+
+class ResultSink(Protocol):
+    def record(self, value: str, models: list[Model]) -> None: ...
+
+
+"""
+=======================================================================================================
+Work queue
+=======================================================================================================
+"""
+
+
+class SearchValuesQueue(ThreadProgressBarQueue):
+    """
+    Work queue of parse-personal search values
+
+    Every value is either completed or failed. Failed values are put back to the tail of the queue
+    until `retries` attempts are spent, then they are recorded in `failed`.
+    When the last pending value is finished one sentinel per consumer is put, so consumers blocked
+    in `next` wake up and exit, nothing is lost to check-then-act races on `empty()`.
+    Results of completed values are passed to every sink (run checkpoint, output file),
+    workers keep them in memory too only when `keep_results` is set.
+    An error a worker can't handle (a sink can't write, for example) aborts the queue: `next` returns None
+    to every consumer and `raise_error` re-raises the error in the main thread after workers are joined
+    """
+
+    sentinel = None
+
+    def __init__(self, retries: int = 2, sinks: list[ResultSink] | None = None, keep_results: bool = True) -> None:
+        super().__init__()
+
+        self.retries = retries
+        self.sinks = sinks or []
+        self.keep_results = keep_results
+        self.failed: list[str] = []
+        self.completed = 0
+        self.retried = 0
+        self.error: BaseException | None = None
+
+        self._consumers = 0
+        self._pending = 0
+        self._started = monotonic()
+        self._lock = Lock()
+
+
+    def put_value(self, value: str) -> None:
+        with self._lock:
+            self._pending += 1
+
+        self.put(SearchTask(value))
+
+
+    def open(self, consumers: int) -> None:
+        with self._lock:
+            self._consumers = consumers
+            self._started = monotonic()
+
+            if self._pending == 0:
+                self._shutdown()
+
+
+    def next(self) -> SearchTask | None:
+        """
+        Blocks until a task is available, None means the work is over
+        """
+        task = self.get()
+
+        return task if self.error == None else None
+
+
+    def next_nowait(self) -> SearchTask | None:
+        try:
+            task = self.get_nowait()
+        except Empty:
+            return None
+
+        return task if self.error == None else None
+
+
+    def complete(self, task: SearchTask, results: list[Model]) -> None:
+        for sink in self.sinks:
+            sink.record(task.value, results)
+
+        with self._lock:
+            self.completed += 1
+
+        self._finish()
+
+
+    def fail(self, task: SearchTask, error: Exception, retry: bool = True) -> None:
+        if retry and task.attempt < self.retries:
+            with self._lock:
+                self.retried += 1
+
+            self.put(SearchTask(task.value, task.attempt + 1))
+            return
+
+        print(f"{task.value} failed: {error!r}")
+
+        with self._lock:
+            self.failed.append(task.value)
+
+        self._finish()
+
+
+    def abort(self, error: BaseException, task: SearchTask | None = None) -> None:
+        """
+        Stops every consumer, the first error is kept for `raise_error`, value of task is failed
+        """
+        with self._lock:
+            if self.error == None:
+                self.error = error
+
+            if task != None:
+                self.failed.append(task.value)
+
+        self._shutdown()
+
+
+    def raise_error(self) -> None:
+        if self.error != None:
+            raise self.error
+
+
+    @property
+    def throughput(self) -> float:
+        """
+        Finished values per minute
+        """
+        elapsed = monotonic() - self._started
+
+        return (self.completed + len(self.failed)) / elapsed * 60 if elapsed > 0 else 0.
+
+
+    def _finish(self) -> None:
+        self.advance()
+
+        with self._lock:
+            self._pending -= 1
+
+            if self._pending == 0:
+                self._shutdown()
+
+
+    def _shutdown(self) -> None:
+        for _ in range(self._consumers):
+            self.put(self.sentinel)
+
+
+"""
+=======================================================================================================
+Progress bar column
+=======================================================================================================
+"""
+
+
+class QueueStatsColumn(ProgressColumn):
+
+    def __init__(self, queue: SearchValuesQueue) -> None:
+        super().__init__()
+        self.queue = queue
+
+
+    def render(self, task: Task) -> Text:
+        return Text(
+            f"failed: {len(self.queue.failed)} retried: {self.queue.retried} {self.queue.throughput:.1f} values/min",
+            style="blue"
+        )
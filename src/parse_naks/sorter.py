@@ -1,5 +1,5 @@
-from src.parse_naks.types import WelderData
-from src.domain import WelderModel, WelderCertificationModel, Model
+from src.parse_naks.types import WelderData, Model
+from src.domain import WelderModel, WelderCertificationModel
 
 
 class Sorter:
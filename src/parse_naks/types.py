@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import date
 from typing import (
+    Callable,
     TypeAlias,
     TypeVar
 )
@@ -11,7 +12,9 @@ from pydantic import BaseModel, ConfigDict, Field
 Name: TypeAlias = str
 Kleymo: TypeAlias = str
 Link: TypeAlias = str
+Row: TypeAlias = dict[str, str | date | None]
 Model = TypeVar("Model", bound=BaseModel)
+PageFilter: TypeAlias = Callable[[str], list[bool]]
 
 
 @dataclass
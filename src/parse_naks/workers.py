@@ -1,28 +1,117 @@
 from threading import Thread
+import asyncio
 
-from src.services.utils import ThreadProgressBarQueue
-from src.domain import WelderModel
-from src.parse_naks.parsers import PersonalParser
+from aiohttp import ClientSession, TCPConnector
+
+from src.parse_naks.parsers import PersonalParser, AsyncPersonalParser
+from src.parse_naks.rate_limiter import AdaptiveRateLimiter
+from src.parse_naks.page_cache import PageCache, CacheMissError
+from src.parse_naks.runtime import SearchValuesQueue, SearchTask
 from src.parse_naks.extractors import IExtractor
+from src.parse_naks.types import Model, PageFilter
 
 
 class PersonalNaksWorker(Thread):
-    def __init__(self, queue: ThreadProgressBarQueue, stack: list[WelderModel], extractor: IExtractor) -> None:
+    """
+    Collects its results into own buffer (unless queue's results are streamed to sinks only),
+    buffers of all workers are merged after join
+    """
+
+    def __init__(self, queue: SearchValuesQueue, extractor: IExtractor, limiter: AdaptiveRateLimiter, cache: PageCache | None = None, page_filter: PageFilter | None = None) -> None:
         Thread.__init__(self)
 
-        self.parser = PersonalParser()
+        self.parser = PersonalParser(limiter, cache)
+        self.page_filter = page_filter
         self.queue = queue
-        self.stack = stack
         self.extractor = extractor
+        self.results: list[Model] = []
+
 
-    
     def run(self) -> None:
-        while not self.queue.empty():
-            value = self.queue.get_nowait()
-            
-            main_page, additional_pages = self.parser.parse(value)
+        while (task := self.queue.next()) != None:
+            try:
+                self._search(task)
+            except BaseException as e:
+                self.queue.abort(e, task)
+
+
+    def _search(self, task: SearchTask) -> None:
+        try:
+            main_page, additional_pages = self.parser.parse(task.value, self.page_filter)
+
+            personals = self.extractor.extract(main_page, additional_pages)
+
+        except CacheMissError as e:
+            self.queue.fail(task, e, retry=False)
+            return
+
+        except Exception as e:
+            self.queue.fail(task, e)
+            return
+
+        if self.queue.keep_results:
+            self.results += personals
+
+        self.queue.complete(task, personals)
+
+
+class AsyncPersonalNaksWorker:
+    """
+    Runs `concurrency` search coroutines on one event loop over a single pooled client session.
+    `connections` caps the number of simultaneous connections to naks.ru
+    """
+
+    def __init__(self, queue: SearchValuesQueue, extractor: IExtractor, limiter: AdaptiveRateLimiter, concurrency: int, cache: PageCache | None = None, page_filter: PageFilter | None = None, connections: int = 8) -> None:
+        self.limiter = limiter
+        self.cache = cache
+        self.page_filter = page_filter
+        self.queue = queue
+        self.extractor = extractor
+        self.concurrency = concurrency
+        self.connections = connections
+        self.results: list[Model] = []
+
+
+    def run(self) -> list[Model]:
+        asyncio.run(self._run())
+
+        return self.results
+
+
+    async def _run(self) -> None:
+        connector = TCPConnector(limit=self.connections, limit_per_host=self.connections)
+
+        async with ClientSession(headers=AsyncPersonalParser.headers, connector=connector) as session:
+            parser = AsyncPersonalParser(session, self.limiter, self.cache)
+
+            await asyncio.gather(
+                *[self._work(parser) for _ in range(self.concurrency)]
+            )
+
+
+    async def _work(self, parser: AsyncPersonalParser) -> None:
+        while (task := self.queue.next_nowait()) != None:
+            try:
+                await self._search(parser, task)
+            except Exception as e:
+                self.queue.abort(e, task)
+
+
+    async def _search(self, parser: AsyncPersonalParser, task: SearchTask) -> None:
+        try:
+            main_page, additional_pages = await parser.parse(task.value, self.page_filter)
 
             personals = self.extractor.extract(main_page, additional_pages)
 
-            self.stack += personals
-            
\ No newline at end of file
+        except CacheMissError as e:
+            self.queue.fail(task, e, retry=False)
+            return
+
+        except Exception as e:
+            self.queue.fail(task, e)
+            return
+
+        if self.queue.keep_results:
+            self.results += personals
+
+        self.queue.complete(task, personals)
@@ -1,4 +1,4 @@
-from click import Command, Option, echo
+from click import Choice, Command, Option, echo
 
 from src.report_commands.ndt_report_services import NDTReportService
 
@@ -10,12 +10,13 @@ class NDTReportCommand(Command):
 
         limit_option = Option(['--limit'], type=int)
         search_date_option = Option(["--search_date"], type=str)
-        save_mode_option = Option(['--save_mode'], type=str, help="modes: 'excel', 'pdf'")
+        save_mode_option = Option(['--save_mode'], type=str, help="modes: 'excel', 'excel-stream' (write-only workbook, no template), 'excel-parallel' (welder sheets rendered by all cores), 'pdf'")
+        engine_option = Option(['--engine'], type=Choice(["python", "sql"]), default="python", help="aggregation: 'python' (load all ndts) or 'sql' (aggregate in db)")
 
-        super().__init__(name=name, params=[save_mode_option, limit_option, search_date_option], callback=self.execute)
+        super().__init__(name=name, params=[save_mode_option, limit_option, search_date_option, engine_option], callback=self.execute)
 
 
-    def execute(self, save_mode: str, limit: int | None = None, search_date: str | None = None) -> None:
+    def execute(self, save_mode: str, limit: int | None = None, search_date: str | None = None, engine: str = "python") -> None:
         service = NDTReportService()
 
-        service.report(search_date=search_date, save_mode=save_mode, limit=limit)
+        service.report(search_date=search_date, save_mode=save_mode, limit=limit, engine=engine)
@@ -4,29 +4,39 @@ Excel file will contain the main sheet (Main) and other sheets named after the k
 PDF file will contain the first page (Main) with general data and other pages with ndt data belonging to welders
 """
 
-from dataclasses import dataclass
-from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import ZipFile, ZIP_DEFLATED
+from dataclasses import dataclass, fields
+from itertools import chain, zip_longest
+from operator import attrgetter, itemgetter
 from datetime import date
-from copy import copy
+from pathlib import Path
 from typing import (
     Literal, 
     TypeAlias,
     Union
 )
+import tempfile
+import os
 import re
 
-from openpyxl.styles import Alignment, PatternFill, NamedStyle, Border, Side
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.chart import LineChart, Reference
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.chart.axis import DateAxis
-from openpyxl.cell.cell import Cell
+from openpyxl.cell.cell import Cell, WriteOnlyCell
+import numpy as np
 
 from src.domain import NDTRequest, DBResponse, WelderNDTModel
-from src.services.utils import reverse_dict, limit_dict_pair, limit_dict_values
-from settings import SEARCH_VALUES_FILE, STATIC_DIR, NDT_REPORT_PATH
+from settings import SEARCH_VALUES_FILE, STATIC_DIR, NDT_REPORT_PATH, PDF_FONT_PATH
 from src.db.repository import NDTRepository
+from src.services.excel_styles import register_styles, prime_cell_styles, apply_style, row_fill, row_parity, ROW_THICK_BORDER, \
+    HEADER_FILL, EVEN_FILL, ODD_FILL, ALERT_FILL
+from src.services.xlsx_package import SheetAssembler, styles_part
+from src.services.pdf_service import PDFWriter, PDFPage, load_font, hex_color, format_value
 from src.services.utils import load_json
 
 
@@ -37,7 +47,7 @@ Types
 """
 
 
-Saver: TypeAlias = Union["NDTReportExcelSaveService", "NDTReportPDFSaveService"]
+Saver: TypeAlias = Union["NDTReportExcelSaveService", "NDTReportExcelStreamSaveService", "NDTReportExcelParallelSaveService", "NDTReportPDFSaveService"]
 SortedRows: TypeAlias = dict[str, list['DataRow']]
 ExcelRow: TypeAlias = list[Cell]
 Any: TypeAlias = str | int | float | date
@@ -85,15 +95,15 @@ class DataRow:
     repair_status_3: float | None = None
     ndt_id: str = None
 
+    def to_values(self) -> list[Any]:
+        return [0 if el == None else el for el in self.__dict__.values()]
+
+
     def to_row(self, ws: Worksheet) -> ExcelRow:
         row: ExcelRow = []
 
-        for el in self.__dict__.values():
+        for el in self.to_values():
             cell = Cell(ws)
-
-            if el == None:
-                el = 0
-
             cell.value = el
             row.append(cell)
 
@@ -106,6 +116,44 @@ class DataRow:
         return [row[1]] + row[10:-1]
 
 
+DATA_ROW_FIELDS = [field.name for field in fields(DataRow)]
+NUMERIC_FIELDS = DATA_ROW_FIELDS[10:-1]
+TOTAL_INDEXES = [e for e, name in enumerate(NUMERIC_FIELDS) if name.startswith("total")]
+REPAIR_STATUS_INDEXES = [e for e, name in enumerate(NUMERIC_FIELDS) if name.startswith("repair_status")]
+
+
+@dataclass
+class NDTColumns:
+    """
+    Columnar view of ndt rows: numeric fields as one float matrix (None is 0),
+    kleymos and welding dates as codes in order of first appearance
+    """
+    ndts: list[WelderNDTModel]
+    values: np.ndarray
+    kleymo_codes: np.ndarray
+    date_codes: np.ndarray
+    dates: list[date]
+
+
+    @classmethod
+    def from_models(cls, ndts: list[WelderNDTModel]) -> "NDTColumns":
+        get_values = itemgetter(*NUMERIC_FIELDS)
+
+        values = np.array([get_values(ndt.__dict__) for ndt in ndts], dtype=float)
+        values[np.isnan(values)] = 0
+
+        kleymos: dict[str | int, int] = {}
+        dates: dict[date, int] = {}
+
+        return cls(
+            ndts = ndts,
+            values = values,
+            kleymo_codes = np.fromiter((kleymos.setdefault(ndt.kleymo, len(kleymos)) for ndt in ndts), dtype=np.intp, count=len(ndts)),
+            date_codes = np.fromiter((dates.setdefault(ndt.latest_welding_date, len(dates)) for ndt in ndts), dtype=np.intp, count=len(ndts)),
+            dates = list(dates)
+        )
+
+
 """
 =======================================================================================================
 Domain Services
@@ -115,24 +163,42 @@ Domain Services
 
 class NDTReportService:
 
-    def report(self, search_date: str | None, save_mode: str, limit: int | None) -> None:
-        ndts = RequestNDTsService(search_date=search_date).request_data().result
-        preprocessor = NDTDataPrepocessor()
-
+    def report(self, search_date: str | None, save_mode: str, limit: int | None, engine: str = "python") -> None:
         saver = self._get_saver(save_mode)
-        preprocessor.preprocess(ndts=ndts, limit=limit)
-
 
         saver.dump_report(
-            *preprocessor.preprocess(ndts=ndts, limit=limit)
+            *self._preprocess(RequestNDTsService(search_date=search_date), engine, limit)
         )
 
 
+    def _preprocess(self, request_service: "RequestNDTsService", engine: str, limit: int | None) -> tuple[MainPageData, SortedRows]:
+        """
+        python: all matching ndts are loaded and aggregated by NDTDataPrepocessor,
+        sql: db returns only latest ndts of every welder and sums per welding date
+        """
+        preprocessor = NDTDataPrepocessor()
+        limit = limit if limit != None else 10
+
+        match engine:
+            case "python":
+                return preprocessor.preprocess(ndts=request_service.request_data().result, limit=limit)
+            case "sql":
+                ndts, date_totals = request_service.request_aggregated_data(limit)
+
+                return preprocessor.preprocess_aggregated(ndts=ndts.result, date_totals=date_totals.result, limit=limit)
+            case _:
+                raise ValueError("Invalid engine")
+
+
     def _get_saver(self, save_mode: str) -> Saver:
         
         match save_mode:
             case 'excel':
                 return NDTReportExcelSaveService()
+            case 'excel-stream':
+                return NDTReportExcelStreamSaveService()
+            case 'excel-parallel':
+                return NDTReportExcelParallelSaveService()
             case 'pdf':
                 return NDTReportPDFSaveService()
             case _:
@@ -140,144 +206,158 @@ class NDTReportService:
     
 
 class NDTDataPrepocessor:
+    """
+    Groups ndt rows by kleymo and by welding date on NDTColumns: sums, cumulation and repair statuses
+    are computed on numpy arrays, DataRow objects are created only for rows of the report
+    """
 
-    def preprocess(self, ndts: list[WelderNDTModel], limit: str | None) -> tuple[MainPageData, SortedRows]:
+    get_welder_values = attrgetter(*DATA_ROW_FIELDS[:10])
 
-        rows = [self._remove_none_values(DataRow(**ndt.__dict__)) for ndt in ndts]
+    def preprocess(self, ndts: list[WelderNDTModel], limit: int | None) -> tuple[MainPageData, SortedRows]:
+        limit = limit if limit != None else 10
+
+        if len(ndts) == 0:
+            return (MainPageData(summarized_welder_ndts=[], summarized_welder_group_ndts={}), {})
+
+        columns = NDTColumns.from_models(ndts)
+        summarized_welder_ndts, sorted_rows = self._summarize_welders(columns, limit)
+
+        main_page_data = MainPageData(
+            summarized_welder_ndts = summarized_welder_ndts,
+            summarized_welder_group_ndts = self._summarize_group(columns, limit)
+        )
+
+        return (main_page_data, sorted_rows)
 
+
+    def preprocess_aggregated(self, ndts: list[WelderNDTModel], date_totals: list[WelderNDTModel], limit: int | None) -> tuple[MainPageData, SortedRows]:
+        """
+        The same report from db aggregates: `ndts` are already limited per welder, `date_totals` are summed by db
+        """
         limit = limit if limit != None else 10
 
-        sorted_rows_by_kleymo = self._sort_by_kleymo(rows)
-        sorted_rows_by_date = limit_dict_pair(self._sort_by_date(sorted_rows_by_kleymo), limit)
+        if len(ndts) == 0:
+            return (MainPageData(summarized_welder_ndts=[], summarized_welder_group_ndts={}), {})
+
+        summarized_welder_ndts, sorted_rows = self._summarize_welders(NDTColumns.from_models(ndts), limit)
 
         main_page_data = MainPageData(
-            summarized_welder_ndts = [self._get_cumulated_row(row_list) for row_list in limit_dict_values(sorted_rows_by_kleymo, limit).values()],
-            summarized_welder_group_ndts = self._summarize_group(reverse_dict(sorted_rows_by_date))
+            summarized_welder_ndts = summarized_welder_ndts,
+            summarized_welder_group_ndts = {
+                total.latest_welding_date: DataRow(**{name: getattr(total, name) for name in NUMERIC_FIELDS}) for total in date_totals
+            }
         )
 
-        return (main_page_data, limit_dict_values(sorted_rows_by_kleymo, limit))
+        return (main_page_data, sorted_rows)
 
 
-    def _remove_none_values(self, row: DataRow) -> DataRow:
-        row = list(row.__dict__.items())
-        result = []
+    def _kleymo_order(self, columns: NDTColumns) -> np.ndarray:
+        """
+        Rows in order of kleymo groups, every group keeps repository order
+        """
+        return np.argsort(columns.kleymo_codes, kind="stable")
 
-        for el in row[10:-1]:
-            if el[1] ==None:
-                result.append(
-                    (el[0], 0)
-                )
-                continue
 
-            result.append(el)
-        
-        return DataRow(**dict(row[:10] + result))
-    
+    def _summarize_welders(self, columns: NDTColumns, limit: int) -> tuple[list[DataRow], SortedRows]:
+        order = self._kleymo_order(columns)
+        counts = np.bincount(columns.kleymo_codes)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ranks = np.arange(len(order)) - starts[columns.kleymo_codes[order]]
 
-    def _summarize_group(self, rows_dict: SortedRows) -> dict[str, DataRow]:
-        return {
-            key: self._compute_repair_statuses(self._sum_rows(value)) for key, value in rows_dict.items()
-        }
+        limited = ranks < limit
+        limited_values = self._compute_repair_statuses(columns.values[order[limited]])
 
-    
-    def _sum_rows(self, rows: list[DataRow]) -> DataRow:
-        return DataRow(
-            total_weld_1 = sum([row.total_weld_1 for row in rows]),
-            total_ndt_1 = sum([row.total_ndt_1 for row in rows]),
-            total_accepted_1 = sum([row.total_accepted_1 for row in rows]),
-            total_repair_1 = sum([row.total_repair_1 for row in rows]),
-            total_weld_2 = sum([row.total_weld_2 for row in rows]),
-            total_ndt_2 = sum([row.total_ndt_2 for row in rows]),
-            total_accepted_2 = sum([row.total_accepted_2 for row in rows]),
-            total_repair_2 = sum([row.total_repair_2 for row in rows]),
-            total_weld_3 = sum([row.total_weld_3 for row in rows]),
-            total_ndt_3 = sum([row.total_ndt_3 for row in rows]),
-            total_accepted_3 = sum([row.total_accepted_3 for row in rows]),
-            total_repair_3 = sum([row.total_repair_3 for row in rows]),
-        )  
-    
- 
-    def _sort_by_kleymo(self, rows: list[DataRow]) -> SortedRows:     
-        sorted_rows: dict[str, list[DataRow]] = {}
+        summarized_welder_ndts = self._get_cumulated_rows(
+            columns,
+            newest = order[starts],
+            counts = np.minimum(counts, limit),
+            values = self._pad_groups(columns.kleymo_codes[order[limited]], ranks[limited], limited_values, min(limit, int(counts.max())))
+        )
 
-        for ndt in rows:
-            kleymo = ndt.kleymo
+        return (summarized_welder_ndts, self._sort_by_kleymo(columns, order[limited], limited_values))
 
-            ndt = self._compute_repair_statuses(ndt)
 
-            ndt = DataRow(
-                **ndt.__dict__
-            )
+    def _sort_by_kleymo(self, columns: NDTColumns, indexes: np.ndarray, values: np.ndarray) -> SortedRows:
+        sorted_rows: SortedRows = {}
 
-            if kleymo not in sorted_rows:
-                sorted_rows[kleymo] = [ndt]
-                continue
+        for index, row_values in zip(indexes.tolist(), values.tolist()):
+            ndt = columns.ndts[index]
+
+            sorted_rows.setdefault(ndt.kleymo, []).append(self._to_data_row(ndt, row_values))
 
-            sorted_rows[kleymo].append(ndt)
-        
         return sorted_rows
 
 
-    def _sort_by_date(self, rows: SortedRows) -> dict[date, list[DataRow]]:
-        sorted_rows: dict[date, list[DataRow]] = {}
-        rows: list[DataRow] = list(chain.from_iterable(rows.values()))
+    def _to_data_row(self, ndt: WelderNDTModel, values: list[float]) -> DataRow:
+        """
+        Report rows never carried ndt_id, welder sheets show it as 0
+        """
+        return DataRow(*self.get_welder_values(ndt), *values, None)
 
-        for row in rows:
-            welding_date = row.latest_welding_date
 
-            if welding_date not in sorted_rows:
-                sorted_rows[welding_date] = [row]
-                continue
+    def _pad_groups(self, codes: np.ndarray, ranks: np.ndarray, values: np.ndarray, width: int) -> np.ndarray:
+        """
+        (kleymos, width, fields) array, rows of a welder are placed by their rank in the group
+        """
+        padded = np.zeros((codes.max() + 1, width, len(NUMERIC_FIELDS)))
+        padded[codes, ranks] = values
 
-            sorted_rows[welding_date].append(row)
-        
-        return sorted_rows
+        return padded
 
 
-    def _get_cumulated_row(self, rows: list[DataRow]) -> DataRow:
-        rows = list(reversed(rows))
+    def _get_cumulated_rows(self, columns: NDTColumns, newest: np.ndarray, counts: np.ndarray, values: np.ndarray) -> list[DataRow]:
+        """
+        Rows of a welder are folded from the oldest to the newest: a value smaller than the accumulated one
+        is added to it, otherwise it replaces it. The fold runs for all welders at once, one step per row rank
+        """
+        groups = np.arange(len(counts))
+        cumulated = values[groups, counts - 1]
 
-        cumulated_row = rows[0]
+        for step in range(1, values.shape[1]):
+            ranks = counts - 1 - step
+            target = values[groups, np.maximum(ranks, 0)]
+            folded = np.where(target < cumulated, target + cumulated, target)
 
-        for row in rows[1:]:
-            cumulated_row = self._compute_ndt_by_previous(row, cumulated_row)
-        
-        return cumulated_row
-    
+            cumulated = np.where((ranks >= 0)[:, None], folded, cumulated)
 
-    def _compute_ndt_by_previous(self, target_ndt: DataRow, previous_ndt: DataRow) -> DataRow:
-        result = []
+        return [self._to_data_row(columns.ndts[index], row_values) for index, row_values in zip(newest.tolist(), cumulated.tolist())]
 
-        target_ndt = list(target_ndt.__dict__.items())
-        previous_ndt = list(previous_ndt.__dict__.items())
 
-        for target_el, previous_el in zip(target_ndt[10:-1], previous_ndt[10:-1]):
+    def _summarize_group(self, columns: NDTColumns, limit: int) -> dict[date, DataRow]:
+        """
+        Sums of the first `limit` welding dates (in order of kleymo groups), the oldest date goes first
+        """
+        order = self._kleymo_order(columns)
+        date_codes = columns.date_codes[order]
+        totals = columns.values[order][:, TOTAL_INDEXES]
 
-            if target_el[1] < previous_el[1]:
-                result.append(
-                    (target_el[0], target_el[1] + previous_el[1])
-                )
-                continue
+        _, first_rows = np.unique(date_codes, return_index=True)
+        dates = np.argsort(first_rows, kind="stable")[:limit][::-1]
 
-            result.append(target_el)
-        
-        return DataRow(**dict(target_ndt[:10] + result))
+        sums = np.zeros((len(dates), len(NUMERIC_FIELDS)))
 
+        for e, field_index in enumerate(TOTAL_INDEXES):
+            sums[:, field_index] = np.bincount(date_codes, weights=totals[:, e], minlength=len(columns.dates))[dates]
 
-    def _compute_repair_statuses(self, row: DataRow) -> DataRow:
-        
-        row.repair_status_1 = self._compute_repair_status(row.total_accepted_1, row.total_ndt_1)
-        row.repair_status_2 = self._compute_repair_status(row.total_accepted_2, row.total_ndt_2)
-        row.repair_status_3 = self._compute_repair_status(row.total_accepted_3, row.total_ndt_3)
+        sums = self._compute_repair_statuses(sums)
 
-        return row
-    
+        return {
+            columns.dates[date_code]: DataRow(**dict(zip(NUMERIC_FIELDS, row_values))) for date_code, row_values in zip(dates.tolist(), sums.tolist())
+        }
 
-    def _compute_repair_status(self, total_accepted: float, total_ndt: float):
-        try:
-            return 100 - (total_accepted / total_ndt) * 100
-        except:
-            return 0.0
+
+    def _compute_repair_statuses(self, values: np.ndarray) -> np.ndarray:
+        """
+        Repair status is a percent of not accepted ndt, 0 when there was no ndt
+        """
+        for status_index in REPAIR_STATUS_INDEXES:
+            total_ndt = values[:, status_index - 3]
+            total_accepted = values[:, status_index - 2]
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values[:, status_index] = np.where(total_ndt == 0, 0.0, 100 - (total_accepted / total_ndt) * 100)
+
+        return values
 
 
 """
@@ -369,6 +449,15 @@ class RequestNDTsService:
         )
 
 
+    def request_aggregated_data(self, limit: int) -> tuple[DBResponse[WelderNDTModel], DBResponse[WelderNDTModel]]:
+        request = self._dump_ndt_request()
+
+        return (
+            self.repository.get_latest_per_welder(request, limit),
+            self.repository.get_date_totals(request, limit)
+        )
+
+
 """
 =======================================================================================================
 Infrastructure Services
@@ -400,22 +489,10 @@ class NDTReportExcelPreprocessor:
                 self.wb.remove_sheet(self.wb[sheet])
 
 
-    def _reg_header_style(self) -> None:
-        header_style = NamedStyle("header_style")
-
-        header_style.alignment = Alignment(horizontal='center', vertical='center')
-        header_style.fill = PatternFill(start_color='003366FF', end_color='003366FF', fill_type='solid')
-
-        self.wb.add_named_style(header_style)
-
-
     def get_workbook(self) -> Workbook:
         self._truncate_main_sheet()
         self._delete_welder_sheets()
-        try:
-            self._reg_header_style()
-        except:
-            pass
+        register_styles(self.wb)
 
         return self.wb
 
@@ -454,7 +531,7 @@ class NDTReportExcelSaveService:
 
         for row_date, row in data.summarized_welder_group_ndts.items():
             date_cell = Cell(ws)
-            date_cell.value = row_date.strftime("%d.%m.%Y")
+            date_cell.value = format_value(row_date)
 
             summarized_group_rows.append([date_cell] + row.to_main_sheet_row(ws)[1:])
         
@@ -465,20 +542,22 @@ class NDTReportExcelSaveService:
             for cell in row:
                 ws[cell.coordinate].value = cell.value
                 ws[cell.coordinate].style = cell.style
-                ws[cell.coordinate].fill = copy(cell.fill)
-                ws[cell.coordinate].border = copy(cell.border)
         
-        dates = Reference(ws, min_col=18, min_row=3, max_row=2 + len(summarized_group_rows))
-
-        chart1 = self._create_chart(ws, "NDT for Quantity welded pipe joints", min_col=20, max_col=22, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="numbers")
-        chart2 = self._create_chart(ws, "NDT for Length of pipe weld joint", min_col=25, max_col=27, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="mm")
-        chart3 = self._create_chart(ws, "Structural NDT", min_col=30, max_col=32, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="mm")
-        chart4 = self._create_chart(ws, "NDT for Quantity welded pipe joints Repair status", min_col=23, max_col=23, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="percents")
-        chart5 = self._create_chart(ws, "NDT for Length of pipe weld joint Repair status", min_col=28, max_col=28, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="percents")
-        chart6 = self._create_chart(ws, "Structural NDT Repair status", min_col=33, max_col=33, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="percents")
-        chart7 = self._create_chart(ws, "NDT for Quantity welded pipe joints total weld", min_col=19, max_col=19, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="numbers")
-        chart8 = self._create_chart(ws, "NDT for Length of pipe weld joint total weld", min_col=24, max_col=24, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="mm")
-        chart9 = self._create_chart(ws, "Structural NDT total weld", min_col=29, max_col=29, min_row=2, max_row=2 + len(summarized_group_rows), dates=dates, x_axis="dates", y_axis="mm")
+        self._add_main_charts(ws, max_row=2 + len(summarized_group_rows))
+
+
+    def _add_main_charts(self, ws: Worksheet, max_row: int) -> None:
+        dates = Reference(ws, min_col=18, min_row=3, max_row=max_row)
+
+        chart1 = self._create_chart(ws, "NDT for Quantity welded pipe joints", min_col=20, max_col=22, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="numbers")
+        chart2 = self._create_chart(ws, "NDT for Length of pipe weld joint", min_col=25, max_col=27, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
+        chart3 = self._create_chart(ws, "Structural NDT", min_col=30, max_col=32, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
+        chart4 = self._create_chart(ws, "NDT for Quantity welded pipe joints Repair status", min_col=23, max_col=23, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart5 = self._create_chart(ws, "NDT for Length of pipe weld joint Repair status", min_col=28, max_col=28, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart6 = self._create_chart(ws, "Structural NDT Repair status", min_col=33, max_col=33, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart7 = self._create_chart(ws, "NDT for Quantity welded pipe joints total weld", min_col=19, max_col=19, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="numbers")
+        chart8 = self._create_chart(ws, "NDT for Length of pipe weld joint total weld", min_col=24, max_col=24, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
+        chart9 = self._create_chart(ws, "Structural NDT total weld", min_col=29, max_col=29, min_row=2, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
 
         ws.add_chart(chart1, "S15")
         ws.add_chart(chart2, "X15")
@@ -539,7 +618,7 @@ class NDTReportExcelSaveService:
             cell = Cell(ws)
 
             cell.value = el
-            cell.style = 'header_style'
+            apply_style(cell, "header_style")
             row.append(cell)
         
         ws.append(row)
@@ -554,84 +633,45 @@ class NDTReportExcelSaveService:
 
             cell.hyperlink = f"#{cell.value.strip()}!A1"
             cell.style = "Hyperlink"
-            if e % 2 == 1:
-                cell.fill = PatternFill(start_color='00CCFFFF', end_color='00CCFFFF', fill_type='solid')
-
-            if e % 2 == 0:
-                cell.fill = PatternFill(start_color='0033CCCC', end_color='0033CCCC', fill_type='solid')
-
-            cell.border = Border(
-                right = Side(color="FF000000", style="thick"),
-                bottom = Side(color = 'FF000000', style="thin"),
-                top = Side(color = 'FF000000', style="thin")
-            )
+            cell.fill = row_fill(e)
+            cell.border = ROW_THICK_BORDER
 
         wb.save(NDT_REPORT_PATH)
 
     
     def _style_body_row(self, row: ExcelRow, e: int) -> ExcelRow:
-        styled_row = []
-
-        for cell in row:
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+        style = f"ndt_{row_parity(e)}"
 
-            if e % 2 == 1:
-                cell.fill = PatternFill(start_color='00CCFFFF', end_color='00CCFFFF', fill_type='solid')
-
-            if e % 2 == 0:
-                cell.fill = PatternFill(start_color='0033CCCC', end_color='0033CCCC', fill_type='solid')
-            
-            cell.border = Border(
-                bottom = Side(color = 'FF000000', style="thin"),
-                top = Side(color = 'FF000000', style="thin")
-            )
-
-            styled_row.append(cell)
-        
-        return styled_row
+        return [apply_style(cell, style) for cell in row]
     
 
     def _style_main_sheet(self, row: ExcelRow, e: int) -> ExcelRow:
+        """
+        Thick right border after kleymo (or date) and the first two ndt groups, repair status above 5% is red
+        """
+        return [apply_style(cell, self._main_sheet_style(column, cell.value, e)) for column, cell in enumerate(row)]
 
-        right_bold_border = Border(
-            right = Side(color="FF000000", style="thick"),
-            bottom = Side(color = 'FF000000', style="thin"),
-            top = Side(color = 'FF000000', style="thin")
-        )
-
-        row = self._style_body_row(row, e)
 
-        row[-6].border = right_bold_border
-        row[-11].border = right_bold_border
-        row[-16].border = right_bold_border
+    def _main_sheet_style(self, column: int, value: Any, e: int) -> str:
+        fill = "alert" if column in (5, 10, 15) and value > 5 else row_parity(e)
+        border = "_thick" if column in (0, 5, 10) else ""
 
-        red_fill = PatternFill(start_color="00FF0000", end_color="00FF0000", fill_type="solid")
-
-        
-        if row[-1].value > 5:
-            row[-1].fill = red_fill
-
-        if row[-6].value > 5:
-            row[-6].fill = red_fill
-
-        if row[-11].value > 5:
-            row[-11].fill = red_fill
-
-        return row
+        return f"ndt_{fill}{border}"
             
 
-    def _add_charts(self, ws: Worksheet) -> None:
-        dates = Reference(ws, min_col=10, min_row=2, max_row=ws.max_row)
+    def _add_charts(self, ws: Worksheet, max_row: int | None = None) -> None:
+        max_row = max_row if max_row != None else ws.max_row
+        dates = Reference(ws, min_col=10, min_row=2, max_row=max_row)
 
-        chart1 = self._create_chart(ws, "NDT for Quantity welded pipe joints", min_col=12, max_col=14, min_row=1, max_row=ws.max_row, dates=dates)
-        chart2 = self._create_chart(ws, "NDT for Length of pipe weld joint", min_col=17, max_col=19, min_row=1, max_row=ws.max_row, dates=dates)
-        chart3 = self._create_chart(ws, "Structural NDT", min_col=22, max_col=24, min_row=1, max_row=ws.max_row, dates=dates)
-        chart4 = self._create_chart(ws, "NDT for Quantity welded pipe joints total weld", min_col=11, max_col=11, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="numbers")
-        chart5 = self._create_chart(ws, "NDT for Length of pipe weld joint total weld", min_col=16, max_col=16, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="mm")
-        chart6 = self._create_chart(ws, "Structural NDT total weld", min_col=21, max_col=21, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="mm")
-        chart7 = self._create_chart(ws, "NDT for Quantity welded pipe joints Repair status", min_col=15, max_col=15, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="percents")
-        chart8 = self._create_chart(ws, "NDT for Length of pipe weld joint Repair status", min_col=20, max_col=20, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="percents")
-        chart9 = self._create_chart(ws, "Structural NDT Repair status", min_col=25, max_col=25, min_row=1, max_row=ws.max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart1 = self._create_chart(ws, "NDT for Quantity welded pipe joints", min_col=12, max_col=14, min_row=1, max_row=max_row, dates=dates)
+        chart2 = self._create_chart(ws, "NDT for Length of pipe weld joint", min_col=17, max_col=19, min_row=1, max_row=max_row, dates=dates)
+        chart3 = self._create_chart(ws, "Structural NDT", min_col=22, max_col=24, min_row=1, max_row=max_row, dates=dates)
+        chart4 = self._create_chart(ws, "NDT for Quantity welded pipe joints total weld", min_col=11, max_col=11, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="numbers")
+        chart5 = self._create_chart(ws, "NDT for Length of pipe weld joint total weld", min_col=16, max_col=16, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
+        chart6 = self._create_chart(ws, "Structural NDT total weld", min_col=21, max_col=21, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="mm")
+        chart7 = self._create_chart(ws, "NDT for Quantity welded pipe joints Repair status", min_col=15, max_col=15, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart8 = self._create_chart(ws, "NDT for Length of pipe weld joint Repair status", min_col=20, max_col=20, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
+        chart9 = self._create_chart(ws, "Structural NDT Repair status", min_col=25, max_col=25, min_row=1, max_row=max_row, dates=dates, x_axis="dates", y_axis="percents")
 
         ws.add_chart(chart1, "A15")
         ws.add_chart(chart2, "H15")
@@ -670,6 +710,360 @@ class NDTReportExcelSaveService:
         return chart
 
 
+class NDTReportExcelStreamSaveService(NDTReportExcelSaveService):
+    """
+    Write-only workbook: every sheet is streamed row by row into its own temporary file, welder sheets
+    are closed as soon as they are written, so memory doesn't grow with amount of welders.
+    Styles are registered once as named styles and cells refer to them, the Main sheet header
+    is generated here, report template isn't needed
+    """
+
+    group_titles = ["NDT for Quantity welded pipe joints", "NDT for Length of pipe weld joint", "Structural NDT"]
+
+    def dump_report(self, main_sheet_data: MainPageData, sorted_ndts: SortedRows) -> None:
+        self.wb = Workbook(write_only=True)
+        register_styles(self.wb)
+
+        self._create_main_sheet(main_sheet_data)
+        self._create_welder_sheets(sorted_ndts)
+
+        self.wb.save(f"{STATIC_DIR}/report.xlsx")
+
+
+    def _styled_cell(self, ws: WriteOnlyWorksheet, value: Any, style: str) -> Cell:
+        # style first: value of date type sets its number format on top of the style
+        cell = WriteOnlyCell(ws)
+        cell.style = style
+        cell.value = value
+
+        return cell
+
+
+    def _create_main_sheet(self, data: MainPageData) -> None:
+        """
+        Welder rows (columns A:P) and welding date rows (columns R:AG) share sheet rows, starting from the third one
+        """
+        ws: WriteOnlyWorksheet = self.wb.create_sheet("Main")
+        prime_cell_styles(ws)
+        header = ["kleymo"] + NUMERIC_FIELDS
+
+        for start_column in (1, 18):
+            for e, title in enumerate(self.group_titles):
+                ws.merged_cells.add(CellRange(min_col=start_column + 1 + 5 * e, max_col=start_column + 5 + 5 * e, min_row=1, max_row=1))
+
+        ws.append([self._styled_cell(ws, value, "header_style") for value in [None] + self._spread_group_titles() + [None, None] + self._spread_group_titles()])
+        ws.append([self._styled_cell(ws, value, "header_style") for value in header + [None] + ["latest_welding_date"] + NUMERIC_FIELDS])
+
+        group_rows = [[format_value(row_date)] + row.to_values()[10:-1] for row_date, row in data.summarized_welder_group_ndts.items()]
+        welder_rows = [[row.kleymo] + row.to_values()[10:-1] for row in data.summarized_welder_ndts]
+
+        for e, (welder_row, group_row) in enumerate(zip_longest(welder_rows, group_rows)):
+            ws.append(self._main_sheet_cells(ws, welder_row, e) + [None] + self._main_sheet_cells(ws, group_row, e))
+
+        self._add_main_charts(ws, max_row=2 + len(group_rows))
+
+
+    def _spread_group_titles(self) -> list[str | None]:
+        return list(chain.from_iterable([title, None, None, None, None] for title in self.group_titles))
+
+
+    def _main_sheet_cells(self, ws: WriteOnlyWorksheet, values: list[Any] | None, e: int) -> list[Cell | None]:
+        if values == None:
+            return [None] * (1 + len(NUMERIC_FIELDS))
+
+        return [self._styled_cell(ws, value, self._main_sheet_style(column, value, e)) for column, value in enumerate(values)]
+
+
+    def _create_welder_sheets(self, ndts: SortedRows) -> None:
+        for kleymo, row_list in ndts.items():
+            self._write_welder_sheet(self.wb.create_sheet(kleymo), row_list)
+
+
+    def _write_welder_sheet(self, ws: WriteOnlyWorksheet, row_list: list[DataRow]) -> None:
+        # column settings of write-only sheet go before its rows
+        for i in range(1, len(DATA_ROW_FIELDS) + 1):
+            ws.column_dimensions[get_column_letter(i)].bestFit = True
+            ws.column_dimensions[get_column_letter(i)].auto_size = True
+
+        ws.append([self._styled_cell(ws, name, "header_style") for name in DATA_ROW_FIELDS])
+
+        for e, row in enumerate(row_list):
+            style = f"ndt_{row_parity(e)}"
+
+            ws.append([self._styled_cell(ws, value, style) for value in row.to_values()])
+
+        self._add_charts(ws, max_row=len(row_list) + 1)
+        ws.close()
+
+
+class NDTReportExcelParallelSaveService(NDTReportExcelStreamSaveService):
+    """
+    Welder sheets are written by a process pool: every worker saves a chunk of them as a workbook of its own,
+    the report workbook is saved with Main and empty welder sheets, and the report package is assembled
+    from both (see `SheetAssembler`). Workbooks register and prime styles the same way, so cell style ids
+    of worker sheets are valid in the report; if their styles differ anyway the report is streamed as usual,
+    as it is with a single worker or a few welders
+    """
+
+    chunk_size = 20
+    min_welders = 100
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = workers
+
+
+    def dump_report(self, main_sheet_data: MainPageData, sorted_ndts: SortedRows) -> None:
+        if not self._is_parallel(len(sorted_ndts)):
+            return super().dump_report(main_sheet_data, sorted_ndts)
+
+        self.wb = Workbook(write_only=True)
+        register_styles(self.wb)
+
+        self._create_main_sheet(main_sheet_data)
+        titles = [self.wb.create_sheet(kleymo).title for kleymo in sorted_ndts]
+
+        with tempfile.TemporaryDirectory(dir=STATIC_DIR) as folder:
+            skeleton = Path(folder, "skeleton.xlsx")
+            self.wb.save(skeleton)
+
+            if not self._assemble(skeleton, self._render_welder_workbooks(Path(folder), titles, list(sorted_ndts.values())), titles):
+                return super().dump_report(main_sheet_data, sorted_ndts)
+
+
+    def _is_parallel(self, welders: int) -> bool:
+        workers = self.workers if self.workers != None else os.cpu_count() or 1
+
+        return workers > 1 and welders >= self.min_welders
+
+
+    def _render_welder_workbooks(self, folder: Path, titles: list[str], row_lists: list[list[DataRow]]) -> list[Path]:
+        sheets = list(zip(titles, row_lists))
+        chunks = [sheets[i:i + self.chunk_size] for i in range(0, len(sheets), self.chunk_size)]
+        paths = [folder / f"welders{e}.xlsx" for e in range(len(chunks))]
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            list(executor.map(render_welder_workbook, paths, chunks))
+
+        return paths
+
+
+    def _assemble(self, skeleton: Path, workbooks: list[Path], titles: list[str]) -> bool:
+        """
+        Writes report package, returns False (nothing is written) when styles of worker workbooks differ from the report's
+        """
+        with ZipFile(skeleton) as source:
+            packages = [ZipFile(path) for path in workbooks]
+
+            try:
+                if not all(styles_part(package) == styles_part(source) for package in packages):
+                    return False
+
+                with ZipFile(f"{STATIC_DIR}/report.xlsx", "w", ZIP_DEFLATED, allowZip64=True) as target:
+                    assembler = SheetAssembler(source, target, titles)
+
+                    for package in packages:
+                        assembler.add_sheets(package)
+
+                    assembler.close()
+            finally:
+                for package in packages:
+                    package.close()
+
+        return True
+
+
+class WelderWorkbookRenderer(NDTReportExcelStreamSaveService):
+    """
+    Writes welder sheets to a workbook of their own in a worker process
+    """
+
+    def render(self, path: Path, sheets: list[tuple[str, list[DataRow]]]) -> None:
+        self.wb = Workbook(write_only=True)
+        register_styles(self.wb)
+
+        for e, (title, rows) in enumerate(sheets):
+            ws: WriteOnlyWorksheet = self.wb.create_sheet(title)
+
+            if e == 0:
+                prime_cell_styles(ws)
+
+            self._write_welder_sheet(ws, rows)
+
+        self.wb.save(path)
+
+
+def render_welder_workbook(path: Path, sheets: list[tuple[str, list[DataRow]]]) -> None:
+    WelderWorkbookRenderer().render(path, sheets)
+
+
+def undated_last(welding_date: date | None) -> tuple[bool, date | None]:
+    """
+    Sort key of welding dates: ndts without welding date go after dated ones
+    """
+    return (welding_date == None, welding_date)
+
+
 class NDTReportPDFSaveService:
+    """
+    Main pages: welder totals, welding date totals and charts of welding date totals. Every welder starts
+    a new page with welder data, ndt table and charts, a table continues on the next page when it doesn't fit
+    and charts go to the next page when the rest of the page is too small for them.
+    Pages are written to the file as soon as they are filled, so memory doesn't grow with amount of welders
+    """
+
+    group_titles = NDTReportExcelStreamSaveService.group_titles
+    group_units = ["numbers", "mm", "mm"]
+
+    margin = 28
+    row_height = 10
+    first_column_width = 62
+    chart_height = 112
+    chart_gap = 8
+
+    header_color = hex_color(HEADER_FILL.fgColor.rgb)
+    fill_colors = {"even": hex_color(EVEN_FILL.fgColor.rgb), "odd": hex_color(ODD_FILL.fgColor.rgb), "alert": hex_color(ALERT_FILL.fgColor.rgb)}
+
+    def __init__(self, font_path: str | Path | None = PDF_FONT_PATH) -> None:
+        self.font_path = font_path
+
+
+    def dump_report(self, main_sheet_data: MainPageData, sorted_ndts: SortedRows) -> None:
+        self.page: PDFPage | None = None
+
+        with PDFWriter(f"{STATIC_DIR}/report.pdf", load_font(self.font_path)) as self.writer:
+            self._create_main_pages(main_sheet_data, len(sorted_ndts))
+            self._create_welder_pages(sorted_ndts)
+            self.writer.add_page(self.page)
+
+
+    def _new_page(self) -> None:
+        if self.page != None:
+            self.writer.add_page(self.page)
+
+        self.page = self.writer.new_page()
+        self.y = self.page.height - self.margin
+
+
+    def _create_main_pages(self, data: MainPageData, welders: int) -> None:
+        group_rows = sorted(data.summarized_welder_group_ndts.items(), key=lambda item: undated_last(item[0]))
+
+        self._new_page()
+        self._title("NDT report", size=14)
+        self._text(f"welders: {welders}, created: {date.today().strftime('%d.%m.%Y')}")
+
+        self._title("Welders")
+        self._table("kleymo", [[row.kleymo] + row.to_values()[10:-1] for row in data.summarized_welder_ndts], main=True)
+
+        self._title("Welding dates")
+        self._table("latest_welding_date", [[row_date] + row.to_values()[10:-1] for row_date, row in group_rows], main=True)
+
+        self._charts([row_date for row_date, _ in group_rows], [row for _, row in group_rows])
+
+
+    def _create_welder_pages(self, ndts: SortedRows) -> None:
+        for kleymo, row_list in ndts.items():
+            welder = row_list[0]
+
+            self._new_page()
+            self._title(f"{kleymo}  {format_value(welder.full_name)}", size=12)
+            self._text(", ".join(f"{name}: {format_value(getattr(welder, name))}" for name in DATA_ROW_FIELDS[2:6]))
+            self._text(", ".join(f"{name}: {format_value(getattr(welder, name))}" for name in DATA_ROW_FIELDS[6:9]))
+
+            self._table("latest_welding_date", [[row.latest_welding_date] + row.to_values()[10:-1] for row in row_list])
+
+            rows = sorted(row_list, key=lambda row: undated_last(row.latest_welding_date))
+            self._charts([row.latest_welding_date for row in rows], rows)
+
+
+    def _title(self, text: str, size: float = 10) -> None:
+        if self.y - size - 3 * self.row_height < self.margin:
+            self._new_page()
+
+        self.page.text(self.margin, self.y - size, text, size=size)
+        self.y -= size + 8
+
+
+    def _text(self, text: str) -> None:
+        self.page.text(self.margin, self.y - 7, text, size=7, max_width=self.page.width - 2 * self.margin)
+        self.y -= 12
+
+
+    def _table(self, first_column: str, rows: list[list[Any]], main: bool = False) -> None:
+        """
+        Group titles and field names go first and are repeated on every page the table is continued on.
+        As on the Main sheet, main tables have red repair status above 5%
+        """
+        column_width = (self.page.width - 2 * self.margin - self.first_column_width) / len(NUMERIC_FIELDS)
+        widths = [self.first_column_width] + [column_width] * len(NUMERIC_FIELDS)
+        header = [first_column] + [name.rsplit("_", 1)[0] for name in NUMERIC_FIELDS]
+
+        self._table_header(widths, header)
+
+        for e, row in enumerate(rows):
+            if self.y - self.row_height < self.margin:
+                self._new_page()
+                self._table_header(widths, header)
+
+            fills = [self.fill_colors[self._fill(column, value, e, main)] for column, value in enumerate(row)]
+
+            self.page.table_row(self.margin, self.y, widths, [format_value(value) for value in row], fills, self.row_height)
+            self._group_borders(widths, self.row_height)
+            self.y -= self.row_height
+
+        self.y -= self.row_height
+
+
+    def _table_header(self, widths: list[float], header: list[str]) -> None:
+        group_width = sum(widths[1:6])
+
+        self.page.table_row(self.margin, self.y, [widths[0]] + [group_width] * 3, [""] + self.group_titles, [self.header_color] * 4, self.row_height)
+        self.y -= self.row_height
+        self.page.table_row(self.margin, self.y, widths, header, [self.header_color] * len(header), self.row_height, size=5)
+        self._group_borders(widths, self.row_height)
+        self.y -= self.row_height
+
+
+    def _group_borders(self, widths: list[float], height: float) -> None:
+        # thick right border after the first column and the first two ndt groups
+        for column in (0, 5, 10):
+            x = self.margin + sum(widths[:column + 1])
+            self.page.polyline([(x, self.y), (x, self.y - height)], line_width=1.2)
+
+
+    def _fill(self, column: int, value: Any, e: int, main: bool) -> str:
+        if main and column in (5, 10, 15) and value > 5:
+            return "alert"
+
+        return row_parity(e)
+
+
+    def _charts(self, dates: list[date], rows: list[DataRow]) -> None:
+        """
+        3x3 grid: ndt, total weld and repair status of every group, points are in order of welding dates
+        """
+        grid_height = 3 * self.chart_height + 2 * self.chart_gap
+
+        if self.y - grid_height < self.margin:
+            self._new_page()
+
+        chart_width = (self.page.width - 2 * self.margin - 2 * self.chart_gap) / 3
+        categories = [format_value(row_date) for row_date in dates]
+
+        for e, (title, names, y_axis) in enumerate(self._chart_specs()):
+            x = self.margin + (e % 3) * (chart_width + self.chart_gap)
+            y = self.y - (e // 3 + 1) * self.chart_height - (e // 3) * self.chart_gap
+            series = [(name, [getattr(row, name) or 0 for row in rows]) for name in names]
+
+            self.page.line_chart(x, y, chart_width, self.chart_height, title, categories, series, y_axis=y_axis)
+
+        self.y -= grid_height + self.chart_gap
+
+
+    def _chart_specs(self) -> list[tuple[str, list[str], str]]:
+        groups = list(enumerate(zip(self.group_titles, self.group_units), 1))
 
-    def dump_report(self) -> None: ...
+        return [
+            *[(title, [f"total_ndt_{n}", f"total_accepted_{n}", f"total_repair_{n}"], unit) for n, (title, unit) in groups],
+            *[(f"{title} total weld", [f"total_weld_{n}"], unit) for n, (title, unit) in groups],
+            *[(f"{title} Repair status", [f"repair_status_{n}"], "percents") for n, (title, _) in groups],
+        ]
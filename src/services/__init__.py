@@ -1,2 +1,23 @@
-from .excel_service import ExcelService
-from .opencv_service import OpenCVSevice
\ No newline at end of file
+from importlib import import_module
+
+
+_lazy_attributes = {
+    "ExcelService": ".excel_service",
+    "OpenCVSevice": ".opencv_service",
+}
+
+
+def __getattr__(name: str):
+    """
+    Services are imported on first access: importing src.services.utils must not load cv2 and numpy
+    """
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_lazy_attributes[name], __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+__all__ = list(_lazy_attributes)
@@ -7,13 +7,14 @@ from datetime import date, datetime
 from pathlib import Path
 import os
 
-from openpyxl.styles import Alignment, PatternFill, Border, Side
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.chart import LineChart, Reference
 from openpyxl.utils import get_column_letter
 from openpyxl import load_workbook, Workbook
 from openpyxl.cell.cell import Cell
 
+from src.services.excel_styles import apply_style, row_parity
+
 
 AnyType: TypeAlias = Union[str, int, float, date, datetime]
 
@@ -138,26 +139,9 @@ class ExcelService:
         
     @staticmethod
     def set_header_cell_style(cell: Cell) -> Cell:
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.fill = PatternFill(start_color='003366FF', end_color='003366FF', fill_type='solid')
-        cell.border = Border(
-            right = Side(color="FF000000", style="thin")
-        )
-
-        return cell
+        return apply_style(cell, "table_header")
 
     
     @staticmethod
     def set_body_cell_style(cell: Cell, e: int) -> Cell:
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = Border(
-            right = Side(color="FF000000", style="thin")
-        )
-
-        if e % 2 == 1:
-            cell.fill = PatternFill(start_color='00CCFFFF', end_color='00CCFFFF', fill_type='solid')
-
-        if e % 2 == 0:
-            cell.fill = PatternFill(start_color='0033CCCC', end_color='0033CCCC', fill_type='solid')
-
-        return cell
+        return apply_style(cell, f"table_{row_parity(e)}")
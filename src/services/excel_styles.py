@@ -0,0 +1,111 @@
+"""
+Shared cell styles of excel reports. Style parts (alignment, fills, borders) are immutable in openpyxl,
+so they are created once here. Cells get them through named styles registered once per workbook
+"""
+
+from openpyxl.styles.numbers import FORMAT_DATE_YYYYMMDD2
+from openpyxl.styles import Alignment, PatternFill, NamedStyle, Border, Side
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from openpyxl.cell.cell import Cell, WriteOnlyCell
+from openpyxl import Workbook
+
+
+"""
+=======================================================================================================
+Style parts
+=======================================================================================================
+"""
+
+
+CENTER = Alignment(horizontal='center', vertical='center')
+
+THIN_SIDE = Side(color="FF000000", style="thin")
+THICK_SIDE = Side(color="FF000000", style="thick")
+
+HEADER_FILL = PatternFill(start_color='003366FF', end_color='003366FF', fill_type='solid')
+EVEN_FILL = PatternFill(start_color='0033CCCC', end_color='0033CCCC', fill_type='solid')
+ODD_FILL = PatternFill(start_color='00CCFFFF', end_color='00CCFFFF', fill_type='solid')
+ALERT_FILL = PatternFill(start_color="00FF0000", end_color="00FF0000", fill_type="solid")
+
+RIGHT_BORDER = Border(right=THIN_SIDE)
+ROW_BORDER = Border(top=THIN_SIDE, bottom=THIN_SIDE)
+ROW_THICK_BORDER = Border(right=THICK_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+
+
+def row_fill(e: int) -> PatternFill:
+    return ODD_FILL if e % 2 == 1 else EVEN_FILL
+
+
+def row_parity(e: int) -> str:
+    return "odd" if e % 2 == 1 else "even"
+
+
+"""
+=======================================================================================================
+Named styles
+=======================================================================================================
+"""
+
+
+def _named_styles() -> list[NamedStyle]:
+    """
+    header_style: ndt report header
+    table_header, table_even, table_odd: tables of ExcelService (thin right border)
+    ndt_even, ndt_odd, ndt_alert and their _thick variants: ndt report rows, _thick has thick right border
+    """
+    styles = [
+        NamedStyle("header_style", alignment=CENTER, fill=HEADER_FILL),
+        NamedStyle("table_header", alignment=CENTER, fill=HEADER_FILL, border=RIGHT_BORDER),
+        NamedStyle("table_even", alignment=CENTER, fill=EVEN_FILL, border=RIGHT_BORDER),
+        NamedStyle("table_odd", alignment=CENTER, fill=ODD_FILL, border=RIGHT_BORDER),
+    ]
+
+    for name, fill in [("even", EVEN_FILL), ("odd", ODD_FILL), ("alert", ALERT_FILL)]:
+        styles.append(NamedStyle(f"ndt_{name}", alignment=CENTER, fill=fill, border=ROW_BORDER))
+        styles.append(NamedStyle(f"ndt_{name}_thick", alignment=CENTER, fill=fill, border=ROW_THICK_BORDER))
+
+    return styles
+
+
+def register_styles(wb: Workbook) -> None:
+    """
+    Adds shared named styles to workbook, styles already defined in it (e.g. by a template) are kept
+    """
+    existing = set(wb.named_styles)
+
+    for style in _named_styles():
+        if style.name not in existing:
+            wb.add_named_style(style)
+
+
+def prime_cell_styles(ws: WriteOnlyWorksheet, number_formats: tuple[str, ...] = (FORMAT_DATE_YYYYMMDD2,)) -> None:
+    """
+    Adds every named style of workbook (as is and with each of number formats) to its cell style table
+    through cells that are never written. Style ids written to sheet xml are positions in this table, so workbooks
+    primed right after `register_styles` give cells the same ids regardless of the order cells are styled in
+    """
+    for name in ws.parent.named_styles:
+        for number_format in (None, *number_formats):
+            cell = WriteOnlyCell(ws)
+            cell.style = name
+
+            if number_format != None:
+                cell.number_format = number_format
+
+            # style id is taken from the table, the style is added when it isn't there
+            cell.style_id
+
+
+def apply_style(cell: Cell, name: str) -> Cell:
+    """
+    Sets named style of cell, number format of cell value (e.g. date format) is kept
+    """
+    if name not in cell.parent.parent.named_styles:
+        register_styles(cell.parent.parent)
+
+    number_format = cell.number_format
+
+    cell.style = name
+    cell.number_format = number_format
+
+    return cell
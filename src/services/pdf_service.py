@@ -0,0 +1,640 @@
+"""
+Minimal PDF writer for reports. Every page is written to the file as soon as it is finished,
+the writer keeps only object offsets and page ids, so memory doesn't grow with amount of pages.
+Text is set with an embedded TrueType font (Type0, Identity-H: cyrillic names are rendered), only glyphs
+used in the document are embedded, or with standard Helvetica (cp1252 only) when there is no font file
+"""
+
+from datetime import date
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    TypeAlias,
+    Union
+)
+import hashlib
+import struct
+import zlib
+import re
+
+import numpy as np
+
+
+"""
+=======================================================================================================
+Types
+=======================================================================================================
+"""
+
+
+Color: TypeAlias = tuple[float, float, float]
+PDFFont: TypeAlias = Union["TrueTypeFont", "HelveticaFont"]
+
+A4_LANDSCAPE = (842., 595.)
+
+BLACK: Color = (0., 0., 0.)
+GREY: Color = (0.75, 0.75, 0.75)
+WHITE: Color = (1., 1., 1.)
+
+
+def hex_color(value: str) -> Color:
+    """
+    Color of excel ARGB/RGB hex string, e.g. '003366FF'
+    """
+    value = value[-6:]
+
+    return tuple(int(value[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def format_value(value: str | int | float | date | None) -> str:
+    if value == None:
+        return ""
+
+    if isinstance(value, date):
+        return value.strftime("%d.%m.%Y")
+
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+
+    return str(value)
+
+
+"""
+=======================================================================================================
+Fonts
+=======================================================================================================
+"""
+
+
+class HelveticaFont:
+    """
+    Standard font, isn't embedded. Characters out of cp1252 are written as '?'
+    """
+
+    name = "Helvetica"
+    ascent = 718
+    # widths of characters 32-126, 1/1000 of font size
+    widths = [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+    ]
+
+    def text_width(self, text: str, size: float) -> float:
+        return sum(self.widths[ord(char) - 32] if 32 <= ord(char) <= 126 else 556 for char in text) * size / 1000
+
+
+    def encode(self, text: str) -> bytes:
+        data = text.encode("cp1252", errors="replace")
+
+        return b"(" + re.sub(rb"([()\\])", rb"\\\1", data) + b")"
+
+
+    def write(self, writer: "PDFWriter", obj_id: int) -> None:
+        writer.write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>", obj_id)
+
+
+# tables of embedded font subset, the rest (cmap, names, kerning) isn't used by PDF viewers
+SUBSET_TABLES = [b"cvt ", b"fpgm", b"glyf", b"head", b"hhea", b"hmtx", b"loca", b"maxp", b"prep"]
+
+# composite glyph flags
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+def read_tables(data: bytes) -> dict[bytes, tuple[int, int]]:
+    """
+    Offsets and lengths of font file tables
+    """
+    tables_count, = struct.unpack_from(">H", data, 4)
+
+    return {
+        tag: (offset, length) for tag, _, offset, length in (struct.unpack_from(">4sLLL", data, 12 + 16 * i) for i in range(tables_count))
+    }
+
+
+def read_locations(data: bytes, tables: dict[bytes, tuple[int, int]]) -> list[int]:
+    """
+    Offsets of glyphs in glyf table (loca), glyph i is data between locations i and i + 1
+    """
+    glyphs_count, = struct.unpack_from(">H", data, tables[b"maxp"][0] + 4)
+    long_format, = struct.unpack_from(">h", data, tables[b"head"][0] + 50)
+
+    if long_format:
+        return list(struct.unpack_from(f">{glyphs_count + 1}L", data, tables[b"loca"][0]))
+
+    return [location * 2 for location in struct.unpack_from(f">{glyphs_count + 1}H", data, tables[b"loca"][0])]
+
+
+def font_file(tables: dict[bytes, bytes]) -> bytes:
+    """
+    Font file of tables, head table gets checksum adjustment of the whole file
+    """
+    tags = sorted(tables)
+    entry_selector = len(tags).bit_length() - 1
+    search_range = 16 * 2 ** entry_selector
+    offset = 12 + 16 * len(tags)
+    directory, parts = [], []
+
+    for tag in tags:
+        table = tables[tag]
+
+        if tag == b"head":
+            table = table[:8] + bytes(4) + table[12:]
+            head_offset = offset
+
+        directory.append(struct.pack(">4sLLL", tag, _checksum(table), offset, len(table)))
+        parts.append(table + bytes(-len(table) % 4))
+        offset += len(parts[-1])
+
+    data = bytearray(struct.pack(">LHHHH", 0x00010000, len(tags), search_range, entry_selector, 16 * len(tags) - search_range))
+    data += b"".join(directory) + b"".join(parts)
+
+    if b"head" in tables:
+        struct.pack_into(">L", data, head_offset + 8, (0xB1B0AFBA - _checksum(data)) & 0xFFFFFFFF)
+
+    return bytes(data)
+
+
+def _checksum(data: bytes) -> int:
+    data = data + bytes(-len(data) % 4)
+
+    return sum(struct.unpack(f">{len(data) // 4}L", data)) & 0xFFFFFFFF
+
+
+class TrueTypeFont:
+    """
+    TrueType font embedded as a subset of glyphs used in the document. Glyph ids are written as character codes
+    (Identity-H), widths and unicode map (text copy and search) are written for used glyphs
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.data = self.path.read_bytes()
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", self.path.stem) or "Font"
+
+        self.tables = read_tables(self.data)
+        tables = {tag: offset for tag, (offset, _) in self.tables.items()}
+
+        units_per_em, = struct.unpack_from(">H", self.data, tables[b"head"] + 18)
+        self.scale = 1000 / units_per_em
+        self.bbox = [round(value * self.scale) for value in struct.unpack_from(">4h", self.data, tables[b"head"] + 36)]
+
+        ascent, descent = struct.unpack_from(">2h", self.data, tables[b"hhea"] + 4)
+        self.ascent, self.descent = round(ascent * self.scale), round(descent * self.scale)
+        self.cap_height = self.ascent
+
+        if b"OS/2" in tables and struct.unpack_from(">H", self.data, tables[b"OS/2"])[0] >= 2:
+            self.cap_height = round(struct.unpack_from(">h", self.data, tables[b"OS/2"] + 88)[0] * self.scale)
+
+        metrics_count, = struct.unpack_from(">H", self.data, tables[b"hhea"] + 34)
+        self.advances = [width for width, _ in struct.iter_unpack(">Hh", self.data[tables[b"hmtx"]:tables[b"hmtx"] + metrics_count * 4])]
+
+        self.glyphs = self._read_cmap(tables[b"cmap"])
+        self.used: dict[int, str] = {}
+
+
+    def _read_cmap(self, cmap: int) -> dict[int, int]:
+        """
+        Unicode subtables only: format 12 (full unicode) is preferred to format 4 (basic plane)
+        """
+        subtables_count, = struct.unpack_from(">H", self.data, cmap + 2)
+        subtables = {}
+
+        for i in range(subtables_count):
+            platform, encoding, offset = struct.unpack_from(">HHL", self.data, cmap + 4 + 8 * i)
+            subtable = cmap + offset
+            subtable_format, = struct.unpack_from(">H", self.data, subtable)
+
+            if (platform, encoding) in [(3, 1), (3, 10), (0, 3), (0, 4)] and subtable_format in (4, 12):
+                subtables.setdefault(subtable_format, subtable)
+
+        if 12 in subtables:
+            return self._read_cmap_format_12(subtables[12])
+
+        if 4 in subtables:
+            return self._read_cmap_format_4(subtables[4])
+
+        raise ValueError(f"{self.path} has no unicode cmap")
+
+
+    def _read_cmap_format_12(self, subtable: int) -> dict[int, int]:
+        groups_count, = struct.unpack_from(">L", self.data, subtable + 12)
+        glyphs = {}
+
+        for start, end, glyph in struct.iter_unpack(">3L", self.data[subtable + 16:subtable + 16 + groups_count * 12]):
+            glyphs.update(zip(range(start, end + 1), range(glyph, glyph + end - start + 1)))
+
+        return glyphs
+
+
+    def _read_cmap_format_4(self, subtable: int) -> dict[int, int]:
+        segments_count = struct.unpack_from(">H", self.data, subtable + 6)[0] // 2
+        ends = struct.unpack_from(f">{segments_count}H", self.data, subtable + 14)
+        starts = struct.unpack_from(f">{segments_count}H", self.data, subtable + 16 + 2 * segments_count)
+        deltas = struct.unpack_from(f">{segments_count}h", self.data, subtable + 16 + 4 * segments_count)
+        range_offsets_start = subtable + 16 + 6 * segments_count
+        range_offsets = struct.unpack_from(f">{segments_count}H", self.data, range_offsets_start)
+        glyphs = {}
+
+        for i, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+            for char in range(start, min(end, 0xFFFE) + 1):
+                if range_offset == 0:
+                    glyph = (char + delta) & 0xFFFF
+                else:
+                    glyph, = struct.unpack_from(">H", self.data, range_offsets_start + 2 * i + range_offset + 2 * (char - start))
+                    glyph = (glyph + delta) & 0xFFFF if glyph != 0 else 0
+
+                if glyph != 0:
+                    glyphs[char] = glyph
+
+        return glyphs
+
+
+    def _advance(self, glyph: int) -> float:
+        return self.advances[min(glyph, len(self.advances) - 1)] * self.scale
+
+
+    def text_width(self, text: str, size: float) -> float:
+        return sum(self._advance(self.glyphs.get(ord(char), 0)) for char in text) * size / 1000
+
+
+    def encode(self, text: str) -> bytes:
+        codes = []
+
+        for char in text:
+            glyph = self.glyphs.get(ord(char), 0)
+            self.used.setdefault(glyph, char)
+            codes.append(f"{glyph:04X}")
+
+        return f"<{''.join(codes)}>".encode()
+
+
+    def subset(self) -> bytes:
+        """
+        Font file with outlines of used glyphs and glyphs they are composed of, other glyphs are left empty.
+        Glyph ids are kept, so codes written by `encode` stay valid. Fonts without glyf table (CFF outlines)
+        are returned as is
+        """
+        if b"glyf" not in self.tables:
+            return self.data
+
+        start, length = self.tables[b"glyf"]
+        glyf = self.data[start:start + length]
+        locations = read_locations(self.data, self.tables)
+        kept = self._with_components(glyf, locations, {0, *self.used})
+        parts, loca = [], [0]
+
+        for glyph in range(len(locations) - 1):
+            outline = glyf[locations[glyph]:locations[glyph + 1]] if glyph in kept else b""
+            parts.append(outline + bytes(-len(outline) % 4))
+            loca.append(loca[-1] + len(parts[-1]))
+
+        tables = {tag: self.data[offset:offset + length] for tag, (offset, length) in self.tables.items() if tag in SUBSET_TABLES}
+        # loca of the subset is written in long format
+        tables[b"head"] = tables[b"head"][:50] + struct.pack(">h", 1) + tables[b"head"][52:]
+        tables[b"loca"] = struct.pack(f">{len(loca)}L", *loca)
+        tables[b"glyf"] = b"".join(parts)
+
+        return font_file(tables)
+
+
+    def _with_components(self, glyf: bytes, locations: list[int], glyphs: set[int]) -> set[int]:
+        """
+        Glyphs and components of composite glyphs among them (recursively)
+        """
+        glyphs_count = len(locations) - 1
+        glyphs = {glyph for glyph in glyphs if glyph < glyphs_count}
+        stack = list(glyphs)
+
+        while stack:
+            glyph = stack.pop()
+            start = locations[glyph]
+
+            # empty glyph, or simple one (non-negative number of contours)
+            if start == locations[glyph + 1] or struct.unpack_from(">h", glyf, start)[0] >= 0:
+                continue
+
+            position, flags = start + 10, MORE_COMPONENTS
+
+            while flags & MORE_COMPONENTS:
+                flags, component = struct.unpack_from(">HH", glyf, position)
+                position += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+
+                if flags & WE_HAVE_A_SCALE:
+                    position += 2
+                elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                    position += 4
+                elif flags & WE_HAVE_A_TWO_BY_TWO:
+                    position += 8
+
+                if component < glyphs_count and component not in glyphs:
+                    glyphs.add(component)
+                    stack.append(component)
+
+        return glyphs
+
+
+    def _subset_name(self) -> str:
+        """
+        Subset fonts are named with a tag of six capital letters, e.g. ABCDEF+DejaVuSans
+        """
+        digest = hashlib.md5(",".join(map(str, sorted(self.used))).encode()).digest()
+
+        return "".join(chr(ord("A") + value % 26) for value in digest[:6]) + f"+{self.name}"
+
+
+    def write(self, writer: "PDFWriter", obj_id: int) -> None:
+        data = self.subset()
+        name = self._subset_name()
+        font_file = writer.write_stream(data, f"/Length1 {len(data)}".encode())
+        descriptor = writer.write_object(
+            f"<< /Type /FontDescriptor /FontName /{name} /Flags 32 /FontBBox [{' '.join(map(str, self.bbox))}] "
+            f"/ItalicAngle 0 /Ascent {self.ascent} /Descent {self.descent} /CapHeight {self.cap_height} /StemV 80 "
+            f"/FontFile2 {font_file} 0 R >>".encode()
+        )
+        widths = " ".join(f"{glyph} [{round(self._advance(glyph))}]" for glyph in sorted(self.used))
+        cid_font = writer.write_object(
+            f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {descriptor} 0 R /DW 1000 /W [{widths}] /CIDToGIDMap /Identity >>".encode()
+        )
+        to_unicode = writer.write_stream(self._to_unicode())
+
+        writer.write_object(
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+            f"/DescendantFonts [{cid_font} 0 R] /ToUnicode {to_unicode} 0 R >>".encode(),
+            obj_id
+        )
+
+
+    def _to_unicode(self) -> bytes:
+        glyphs = sorted(self.used.items())
+        blocks = []
+
+        # cmap allows at most 100 entries in a block
+        for i in range(0, len(glyphs), 100):
+            block = glyphs[i:i + 100]
+            entries = "\n".join(f"<{glyph:04X}> <{char.encode('utf-16-be').hex().upper()}>" for glyph, char in block)
+            blocks.append(f"{len(block)} beginbfchar\n{entries}\nendbfchar")
+
+        return "\n".join([
+            "/CIDInit /ProcSet findresource begin",
+            "12 dict begin",
+            "begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Adobe-Identity-UCS def",
+            "/CMapType 2 def",
+            "1 begincodespacerange",
+            "<0000> <FFFF>",
+            "endcodespacerange",
+            *blocks,
+            "endcmap",
+            "CMapName currentdict /CMap defineresource pop",
+            "end",
+            "end",
+        ]).encode()
+
+
+def load_font(path: str | Path | None) -> PDFFont:
+    """
+    Embedded TrueType font of path, Helvetica if there is no font file
+    """
+    if path == None or not Path(path).is_file():
+        return HelveticaFont()
+
+    return TrueTypeFont(path)
+
+
+"""
+=======================================================================================================
+Page
+=======================================================================================================
+"""
+
+
+class PDFPage:
+    """
+    Content stream of one page, coordinates are in points from the bottom left corner
+    """
+
+    def __init__(self, font: PDFFont, size: tuple[float, float] = A4_LANDSCAPE) -> None:
+        self.font = font
+        self.width, self.height = size
+        self.ops: list[bytes] = []
+
+
+    def content(self) -> bytes:
+        return b"\n".join(self.ops)
+
+
+    def text(self, x: float, y: float, value: str, size: float = 7, color: Color = BLACK, align: str = "left", max_width: float | None = None) -> None:
+        if max_width != None:
+            while value and self.font.text_width(value, size) > max_width:
+                value = value[:-1]
+
+        if not value:
+            return
+
+        match align:
+            case "center":
+                x -= self.font.text_width(value, size) / 2
+            case "right":
+                x -= self.font.text_width(value, size)
+
+        self.ops.append(
+            f"BT /F1 {size:g} Tf {_color(color)} rg {x:.2f} {y:.2f} Td ".encode() + self.font.encode(value) + b" Tj ET"
+        )
+
+
+    def rect(self, x: float, y: float, width: float, height: float, fill: Color | None = None, stroke: Color | None = None, line_width: float = 0.5) -> None:
+        ops = ["q"]
+
+        if fill != None:
+            ops.append(f"{_color(fill)} rg")
+
+        if stroke != None:
+            ops.append(f"{_color(stroke)} RG {line_width:g} w")
+
+        ops.append(f"{x:.2f} {y:.2f} {width:.2f} {height:.2f} re {'B' if fill != None and stroke != None else 'f' if fill != None else 'S'} Q")
+        self.ops.append(" ".join(ops).encode())
+
+
+    def polyline(self, points: list[tuple[float, float]], color: Color = BLACK, line_width: float = 0.5) -> None:
+        if len(points) < 2:
+            return
+
+        path = " ".join(f"{x:.2f} {y:.2f} {'m' if e == 0 else 'l'}" for e, (x, y) in enumerate(points))
+        self.ops.append(f"q {_color(color)} RG {line_width:g} w {path} S Q".encode())
+
+
+    def table_row(self, x: float, y: float, widths: list[float], values: list[str], fills: list[Color], height: float, size: float = 6, color: Color = BLACK) -> None:
+        """
+        Row of cells with top left corner in (x, y), text is centered and cut to the cell width
+        """
+        for width, value, fill in zip(widths, values, fills):
+            self.rect(x, y - height, width, height, fill=fill, stroke=GREY, line_width=0.3)
+            self.text(x + width / 2, y - height + (height - size * 0.7) / 2, value, size=size, color=color, align="center", max_width=width - 2)
+            x += width
+
+
+    def line_chart(self, x: float, y: float, width: float, height: float, title: str, categories: list[str], series: list[tuple[str, list[float]]], y_axis: str | None = None) -> None:
+        """
+        Chart with bottom left corner in (x, y): one line per series over evenly spaced categories
+        """
+        self.rect(x, y, width, height, stroke=GREY)
+        self.text(x + width / 2, y + height - 9, title, size=6.5, align="center", max_width=width - 4)
+
+        legend_x = x + 4
+
+        for e, (name, _) in enumerate(series):
+            color = CHART_COLORS[e % len(CHART_COLORS)]
+            self.rect(legend_x, y + height - 17, 6, 3, fill=color)
+            self.text(legend_x + 8, y + height - 18, name, size=5)
+            legend_x += 12 + self.font.text_width(name, 5)
+
+        plot_x, plot_y = x + 26, y + 16
+        plot_width, plot_height = width - 32, height - 40
+
+        values = np.array([values for _, values in series], dtype=float)
+        top = _nice_top(values.max() if values.size else 0.)
+
+        for tick in np.linspace(0, top, 5):
+            tick_y = plot_y + plot_height * tick / top
+            self.polyline([(plot_x, tick_y), (plot_x + plot_width, tick_y)], color=GREY, line_width=0.2)
+            self.text(plot_x - 2, tick_y - 2, format_value(float(tick)), size=5, align="right")
+
+        if y_axis != None:
+            self.text(x + 2, y + height - 26, y_axis, size=5)
+
+        step = plot_width / max(len(categories) - 1, 1)
+        label_every = max(1, int(np.ceil(len(categories) * 30 / plot_width)))
+
+        for e, category in enumerate(categories):
+            if e % label_every == 0:
+                self.text(plot_x + e * step, y + 6, category, size=4.5, align="center")
+
+        for e, row in enumerate(values):
+            points = [(plot_x + i * step, plot_y + plot_height * value / top) for i, value in enumerate(row)]
+            color = CHART_COLORS[e % len(CHART_COLORS)]
+
+            self.polyline(points, color=color, line_width=0.8)
+
+            for point_x, point_y in points:
+                self.rect(point_x - 0.8, point_y - 0.8, 1.6, 1.6, fill=color)
+
+
+CHART_COLORS: list[Color] = [hex_color("4472C4"), hex_color("ED7D31"), hex_color("A5A5A5")]
+
+
+def _color(color: Color) -> str:
+    return " ".join(f"{value:.3f}" for value in color)
+
+
+def _nice_top(value: float) -> float:
+    """
+    Upper bound of chart axis: 1, 2, 2.5 or 5 times a power of ten, not less than value
+    """
+    if value <= 0:
+        return 1.
+
+    power = 10 ** np.floor(np.log10(value))
+
+    for factor in (1, 2, 2.5, 5, 10):
+        if factor * power >= value:
+            return float(factor * power)
+
+
+"""
+=======================================================================================================
+Writer
+=======================================================================================================
+"""
+
+
+class PDFWriter:
+    """
+    Objects are written in order of creation, ids of the catalog, page tree and font are reserved
+    in advance: pages refer to them before they are written on close
+    """
+
+    def __init__(self, path: str | Path, font: PDFFont, page_size: tuple[float, float] = A4_LANDSCAPE) -> None:
+        self.font = font
+        self.page_size = page_size
+        self.offsets: list[int | None] = [None]
+        self.page_ids: list[int] = []
+
+        self.file: BinaryIO = open(path, "wb")
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        self.catalog_id = self.reserve()
+        self.pages_id = self.reserve()
+        self.font_id = self.reserve()
+
+
+    def __enter__(self) -> "PDFWriter":
+        return self
+
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type == None:
+            self.close()
+        else:
+            self.file.close()
+
+
+    def new_page(self) -> PDFPage:
+        return PDFPage(self.font, self.page_size)
+
+
+    def reserve(self) -> int:
+        self.offsets.append(None)
+
+        return len(self.offsets) - 1
+
+
+    def write_object(self, body: bytes, obj_id: int | None = None) -> int:
+        obj_id = obj_id if obj_id != None else self.reserve()
+        self.offsets[obj_id] = self.file.tell()
+
+        self.file.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        return obj_id
+
+
+    def write_stream(self, data: bytes, extra: bytes = b"") -> int:
+        data = zlib.compress(data)
+
+        return self.write_object(f"<< /Length {len(data)} /Filter /FlateDecode ".encode() + extra + b" >>\nstream\n" + data + b"\nendstream")
+
+
+    def add_page(self, page: PDFPage) -> None:
+        contents = self.write_stream(page.content())
+
+        self.page_ids.append(self.write_object(
+            f"<< /Type /Page /Parent {self.pages_id} 0 R /MediaBox [0 0 {page.width:g} {page.height:g}] "
+            f"/Resources << /Font << /F1 {self.font_id} 0 R >> >> /Contents {contents} 0 R >>".encode()
+        ))
+
+
+    def close(self) -> None:
+        self.font.write(self, self.font_id)
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+
+        self.write_object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode(), self.pages_id)
+        self.write_object(f"<< /Type /Catalog /Pages {self.pages_id} 0 R >>".encode(), self.catalog_id)
+
+        xref = self.file.tell()
+        entries = "".join(f"{offset:010d} 00000 n \n" for offset in self.offsets[1:])
+
+        self.file.write(
+            f"xref\n0 {len(self.offsets)}\n0000000000 65535 f \n{entries}"
+            f"trailer\n<< /Size {len(self.offsets)} /Root {self.catalog_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        )
+        self.file.close()
@@ -1,21 +1,25 @@
-from typing import Mapping, Sequence, TypeVar, Any
+from typing import Mapping, Sequence, Iterator, TypeVar, Any
 from dateutil.parser import parser
+from threading import Event, Lock, Thread
 from queue import Queue
+from time import sleep, time
 from re import compile
 
 from pathlib import Path
-from rich.progress import Progress, BarColumn, TaskProgressColumn, MofNCompleteColumn, TimeElapsedColumn, TimeRemainingColumn
-from json import load
+from rich.progress import Progress, ProgressColumn, BarColumn, TaskProgressColumn, MofNCompleteColumn, TimeElapsedColumn, TimeRemainingColumn
+from pydantic import BaseModel
+from json import load, loads, dumps
 
 DictKey = TypeVar("DictKey")
 DictValue = TypeVar("DictValue")
 DictSequenceValue = TypeVar("DictSequenceValue")
+JSONLModel = TypeVar("JSONLModel", bound=BaseModel)
 numbers = compile(r"[0-9]+")
 
 
 class ThreadProgressBarQueue(Queue):
 
-    def init_progress_bar(self) -> None:
+    def init_progress_bar(self, *extra_columns: ProgressColumn | str) -> None:
         progress_columns = (
             "[blue]Processing...", 
             BarColumn(), 
@@ -24,22 +28,128 @@ class ThreadProgressBarQueue(Queue):
             MofNCompleteColumn(),
             TimeElapsedColumn(),
             "[blue]remaining: ",
-            TimeRemainingColumn()
+            TimeRemainingColumn(),
+            *extra_columns
         )
         self.progress_bar = Progress(*progress_columns)
         self.progress_bar.start()
         self.task = self.progress_bar.add_task("Processing", total=self.qsize(), )
 
 
-    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+    def advance(self) -> None:
         self.progress_bar.update(self.task, advance=1)
-        return super().get(block, timeout)
+
+
+    def stop_progress_bar(self) -> None:
+        self.progress_bar.stop()
 
 
 def load_json(path: str | Path) -> Mapping:
     return load(open(path, "r", encoding="utf-8"))
 
 
+class JSONLWriter:
+    """
+    Thread safe writer of newline-delimited json, every line is flushed as soon as it's written,
+    so readers see only complete records.
+    `<path>.writing` marker exists while the file is open, followers of the file wait for new lines until it's removed.
+    The marker is touched every `heartbeat` seconds, a marker left by a crashed writer stops being touched
+    and followers treat it as the end of the file once it's older than their `stale_after`
+    """
+
+    heartbeat = 5.
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.marker = self.path.with_name(f"{self.path.name}.writing")
+        self._lock = Lock()
+        self._file = None
+        self._closed = Event()
+
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.marker.touch()
+        self._file = open(self.path, "w", encoding="utf-8")
+
+        self._closed.clear()
+        Thread(target=self._beat, daemon=True).start()
+
+
+    def _beat(self) -> None:
+        while not self._closed.wait(self.heartbeat):
+            try:
+                self.marker.touch()
+            except OSError:
+                pass
+
+
+    def write(self, records: Sequence[Mapping]) -> None:
+        lines = "".join(dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+
+    def close(self) -> None:
+        self._closed.set()
+
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+            self.marker.unlink(missing_ok=True)
+
+
+def iter_jsonl(path: str | Path, follow: bool = False, poll_interval: float = 1., stale_after: float = 60.) -> Iterator[Mapping]:
+    """
+    Yields records of newline-delimited json file one by one
+
+    :follow - keep waiting for new lines while the file is being written by JSONLWriter
+    :stale_after - seconds without writer's heartbeat after which the writer is taken for crashed
+    """
+    path = Path(path)
+    marker = path.with_name(f"{path.name}.writing")
+
+    with open(path, "r", encoding="utf-8") as file:
+        while True:
+            position = file.tell()
+            line = file.readline()
+
+            if line.endswith("\n"):
+                if line.strip():
+                    yield loads(line)
+                continue
+
+            if follow and _is_writing(marker, stale_after):
+                file.seek(position)
+                sleep(poll_interval)
+                continue
+
+            for rest in (line + file.read()).splitlines():
+                if rest.strip():
+                    yield loads(rest)
+
+            return
+
+
+def _is_writing(marker: Path, stale_after: float) -> bool:
+    try:
+        return time() - marker.stat().st_mtime < stale_after
+    except FileNotFoundError:
+        return False
+
+
+def iter_jsonl_models(path: str | Path, model: type[JSONLModel], follow: bool = False) -> Iterator[JSONLModel]:
+    """
+    Lazy validation: a model is built only when it's requested
+    """
+    for record in iter_jsonl(path, follow):
+        yield model.model_validate(record)
+
+
 def str_to_date(date_string: str):
     try:
         return parser().parse(date_string).date()
@@ -0,0 +1,191 @@
+"""
+Assembly of xlsx packages (Open Packaging Conventions): sheets saved by separate workbooks are moved
+into a workbook saved with empty sheets of the same titles. Parts are found through relationships
+and [Content_Types].xml only, nothing depends on the library that wrote the packages
+"""
+
+from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
+from zipfile import ZipFile
+import posixpath
+import re
+
+
+PACKAGE_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DOCUMENT_RELS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+"""
+=======================================================================================================
+Package parts
+=======================================================================================================
+"""
+
+
+def rels_path(part: str) -> str:
+    folder, name = posixpath.split(part)
+
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def resolve_target(part: str, target: str) -> str:
+    """
+    Part name (without leading slash) of relationship target, targets are absolute or relative to the source part
+    """
+    if target.startswith("/"):
+        return target[1:]
+
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+
+
+def read_relationships(package: ZipFile, part: str) -> list[ElementTree.Element]:
+    try:
+        relationships = package.read(rels_path(part))
+    except KeyError:
+        return []
+
+    return list(ElementTree.fromstring(relationships).iter(f"{{{PACKAGE_RELS_NS}}}Relationship"))
+
+
+def relationships_xml(relationships: list[ElementTree.Element]) -> bytes:
+    lines = [f'<Relationship {" ".join(f"{key}={quoteattr(value)}" for key, value in rel.attrib.items())}/>' for rel in relationships]
+
+    return f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{PACKAGE_RELS_NS}">{"".join(lines)}</Relationships>'.encode()
+
+
+def workbook_part(package: ZipFile) -> str:
+    for rel in read_relationships(package, ""):
+        if rel.get("Type") == f"{DOCUMENT_RELS_NS}/officeDocument":
+            return resolve_target("", rel.get("Target"))
+
+    raise ValueError("package has no workbook")
+
+
+def related_part(package: ZipFile, part: str, relationship_type: str) -> str | None:
+    for rel in read_relationships(package, part):
+        if rel.get("Type") == f"{DOCUMENT_RELS_NS}/{relationship_type}":
+            return resolve_target(part, rel.get("Target"))
+
+    return None
+
+
+def sheet_parts(package: ZipFile) -> dict[str, str]:
+    """
+    Sheet titles and their part names in workbook order
+    """
+    workbook = workbook_part(package)
+    targets = {rel.get("Id"): resolve_target(workbook, rel.get("Target")) for rel in read_relationships(package, workbook)}
+
+    return {
+        sheet.get("name"): targets[sheet.get(f"{{{DOCUMENT_RELS_NS}}}id")]
+        for sheet in ElementTree.fromstring(package.read(workbook)).iter(f"{{{SPREADSHEET_NS}}}sheet")
+    }
+
+
+def styles_part(package: ZipFile) -> bytes:
+    workbook = workbook_part(package)
+
+    return package.read(related_part(package, workbook, "styles"))
+
+
+def content_types(package: ZipFile) -> dict[str, str]:
+    return {
+        override.get("PartName")[1:]: override.get("ContentType")
+        for override in ElementTree.fromstring(package.read("[Content_Types].xml")).iter(f"{{{CONTENT_TYPES_NS}}}Override")
+    }
+
+
+"""
+=======================================================================================================
+Assembler
+=======================================================================================================
+"""
+
+
+class SheetAssembler:
+    """
+    Writes `target` package: parts of `skeleton` except the sheets being replaced, then sheets of other packages
+    with everything they refer to (drawings, charts). Copied parts get the next free numbers of their kind,
+    relationships of copied parts are rewritten to the new names.
+    Cell style ids of replacing sheets are kept, so their packages must have the same styles part as the skeleton (see `styles_part`)
+    """
+
+    def __init__(self, skeleton: ZipFile, target: ZipFile, titles: list[str]) -> None:
+        self.skeleton = skeleton
+        self.target = target
+        self.sheets = sheet_parts(skeleton)
+        self.names = set(skeleton.namelist())
+        self.overrides: list[tuple[str, str]] = []
+        self._numbers: dict[tuple[str, str, str], int] = {}
+
+        replaced = {self.sheets[title] for title in titles}
+        replaced |= {rels_path(part) for part in replaced}
+
+        for item in skeleton.infolist():
+            if item.filename not in replaced and item.filename != "[Content_Types].xml":
+                target.writestr(item, skeleton.read(item.filename))
+
+
+    def add_sheets(self, package: ZipFile) -> None:
+        types = content_types(package)
+        copied: dict[str, str] = {}
+
+        for title, part in sheet_parts(package).items():
+            self._copy(package, part, self.sheets[title], types, copied)
+
+
+    def close(self) -> None:
+        overrides = "".join(f"<Override PartName={quoteattr('/' + name)} ContentType={quoteattr(content_type)}/>" for name, content_type in self.overrides)
+        types = self.skeleton.read("[Content_Types].xml")
+
+        self.target.writestr("[Content_Types].xml", types.replace(b"</Types>", overrides.encode() + b"</Types>"))
+
+
+    def _copy(self, package: ZipFile, part: str, name: str, types: dict[str, str], copied: dict[str, str]) -> None:
+        copied[part] = name
+        self.target.writestr(name, package.read(part))
+
+        relationships = read_relationships(package, part)
+
+        for rel in relationships:
+            if rel.get("TargetMode") == "External":
+                continue
+
+            source = resolve_target(part, rel.get("Target"))
+
+            if source not in copied:
+                related = self._next_name(source)
+
+                # parts without override have a default content type of their extension
+                if source in types:
+                    self.overrides.append((related, types[source]))
+
+                self._copy(package, source, related, types, copied)
+
+            rel.set("Target", f"/{copied[source]}")
+
+        if relationships != []:
+            self.target.writestr(rels_path(name), relationships_xml(relationships))
+
+
+    def _next_name(self, part: str) -> str:
+        """
+        xl/charts/chart3.xml -> xl/charts/chart{n}.xml, n is the next number not taken in the target package
+        """
+        folder, name = posixpath.split(part)
+        stem, extension = re.fullmatch(r"(.*?)\d*(\.[^.]+)", name).groups()
+        kind = (folder, stem, extension)
+
+        if kind not in self._numbers:
+            pattern = re.compile(rf"{re.escape(stem)}(\d+){re.escape(extension)}")
+            taken = [pattern.fullmatch(posixpath.basename(taken)) for taken in self.names if posixpath.dirname(taken) == folder]
+
+            self._numbers[kind] = max([int(match.group(1)) for match in taken if match], default=0)
+
+        self._numbers[kind] += 1
+        next_name = posixpath.join(folder, f"{stem}{self._numbers[kind]}{extension}")
+        self.names.add(next_name)
+
+        return next_name
@@ -0,0 +1,69 @@
+from pathlib import Path
+import subprocess
+import sys
+import re
+
+import pytest
+
+
+ROOT = Path(__file__).parents[2]
+IMPORT_TIME_BUDGET = .5
+HEAVY_MODULES = {"sqlalchemy", "openpyxl", "lxml", "pydantic", "aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}
+
+
+def imported_modules(*args: str) -> tuple[set[str], float]:
+    """
+    Runs cli under `python -X importtime`, returns top-level packages imported and cumulative import time in seconds
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "rencon.py", *args, "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    assert process.returncode == 0, process.stderr
+
+    modules = set()
+    total = 0
+
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+
+        if match == None:
+            continue
+
+        modules.add(match.group(3).split(".")[0])
+
+        if match.group(2) == " ":
+            total += int(match.group(1))
+
+    return (modules, total / 1_000_000)
+
+
+class TestImportTime:
+
+    def test_group_help(self) -> None:
+        modules, total = imported_modules()
+
+        assert modules & HEAVY_MODULES == set()
+        assert total < IMPORT_TIME_BUDGET
+
+
+    @pytest.mark.parametrize(
+            "command, unrelated",
+            [
+                ("rename-folders", {"openpyxl", "lxml", "aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}),
+                ("migrate-db", {"openpyxl", "lxml", "aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}),
+                ("init-db", {"openpyxl", "lxml", "aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}),
+                ("manage-welder-data", {"openpyxl", "lxml", "aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}),
+                ("parse-personal", {"openpyxl", "googleapiclient", "google_auth_oauthlib", "cv2", "numpy"}),
+                ("ndt-report", {"aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2"}),
+                ("parse-ndt-report", {"aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2"}),
+                ("manage-welder-registry", {"aiohttp", "googleapiclient", "google_auth_oauthlib", "cv2"}),
+                ("welder-notifications", {"aiohttp", "cv2"}),
+            ]
+    )
+    def test_command_imports(self, command: str, unrelated: set[str]) -> None:
+        modules, _ = imported_modules(command)
+
+        assert modules & unrelated == set()
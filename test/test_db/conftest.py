@@ -1,19 +1,22 @@
+from datetime import date
 import pytest
 import json
 
-from src.db.session import Base, engine
+from src.db.session import Base, get_engine
+from src.db.migrations import Migrator, schema_migrations
 from settings import MODE, TEST_WELDERS
 
-from src.domain import WelderModel
+from src.domain import WelderModel, WelderNDTModel
 
 
 @pytest.fixture(scope="session", autouse=True)
 def prepare_db():
     assert MODE == "TEST"
 
-    Base.metadata.create_all(engine)
+    Migrator(get_engine()).migrate()
     yield
-    Base.metadata.drop_all(engine)
+    Base.metadata.drop_all(get_engine())
+    schema_migrations.drop(get_engine(), checkfirst=True)
 
 
 @pytest.fixture
@@ -21,3 +24,30 @@ def welders() -> list[WelderModel]:
     welders_json = json.load(open(TEST_WELDERS, "r", encoding="utf-8"))
 
     return [WelderModel.model_validate(welder) for welder in welders_json]
+
+
+@pytest.fixture
+def ndts(welders: list[WelderModel]) -> list[WelderNDTModel]:
+    """
+    Two ndt rows for every welder having several certifications
+    """
+    ndts = []
+
+    for welder in [welder for welder in welders if len(welder.certifications or []) > 1][:10]:
+        for day in [1, 2]:
+            ndt = WelderNDTModel(
+                kleymo=welder.kleymo,
+                comp="comp",
+                subcon="subcon",
+                project="project",
+                latest_welding_date=date(2024, 1, day),
+                total_weld_1=10,
+                total_ndt_1=5,
+                total_accepted_1=4,
+                total_repair_1=1,
+                repair_status_1=0.2
+            )
+            ndt.set_id()
+            ndts.append(ndt)
+
+    return ndts
@@ -0,0 +1,55 @@
+from datetime import date
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Connection, Select, text
+
+from src.db.repository import NDTRepository, WelderCertificationRepository
+from src.db.session import get_engine
+from src.domain import NDTRequest, WelderCertificationRequest
+
+
+def explain(connection: Connection, stmt: Select) -> list[tuple[str, str | None]]:
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+def plan_nodes(node: dict) -> Iterator[tuple[str, str | None]]:
+    yield (node["Node Type"], node.get("Relation Name"))
+
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def ndt_statement(request: NDTRequest) -> Select:
+    repo = NDTRepository()
+
+    return repo._paginate(repo._select_many(request), request)
+
+
+class TestIndexes:
+    """
+    Sequential scans are disabled, so planner falls back to them only when no index can serve the query
+    """
+
+    @pytest.mark.parametrize(
+            "stmt",
+            [
+                ndt_statement(NDTRequest(comps=["comp"], subcomps=["subcon"], projects=["project"], date_from=date(2024, 1, 1), date_before=date(2024, 2, 1))),
+                ndt_statement(NDTRequest(kleymos=["AB12"], limit=100)),
+                ndt_statement(NDTRequest(names=["Name"])),
+                ndt_statement(NDTRequest(date_from=date(2024, 1, 1), limit=100)),
+                WelderCertificationRepository()._select_with_full_names(
+                    WelderCertificationRequest(expiration_date_from=date(2024, 1, 1), expiration_date_before=date(2024, 3, 1), names=["Name"])
+                ),
+            ]
+    )
+    def test_no_sequential_scans(self, stmt: Select) -> None:
+        with get_engine().begin() as connection:
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+            nodes = explain(connection, stmt)
+
+        assert [relation for node_type, relation in nodes if node_type == "Seq Scan"] == []
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from src.db.migrations import MIGRATIONS, Migrator, schema_migrations
+from src.db.session import get_engine
+
+
+class TestMigrator:
+    """
+    Schema of the test database is already migrated, migrations run again on top of it
+    as on a database created before schema_migrations
+    """
+
+    @pytest.fixture
+    def migrator(self):
+        schema_migrations.drop(get_engine(), checkfirst=True)
+
+        yield Migrator(get_engine())
+
+
+    def applied_versions(self) -> list[str]:
+        with get_engine().begin() as connection:
+            return list(connection.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version)).scalars())
+
+
+    def test_migrate_twice(self, migrator: Migrator) -> None:
+        versions = [migration.version for migration in MIGRATIONS]
+
+        assert [migration.version for migration in migrator.migrate()] == versions
+        assert migrator.migrate() == []
+        assert migrator.pending() == []
+        assert self.applied_versions() == versions
+
+
+    def test_concurrent_migrations_apply_once(self, migrator: Migrator) -> None:
+        with ThreadPoolExecutor(2) as executor:
+            runs = list(executor.map(lambda _: Migrator(get_engine()).migrate(), range(2)))
+
+        assert sorted(migration.version for run in runs for migration in run) == [migration.version for migration in MIGRATIONS]
+        assert self.applied_versions() == [migration.version for migration in MIGRATIONS]
@@ -0,0 +1,141 @@
+import pytest
+
+from src.db.repository import NDTRepository, WelderRepository
+from src.report_commands.ndt_report_services import NDTDataPrepocessor
+from src.domain import WelderModel, WelderNDTModel, NDTRequest
+
+
+class TestNDTRepository:
+    repo = NDTRepository()
+    welder_repo = WelderRepository()
+
+
+    @pytest.fixture
+    def stored_ndts(self, welders: list[WelderModel], ndts: list[WelderNDTModel]):
+        self.welder_repo.upsert_many(welders)
+        self.repo.upsert_many(ndts)
+
+        yield ndts
+
+        self.repo.delete(ndts)
+
+
+    def test_get_many_without_duplicates(self, stored_ndts: list[WelderNDTModel]) -> None:
+        response = self.repo.get_many(NDTRequest())
+        ids = [ndt.ndt_id for ndt in response.result]
+
+        assert len(ids) == len(set(ids)) == len(stored_ndts)
+        assert response.count == len(stored_ndts)
+
+
+    def test_get_many_by_name(self, stored_ndts: list[WelderNDTModel], welders: list[WelderModel]) -> None:
+        welder = next(welder for welder in welders if welder.kleymo == stored_ndts[0].kleymo)
+        response = self.repo.get_many(NDTRequest(names=[welder.full_name]))
+
+        assert welder.kleymo in {ndt.kleymo for ndt in response.result}
+        assert {ndt.full_name for ndt in response.result} == {welder.full_name}
+
+
+    def test_get_many_by_certification_number(self, stored_ndts: list[WelderNDTModel], welders: list[WelderModel]) -> None:
+        welder = next(welder for welder in welders if welder.kleymo == stored_ndts[0].kleymo)
+        response = self.repo.get_many(NDTRequest(certification_numbers=[welder.certifications[0].certification_number]))
+        ids = [ndt.ndt_id for ndt in response.result]
+
+        assert welder.kleymo in {ndt.kleymo for ndt in response.result}
+        assert len(ids) == len(set(ids))
+
+
+    def test_get_many_skips_unknown_welders(self, stored_ndts: list[WelderNDTModel]) -> None:
+        unknown = stored_ndts[0].model_copy(update={"kleymo": "ZZZZ"})
+        unknown.set_id()
+        self.repo.upsert_many([unknown])
+
+        try:
+            response = self.repo.get_many(NDTRequest())
+        finally:
+            self.repo.delete([unknown])
+
+        assert unknown.ndt_id not in {ndt.ndt_id for ndt in response.result}
+        assert response.count == len(stored_ndts)
+
+
+    def keyset_pages(self) -> list[str]:
+        request = NDTRequest(limit=3)
+        ids = []
+
+        while True:
+            response = self.repo.get_many(request)
+            ids += [ndt.ndt_id for ndt in response.result]
+
+            if response.cursor == None:
+                return ids
+
+            request = NDTRequest(limit=3, after=response.cursor)
+
+
+    def test_get_many_keyset_pages(self, stored_ndts: list[WelderNDTModel]) -> None:
+        ids = self.keyset_pages()
+
+        assert sorted(ids) == sorted(ndt.ndt_id for ndt in stored_ndts)
+
+
+    @pytest.fixture
+    def undated_ndts(self, welders: list[WelderModel], ndts: list[WelderNDTModel]):
+        """
+        Every third ndt and both ndts of the first welder have no welding date
+        """
+        for ndt in ndts[::3] + ndts[:2]:
+            ndt.latest_welding_date = None
+
+        self.welder_repo.upsert_many(welders)
+        self.repo.upsert_many(ndts)
+
+        yield ndts
+
+        self.repo.delete(ndts)
+
+
+    def test_get_many_keyset_pages_with_null_dates(self, undated_ndts: list[WelderNDTModel]) -> None:
+        ids = self.keyset_pages()
+        undated = {ndt.ndt_id for ndt in undated_ndts if ndt.latest_welding_date == None}
+
+        assert sorted(ids) == sorted(ndt.ndt_id for ndt in undated_ndts)
+        # rows without date go last
+        assert set(ids[-len(undated):]) == undated
+
+
+    @pytest.fixture
+    def tied_ndts(self, welders: list[WelderModel], ndts: list[WelderNDTModel]):
+        """
+        Every other welder has two ndts of its latest date (another project), all welders share the dates
+        """
+        tied = []
+
+        for ndt in ndts[1::4]:
+            tie = ndt.model_copy(update={"project": "project_2", "total_weld_1": 7, "total_ndt_1": 3, "total_accepted_1": 3})
+            tie.set_id()
+            tied.append(tie)
+
+        self.welder_repo.upsert_many(welders)
+        self.repo.upsert_many(ndts + tied)
+
+        yield ndts + tied
+
+        self.repo.delete(ndts + tied)
+
+
+    @pytest.mark.parametrize("stored", ["tied_ndts", "undated_ndts"])
+    @pytest.mark.parametrize("limit", [1, 2, 3])
+    def test_sql_aggregation_matches_python(self, request: pytest.FixtureRequest, stored: str, limit: int) -> None:
+        request.getfixturevalue(stored)
+        preprocessor = NDTDataPrepocessor()
+
+        main_page, sorted_rows = preprocessor.preprocess(self.repo.get_many(NDTRequest()).result, limit=limit)
+        sql_main_page, sql_sorted_rows = preprocessor.preprocess_aggregated(
+            self.repo.get_latest_per_welder(NDTRequest(), limit=limit).result,
+            self.repo.get_date_totals(NDTRequest(), limit=limit).result,
+            limit=limit
+        )
+
+        assert sql_sorted_rows == sorted_rows
+        assert sql_main_page == main_page
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import select, func
+
+from src.db.db_tables import WelderTable
+from src.db.repository import WelderRepository
+from src.db.session import get_engine
+from src.db.unit_of_work import CommandScope, SQLalchemyUnitOfWork, use_session
+from src.domain import WelderModel
+
+
+def stored(welders: list[WelderModel]) -> int:
+    """
+    Count seen by another connection
+    """
+    stmt = select(func.count()).select_from(WelderTable).where(WelderTable.kleymo.in_([welder.kleymo for welder in welders]))
+
+    with get_engine().connect() as connection:
+        return connection.scalar(stmt)
+
+
+class TestCommandScope:
+    repo = WelderRepository()
+
+
+    @pytest.fixture
+    def new_welders(self):
+        welders = [WelderModel(kleymo=kleymo, full_name=f"Scope {kleymo}", certifications=[]) for kleymo in ["ZZ01", "ZZ02"]]
+
+        yield welders
+
+        self.repo.delete(welders)
+
+
+    def test_reads_dont_keep_transaction(self) -> None:
+        with CommandScope() as scope:
+            with use_session() as session:
+                session.execute(select(1))
+
+            assert not scope.session.in_transaction()
+
+
+    def test_unit_commits_before_command_ends(self, new_welders: list[WelderModel]) -> None:
+        with CommandScope() as scope:
+            self.repo.upsert_many(new_welders)
+
+            assert stored(new_welders) == len(new_welders)
+            assert not scope.session.in_transaction()
+            assert scope.metrics.statements > 0
+
+
+    def test_nested_unit_is_savepoint(self, new_welders: list[WelderModel]) -> None:
+        with CommandScope():
+            with SQLalchemyUnitOfWork() as transaction:
+                with SQLalchemyUnitOfWork() as nested:
+                    nested.connection.execute(WelderTable.__table__.insert().values(new_welders[0].orm_data))
+                    nested.rollback()
+
+                transaction.connection.execute(WelderTable.__table__.insert().values(new_welders[1].orm_data))
+
+        assert stored(new_welders) == 1
@@ -0,0 +1,16 @@
+import pytest
+
+from src.db.repository import WelderCertificationRepository, WelderRepository
+from src.domain import WelderModel, WelderCertificationRequest
+
+
+class TestWelderCertificationRepository:
+    repo = WelderCertificationRepository()
+
+
+    @pytest.mark.usefixtures('welders')
+    def test_names_filter(self, welders: list[WelderModel]) -> None:
+        WelderRepository().upsert_many(welders)
+
+        assert self.repo.get_many_with_full_names(WelderCertificationRequest(names=[])) == []
+        assert len(self.repo.get_many_with_full_names(WelderCertificationRequest())) > 0
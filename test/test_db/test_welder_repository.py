@@ -66,4 +66,19 @@ class TestWelderRepository:
         welder = welders[0]
 
         self.repo.delete([welder])
-        assert self.repo.count == len(welders) - 1
\ No newline at end of file
+        assert self.repo.count == len(welders) - 1
+
+    @pytest.mark.usefixtures('welders')
+    def test_upsert_many(self, welders: list[WelderModel]) -> None:
+        self.repo.upsert_many(welders)
+        result = self.repo.upsert_many(welders)["welder_table"]
+
+        assert self.repo.count == len(welders)
+        assert result.unchanged == len(welders)
+
+
+    @pytest.mark.usefixtures('welders')
+    def test_existing_kleymos(self, welders: list[WelderModel]) -> None:
+        kleymos = {welder.kleymo for welder in welders}
+
+        assert self.repo.existing_kleymos(kleymos | {"0000"}) == kleymos
@@ -0,0 +1,55 @@
+from datetime import date
+from pathlib import Path
+
+from PyPDF2 import PdfReader
+import pytest
+
+from src.report_commands import ndt_report_services
+from src.report_commands.ndt_report_services import NDTDataPrepocessor, NDTReportPDFSaveService
+from src.domain import WelderNDTModel
+
+
+DEJAVU_PATH = Path("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+
+
+def ndt(kleymo: str, full_name: str, day: int, total_ndt_1: float, total_accepted_1: float) -> WelderNDTModel:
+    return WelderNDTModel.model_construct(
+        full_name = full_name,
+        kleymo = kleymo,
+        latest_welding_date = date(2024, 1, day),
+        total_weld_1 = total_ndt_1,
+        total_ndt_1 = total_ndt_1,
+        total_accepted_1 = total_accepted_1,
+        ndt_id = f"{kleymo}{day}"
+    )
+
+
+@pytest.mark.parametrize("font_path", [
+    None,
+    pytest.param(DEJAVU_PATH, marks=pytest.mark.skipif(not DEJAVU_PATH.exists(), reason="no TrueType font")),
+])
+def test_dump_report(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, font_path: Path | None) -> None:
+    monkeypatch.setattr(ndt_report_services, "STATIC_DIR", tmp_path)
+
+    ndts = [
+        ndt("AAAA", "Иванов Иван", 3, 10, 8),
+        ndt("BBBB", "Smith John", 3, 4, 4),
+        ndt("AAAA", "Иванов Иван", 2, 20, 20),
+    ]
+
+    NDTReportPDFSaveService(font_path).dump_report(*NDTDataPrepocessor().preprocess(ndts, limit=10))
+
+    reader = PdfReader(tmp_path / "report.pdf", strict=True)
+    texts = [page.extract_text() for page in reader.pages]
+
+    # main page and a page of every welder
+    assert len(reader.pages) == 3
+    assert "Welders" in texts[0] and "03.01.2024" in texts[0]
+    assert "AAAA" in texts[1] and "02.01.2024" in texts[1]
+    assert "Smith John" in texts[2]
+
+    if font_path != None:
+        assert "Иванов Иван" in texts[1]
+    else:
+        # Helvetica has no cyrillic characters
+        assert "?????? ????" in texts[1]
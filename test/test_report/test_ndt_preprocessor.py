@@ -0,0 +1,43 @@
+from datetime import date
+
+from src.report_commands.ndt_report_services import NDTDataPrepocessor
+from src.domain import WelderNDTModel
+
+
+def ndt(kleymo: str, day: int, total_ndt_1: float | None, total_accepted_1: float | None) -> WelderNDTModel:
+    return WelderNDTModel.model_construct(
+        kleymo = kleymo,
+        latest_welding_date = date(2024, 1, day),
+        total_weld_1 = total_ndt_1,
+        total_ndt_1 = total_ndt_1,
+        total_accepted_1 = total_accepted_1,
+        ndt_id = f"{kleymo}{day}"
+    )
+
+
+def test_preprocess() -> None:
+    ndts = [
+        ndt("AAAA", 3, 10, 8),
+        ndt("BBBB", 3, 4, 4),
+        ndt("AAAA", 2, 20, 20),
+        ndt("BBBB", 1, None, None),
+        ndt("AAAA", 1, 5, 5),
+    ]
+
+    main_page, sorted_rows = NDTDataPrepocessor().preprocess(ndts, limit=2)
+
+    assert list(sorted_rows) == ["AAAA", "BBBB"]
+    assert [row.latest_welding_date.day for row in sorted_rows["AAAA"]] == [3, 2]
+    assert [row.repair_status_1 for row in sorted_rows["AAAA"]] == [20.0, 0.0]
+    assert sorted_rows["BBBB"][1].total_ndt_1 == 0 and sorted_rows["BBBB"][1].repair_status_1 == 0.0
+
+    welder_a, welder_b = main_page.summarized_welder_ndts
+
+    # 10 < 20 is added to the previous value, 4 > 0 replaces it
+    assert (welder_a.latest_welding_date.day, welder_a.total_ndt_1, welder_a.total_accepted_1) == (3, 30, 28)
+    assert (welder_b.latest_welding_date.day, welder_b.total_ndt_1, welder_b.total_accepted_1) == (3, 4, 4)
+
+    # first two dates in order of kleymo groups (3, 2), the oldest goes first
+    assert list(main_page.summarized_welder_group_ndts) == [date(2024, 1, 2), date(2024, 1, 3)]
+    assert main_page.summarized_welder_group_ndts[date(2024, 1, 3)].total_ndt_1 == 14
+    assert main_page.summarized_welder_group_ndts[date(2024, 1, 3)].repair_status_1 == 100 - (12 / 14) * 100
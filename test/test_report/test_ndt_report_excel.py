@@ -0,0 +1,84 @@
+from datetime import date
+from pathlib import Path
+
+from openpyxl import load_workbook
+from openpyxl.xml.functions import tostring
+import pytest
+
+from src.report_commands import ndt_report_services
+from src.report_commands.ndt_report_services import NDTDataPrepocessor, NDTReportExcelStreamSaveService, NDTReportExcelParallelSaveService
+from src.domain import WelderNDTModel
+
+
+def ndt(kleymo: str, day: int, total_ndt_1: float, total_accepted_1: float) -> WelderNDTModel:
+    return WelderNDTModel.model_construct(
+        full_name = f"Welder {kleymo}",
+        kleymo = kleymo,
+        latest_welding_date = date(2024, 1, day),
+        total_weld_1 = total_ndt_1,
+        total_ndt_1 = total_ndt_1,
+        total_accepted_1 = total_accepted_1,
+        total_weld_2 = total_ndt_1 * 100,
+        total_ndt_2 = total_ndt_1 * 100,
+        total_accepted_2 = total_accepted_1 * 100,
+        ndt_id = f"{kleymo}{day}"
+    )
+
+
+def dump_report(saver: NDTReportExcelStreamSaveService, folder: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    folder.mkdir()
+    monkeypatch.setattr(ndt_report_services, "STATIC_DIR", folder)
+
+    # 5 welders with 3 welding dates, every third row has repair status above 5%
+    ndts = [ndt(f"K{welder:03}", day, 10 + welder, 10 + welder - (day + welder) % 3) for day in (28, 27, 26) for welder in range(5)]
+    saver.dump_report(*NDTDataPrepocessor().preprocess(ndts, limit=3))
+
+    return folder / "report.xlsx"
+
+
+def styles(cell) -> tuple:
+    return (
+        cell.style,
+        cell.number_format,
+        tostring(cell.fill.to_tree()),
+        tostring(cell.border.to_tree()),
+        tostring(cell.alignment.to_tree()),
+        tostring(cell.font.to_tree())
+    )
+
+
+def test_parallel_report_matches_stream_report(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    parallel_saver = NDTReportExcelParallelSaveService(workers=2)
+    parallel_saver.min_welders = 0
+
+    assembled = []
+    assemble = parallel_saver._assemble
+    monkeypatch.setattr(parallel_saver, "_assemble", lambda *args: assembled.append(assemble(*args)) or assembled[-1])
+
+    assert parallel_saver._is_parallel(5)
+
+    stream = load_workbook(dump_report(NDTReportExcelStreamSaveService(), tmp_path / "stream", monkeypatch))
+    parallel = load_workbook(dump_report(parallel_saver, tmp_path / "parallel", monkeypatch))
+
+    # worker workbooks have the styles of the report, so it isn't streamed instead
+    assert assembled == [True]
+
+    # temporary skeleton and worker workbooks are removed
+    assert [path.name for path in (tmp_path / "parallel").iterdir()] == ["report.xlsx"]
+    assert parallel.sheetnames == stream.sheetnames == ["Main", "K000", "K001", "K002", "K003", "K004"]
+
+    for stream_ws in stream.worksheets:
+        parallel_ws = parallel[stream_ws.title]
+
+        assert len(parallel_ws._charts) == len(stream_ws._charts)
+        assert str(parallel_ws.merged_cells) == str(stream_ws.merged_cells)
+
+        for stream_row, parallel_row in zip(stream_ws.iter_rows(), parallel_ws.iter_rows(), strict=True):
+            for stream_cell, parallel_cell in zip(stream_row, parallel_row, strict=True):
+                assert parallel_cell.value == stream_cell.value, (stream_ws.title, stream_cell.coordinate)
+                assert styles(parallel_cell) == styles(stream_cell), (stream_ws.title, stream_cell.coordinate)
+
+
+@pytest.mark.parametrize("workers, welders", [(1, 500), (4, 10)])
+def test_parallel_report_falls_back_to_stream(workers: int, welders: int) -> None:
+    assert not NDTReportExcelParallelSaveService(workers=workers)._is_parallel(welders)
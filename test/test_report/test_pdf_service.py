@@ -0,0 +1,146 @@
+from pathlib import Path
+import struct
+
+from PyPDF2 import PdfReader
+import pytest
+
+from src.services.pdf_service import PDFWriter, HelveticaFont, TrueTypeFont, font_file, read_tables, read_locations, _checksum
+
+
+# glyphs of the test font: 1 is "A", 2 is "Б" composed of 3, 4 is "B" and isn't used in tests
+GLYPH_COUNT = 5
+COMPOSITE_GLYPH = struct.pack(">5h", -1, 0, 0, 500, 700) + struct.pack(">HHbb", 0x0002, 3, 0, 0)
+
+
+def simple_glyph(glyph: int) -> bytes:
+    return struct.pack(">5h", 1, 0, 0, 500, 700) + bytes([glyph]) * 30
+
+
+def cmap_format_4() -> bytes:
+    """
+    "A" and "Б" are mapped by delta, "B" and "C" through glyph id array ("C" has no glyph)
+    """
+    ends, starts = [0x41, 0x43, 0x411, 0xFFFF], [0x41, 0x42, 0x411, 0xFFFF]
+    deltas, range_offsets = [1 - 0x41, 0, 2 - 0x411, 1], [0, 2 * 3, 0, 0]
+    glyph_ids = [4, 0]
+    body = struct.pack(">4H4HH4H4h4H2H", 8, 4, 1, 4, *ends, 0, *starts, *deltas, *range_offsets, *glyph_ids)
+
+    return struct.pack(">3H", 4, 6 + len(body), 0) + body
+
+
+def cmap_format_12() -> bytes:
+    groups = [(0x41, 0x41, 1), (0x42, 0x42, 4), (0x411, 0x411, 2), (0x1F600, 0x1F600, 3)]
+    body = b"".join(struct.pack(">3L", *group) for group in groups)
+
+    return struct.pack(">HHLLL", 12, 0, 16 + len(body), 0, len(groups)) + body
+
+
+def cmap(subtables: list[tuple[int, int, bytes]]) -> bytes:
+    offset = 4 + 8 * len(subtables)
+    records, data = [], b""
+
+    for platform, encoding, subtable in subtables:
+        records.append(struct.pack(">HHL", platform, encoding, offset + len(data)))
+        data += subtable
+
+    return struct.pack(">HH", 0, len(subtables)) + b"".join(records) + data
+
+
+def build_font(path: Path, cmap_subtables: list[tuple[int, int, bytes]]) -> Path:
+    glyphs = [simple_glyph(0), simple_glyph(1), COMPOSITE_GLYPH, simple_glyph(3), simple_glyph(4)]
+    locations = [0]
+
+    for glyph in glyphs:
+        locations.append(locations[-1] + len(glyph))
+
+    head = bytearray(54)
+    struct.pack_into(">L", head, 12, 0x5F0F3CF5)
+    struct.pack_into(">H", head, 18, 1000)
+    struct.pack_into(">4h", head, 36, 0, -200, 1000, 800)
+
+    hhea = bytearray(36)
+    struct.pack_into(">2h", hhea, 4, 800, -200)
+    struct.pack_into(">H", hhea, 34, GLYPH_COUNT)
+
+    path.write_bytes(font_file({
+        b"head": bytes(head),
+        b"hhea": bytes(hhea),
+        b"maxp": struct.pack(">LH", 0x00005000, GLYPH_COUNT),
+        b"hmtx": b"".join(struct.pack(">Hh", 500 + 10 * glyph, 0) for glyph in range(GLYPH_COUNT)),
+        b"cmap": cmap(cmap_subtables),
+        b"name": bytes(1000),
+        b"loca": struct.pack(f">{len(locations)}H", *[location // 2 for location in locations]),
+        b"glyf": b"".join(glyphs),
+    }))
+
+    return path
+
+
+@pytest.fixture
+def font_path(tmp_path: Path) -> Path:
+    return build_font(tmp_path / "Test Font.ttf", [(3, 1, cmap_format_4()), (3, 10, cmap_format_12())])
+
+
+class TestTrueTypeFont:
+
+    def test_read_cmap_format_4(self, tmp_path: Path) -> None:
+        font = TrueTypeFont(build_font(tmp_path / "font.ttf", [(3, 1, cmap_format_4())]))
+
+        assert font.glyphs == {0x41: 1, 0x42: 4, 0x411: 2}
+
+
+    def test_read_cmap_prefers_format_12(self, font_path: Path) -> None:
+        font = TrueTypeFont(font_path)
+
+        assert font.glyphs == {0x41: 1, 0x42: 4, 0x411: 2, 0x1F600: 3}
+        assert font.name == "TestFont"
+        assert font.text_width("AБ?", 10) == (510 + 520 + 500) * 10 / 1000
+
+
+    def test_read_cmap_without_unicode_subtable(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            TrueTypeFont(build_font(tmp_path / "font.ttf", [(1, 0, cmap_format_4())]))
+
+
+    def test_subset_keeps_used_glyphs_and_their_components(self, font_path: Path) -> None:
+        font = TrueTypeFont(font_path)
+
+        assert font.encode("AБ") == b"<00010002>"
+
+        subset = font.subset()
+        tables = read_tables(subset)
+        locations = read_locations(subset, tables)
+        outlines = [subset[tables[b"glyf"][0] + start:tables[b"glyf"][0] + end] for start, end in zip(locations, locations[1:])]
+
+        assert sorted(tables) == [b"glyf", b"head", b"hhea", b"hmtx", b"loca", b"maxp"]
+        assert outlines == [simple_glyph(0), simple_glyph(1), COMPOSITE_GLYPH, simple_glyph(3), b""]
+        assert _checksum(subset) == 0xB1B0AFBA
+        assert len(subset) < len(font.data)
+
+
+def write_pdf(path: Path, font: TrueTypeFont | HelveticaFont, text: str) -> str:
+    with PDFWriter(path, font) as writer:
+        page = writer.new_page()
+        page.text(10, 10, text)
+        writer.add_page(page)
+
+    return PdfReader(path, strict=True).pages[0].extract_text()
+
+
+def test_true_type_font_embeds_subset(tmp_path: Path, font_path: Path) -> None:
+    font = TrueTypeFont(font_path)
+
+    assert write_pdf(tmp_path / "report.pdf", font, "AБ") == "AБ"
+
+    descriptor = PdfReader(tmp_path / "report.pdf").pages[0]["/Resources"]["/Font"]["/F1"]["/DescendantFonts"][0].get_object()["/FontDescriptor"]
+
+    assert descriptor["/FontName"].endswith("+TestFont")
+    assert descriptor["/FontFile2"].get_data() == font.subset()
+
+
+def test_helvetica_replaces_non_latin_text(tmp_path: Path) -> None:
+    font = HelveticaFont()
+
+    assert font.encode("Иванов (A)") == b"(?????? \\(A\\))"
+    assert font.text_width("Иван", 10) == 4 * 5.56
+    assert write_pdf(tmp_path / "report.pdf", font, "Иванов Smith") == "?????? Smith"